@@ -3,4 +3,7 @@ from django.apps import AppConfig
 
 class ClubproConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'clubpro'
\ No newline at end of file
+    name = 'clubpro'
+
+    def ready(self):
+        from . import checks  # noqa: F401
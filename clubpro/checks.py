@@ -0,0 +1,54 @@
+"""
+Verificações de configuração (``manage.py check``, ``runserver``, ``migrate``).
+
+Avisam quando a produção roda sem o pool de conexões do PostgreSQL (com ou sem
+CONN_MAX_AGE) ou quando o pool foi pedido mas não pode funcionar.
+"""
+import importlib.util
+
+from django.conf import settings
+from django.core.checks import Error, Warning, register
+
+
+def _usa_postgresql(db):
+    return 'postgresql' in db.get('ENGINE', '')
+
+
+@register()
+def verificar_conexoes_banco(app_configs, **kwargs):
+    erros = []
+    db = settings.DATABASES['default']
+    pool = db.get('OPTIONS', {}).get('pool')
+
+    if getattr(settings, 'DB_POOL', False) and not _usa_postgresql(db):
+        erros.append(Warning(
+            'DB_POOL=True é ignorado: o pool de conexões só existe para PostgreSQL.',
+            hint='Remova DB_POOL do .env ou configure DB_ENGINE=django.db.backends.postgresql.',
+            id='clubpro.W001',
+        ))
+
+    if pool and importlib.util.find_spec('psycopg_pool') is None:
+        erros.append(Error(
+            'DB_POOL=True requer o pacote psycopg_pool.',
+            hint='Instale as dependências com pip install -r requirements.txt (psycopg[binary,pool]).',
+            id='clubpro.E001',
+        ))
+
+    if not settings.DEBUG and _usa_postgresql(db) and not pool:
+        conn_max_age = db.get('CONN_MAX_AGE') or 0
+        if conn_max_age:
+            msg = (
+                f'Produção sem pool de conexões: cada worker mantém a própria conexão '
+                f'por CONN_MAX_AGE={conn_max_age}s, sem limite total de conexões com o PostgreSQL.'
+            )
+        else:
+            msg = 'Produção sem pool nem conexões persistentes: cada requisição abre uma conexão nova com o PostgreSQL.'
+        erros.append(Warning(
+            msg,
+            hint='Defina DB_POOL=True (recomendado; o pool substitui o CONN_MAX_AGE). '
+                 'Sem pool, mantenha CONN_MAX_AGE maior que zero e dimensione max_connections '
+                 'para o número de workers.',
+            id='clubpro.W002',
+        ))
+
+    return erros
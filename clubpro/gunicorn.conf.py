@@ -0,0 +1,49 @@
+"""
+Gunicorn configuration for production.
+
+    gunicorn -c clubpro/gunicorn.conf.py clubpro.wsgi:application
+
+Every value can be overridden with an environment variable (see .env.example):
+
+* ``WEB_CONCURRENCY``: worker processes. Default: ``2 * CPUs + 1``.
+* ``GUNICORN_THREADS``: threads per worker (``gthread``). Default: 2, so a
+  worker stuck waiting on AbacatePay/Chess.com does not block every request.
+* ``GUNICORN_WORKER_CLASS``: ``gthread`` (WSGI, default) or
+  ``uvicorn.workers.UvicornWorker`` to serve ``clubpro.asgi:application``.
+* ``GUNICORN_TIMEOUT`` / ``GUNICORN_GRACEFUL_TIMEOUT``: a worker silent for
+  longer than the timeout is killed; on restart (``SIGHUP``) or shutdown
+  (``SIGTERM``) workers get the graceful timeout to finish in-flight requests.
+* ``GUNICORN_MAX_REQUESTS``: workers are recycled after this many requests
+  (with jitter so they do not all restart at once), capping slow memory leaks.
+"""
+import multiprocessing
+import os
+
+
+def _env_int(name, default):
+    return int(os.getenv(name, default))
+
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+
+workers = _env_int('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1)
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+threads = _env_int('GUNICORN_THREADS', 2)
+
+timeout = _env_int('GUNICORN_TIMEOUT', 60)
+graceful_timeout = _env_int('GUNICORN_GRACEFUL_TIMEOUT', 30)
+keepalive = _env_int('GUNICORN_KEEPALIVE', 5)
+
+max_requests = _env_int('GUNICORN_MAX_REQUESTS', 1000)
+max_requests_jitter = _env_int('GUNICORN_MAX_REQUESTS_JITTER', 100)
+
+# Worker heartbeat files in RAM: /tmp may be an overlay/disk in containers,
+# and a slow fsync there is enough to get healthy workers killed.
+worker_tmp_dir = os.getenv('GUNICORN_WORKER_TMP_DIR', '/dev/shm' if os.path.isdir('/dev/shm') else None)
+
+# The proxy (nginx) runs in another container on the compose network.
+forwarded_allow_ips = os.getenv('FORWARDED_ALLOW_IPS', '*')
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
@@ -0,0 +1,78 @@
+"""
+Liveness and readiness endpoints for the container orchestrator / load balancer.
+
+* ``/health/live/``: the process is up and serving requests. Touches nothing
+  else, so a database outage does not get every web container restarted.
+* ``/health/ready/``: the instance can do useful work: the database answers a
+  ``SELECT 1`` and the cache accepts a write. Returns 503 otherwise, so the
+  proxy stops routing to it until it recovers.
+
+Served by a middleware placed first in ``MIDDLEWARE`` so probes skip
+sessions, authentication, the shop gate, the HTTPS redirect and the
+``ALLOWED_HOSTS`` check (probes usually hit the container by IP).
+"""
+import logging
+import time
+
+from django.core.cache import cache
+from django.db import connection
+from django.http import JsonResponse
+
+logger = logging.getLogger(__name__)
+
+LIVENESS_PATH = '/health/live/'
+READINESS_PATH = '/health/ready/'
+
+
+def _check_database():
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+        cursor.fetchone()
+
+
+def _check_cache():
+    cache.set('health:ready', 1, 10)
+
+
+CHECKS = (
+    ('database', _check_database),
+    ('cache', _check_cache),
+)
+
+
+def liveness():
+    return JsonResponse({'status': 'ok'})
+
+
+def readiness():
+    checks = {}
+    healthy = True
+    for name, check in CHECKS:
+        started = time.perf_counter()
+        try:
+            check()
+        except Exception as exc:
+            healthy = False
+            logger.warning("Health check %s failed: %s", name, exc)
+            checks[name] = {'status': 'error', 'error': exc.__class__.__name__}
+        else:
+            checks[name] = {'status': 'ok', 'ms': round((time.perf_counter() - started) * 1000, 1)}
+    return JsonResponse(
+        {'status': 'ok' if healthy else 'error', 'checks': checks},
+        status=200 if healthy else 503,
+    )
+
+
+class HealthCheckMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.path == LIVENESS_PATH:
+            response = liveness()
+        elif request.path == READINESS_PATH:
+            response = readiness()
+        else:
+            return self.get_response(request)
+        response['Cache-Control'] = 'no-store'
+        return response
@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 from pathlib import Path
 from dotenv import load_dotenv
 import os
+import tempfile
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 load_dotenv(BASE_DIR / '.env')
@@ -59,6 +60,7 @@ ALLOWED_HOSTS.extend(['127.0.0.1.nip.io', '.nip.io'])
 # Application definition
 
 INSTALLED_APPS = [
+    'clubpro',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -69,6 +71,7 @@ INSTALLED_APPS = [
     'main',
     'socios',
     'shop',
+    'scheduler',
     'widget_tweaks',
     'corsheaders',
 ]
@@ -76,13 +79,16 @@ INSTALLED_APPS = [
 AUTH_USER_MODEL = "users.UsuarioCustom"
 
 MIDDLEWARE = [
+    'clubpro.health.HealthCheckMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'socios.middleware.SocioMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    'socios.middleware.ExportacaoProntaMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'shop.middleware.ShopGateMiddleware',
 ]
@@ -142,10 +148,61 @@ DATABASES = {
         'PASSWORD': os.getenv('DB_PASSWORD', ''),
         'HOST': os.getenv('DB_HOST', ''),
         'PORT': os.getenv('DB_PORT', ''),
+        # Conexões persistentes: cada worker/thread reaproveita a conexão por até
+        # CONN_MAX_AGE segundos em vez de abrir uma nova a cada requisição; o health
+        # check descarta conexões que o banco derrubou. Use 0 com workers ASGI (uvicorn).
+        'CONN_MAX_AGE': int(os.getenv('CONN_MAX_AGE', '60')),
+        'CONN_HEALTH_CHECKS': True,
     }
     
 }
 
+# Pool de conexões nativo do psycopg 3 (só PostgreSQL). Cada processo mantém entre
+# DB_POOL_MIN_SIZE e DB_POOL_MAX_SIZE conexões abertas e as empresta a cada
+# requisição; substitui o CONN_MAX_AGE (o Django não aceita os dois juntos).
+# Dimensione para que WEB_CONCURRENCY x DB_POOL_MAX_SIZE (+ o serviço de jobs)
+# fique abaixo do max_connections do PostgreSQL.
+DB_POOL = os.getenv('DB_POOL', 'False') == 'True'
+if DB_POOL and 'postgresql' in DATABASES['default']['ENGINE']:
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default']['OPTIONS'] = {
+        'pool': {
+            'min_size': int(os.getenv('DB_POOL_MIN_SIZE', '2')),
+            'max_size': int(os.getenv('DB_POOL_MAX_SIZE', '4')),
+            # Segundos esperando uma conexão livre antes de falhar a requisição.
+            'timeout': float(os.getenv('DB_POOL_TIMEOUT', '10')),
+            # Conexões ociosas além do mínimo são fechadas após este tempo.
+            'max_idle': float(os.getenv('DB_POOL_MAX_IDLE', '300')),
+        },
+    }
+
+
+
+# Cache compartilhado entre os processos (web, jobs). Com REDIS_URL usa o Redis;
+# sem ele, um cache em disco, que ainda é compartilhado pelos workers da mesma
+# máquina (o LocMem padrão do Django é por processo).
+REDIS_URL = os.getenv('REDIS_URL', '')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'clubpro',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.getenv('CACHE_DIR', os.path.join(tempfile.gettempdir(), 'clubpro-cache')),
+            'KEY_PREFIX': 'clubpro',
+            'OPTIONS': {'MAX_ENTRIES': 5000},
+        }
+    }
+
+# Segundos que as páginas públicas (início, loja, torneios) ficam em cache. Alterações
+# em torneios, produtos e categorias invalidam o cache na hora; o prazo é só um limite.
+PUBLIC_CACHE_TTL = int(os.getenv('PUBLIC_CACHE_TTL', '300'))
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -215,6 +272,16 @@ ABACATEPAY_API_KEY = os.getenv('ABACATEPAY_API_KEY', '')
 ABACATEPAY_WEBHOOK_SECRET = os.getenv('ABACATEPAY_WEBHOOK_SECRET', '')
 # Endpoint base da API. A chave precisa ser da MESMA versão (v1/v2) do app no AbacatePay.
 ABACATEPAY_API_BASE_URL = os.getenv('ABACATEPAY_API_BASE_URL', 'https://api.abacatepay.com/v1')
+# Segundos que a lista de cobranças baixada do AbacatePay fica em cache para as
+# páginas de verificação de pagamento (a reconciliação periódica sempre baixa de novo).
+ABACATEPAY_STATUS_CACHE_TTL = int(os.getenv('ABACATEPAY_STATUS_CACHE_TTL', '30'))
+
+# Loja — minutos que o estoque fica reservado para um pedido aguardando pagamento.
+SHOP_RESERVA_ESTOQUE_MINUTOS = int(os.getenv('SHOP_RESERVA_ESTOQUE_MINUTOS', '60'))
+
+# Exportações em segundo plano — minutos que um arquivo gerado fica disponível
+# (e é reaproveitado por pedidos com os mesmos filtros) antes de ser apagado.
+EXPORTACAO_TTL_MINUTOS = int(os.getenv('EXPORTACAO_TTL_MINUTOS', '60'))
 
 # Landing page — Google Maps (optional embed src from Maps → Share → Embed a map)
 AXM_MAPS_ADDRESS = os.getenv(
@@ -1,19 +1,35 @@
 import berserk
 import os
+from functools import lru_cache
 from dotenv import load_dotenv
 
+from services.http_client import OutboundClient
+
 load_dotenv()
 
+LICHESS_BASE = 'https://lichess.org'
+
+lichess_http = OutboundClient('lichess', LICHESS_BASE, timeout=(3.05, 10))
+
+
+@lru_cache(maxsize=None)
+def _token_session(token):
+    # Uma sessão por token, reaproveitada entre instâncias (keep-alive).
+    session = berserk.TokenSession(token)
+    lichess_http.mount(session, f'{LICHESS_BASE}/')
+    return session
+
 
 class LichessApi:
     def __init__(self):
         self.token = os.getenv('LICHESS_API_TOKEN')
-        self.session = berserk.TokenSession(self.token)
+        self.session = _token_session(self.token)
         self.client = berserk.Client(session=self.session)
 
     def get_user_info(self, username):
         try:
-            return self.client.users.get_public_data(username)
+            with lichess_http.track('users/public'):
+                return self.client.users.get_public_data(username)
         except Exception as e:
             print(f"Erro ao pegar dado de usuario: {e}")
             return None
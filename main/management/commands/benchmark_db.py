@@ -0,0 +1,108 @@
+import statistics
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.signals import request_finished, request_started
+from django.db import connection, connections
+
+from main.models import Tournament
+
+MODOS = ('sem-persistencia', 'persistente', 'pool')
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara a vazão de requisições simuladas abrindo uma conexão nova por '
+        'requisição, com conexões persistentes (CONN_MAX_AGE) e com o pool do '
+        'psycopg 3. Cada requisição dispara request_started/request_finished '
+        '(como o Django faz) em volta de algumas consultas curtas. '
+        'O modo pool só existe no PostgreSQL.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000, help='Requisições por modo. Padrão: 2000')
+        parser.add_argument('--threads', type=int, default=8, help='Requisições em paralelo. Padrão: 8')
+        parser.add_argument('--queries', type=int, default=3, help='Consultas por requisição. Padrão: 3')
+        parser.add_argument(
+            '--modes', nargs='+', choices=MODOS, default=list(MODOS),
+            help='Modos comparados. Padrão: todos os disponíveis',
+        )
+
+    def handle(self, *args, **options):
+        if min(options['requests'], options['threads'], options['queries']) < 1:
+            raise CommandError('--requests, --threads e --queries devem ser maiores que zero.')
+
+        db = connections.settings['default']
+        original = {'CONN_MAX_AGE': db.get('CONN_MAX_AGE', 0), 'OPTIONS': dict(db.get('OPTIONS', {}))}
+        modos = list(options['modes'])
+        if 'pool' in modos and connection.vendor != 'postgresql':
+            self.stdout.write(self.style.WARNING('Modo pool ignorado: o banco não é PostgreSQL.'))
+            modos.remove('pool')
+
+        self.stdout.write(
+            f"{options['requests']} requisição(ões) por modo, {options['threads']} em paralelo, "
+            f"{options['queries']} consulta(s) cada ({connection.vendor})"
+        )
+        try:
+            for modo in modos:
+                self._configurar(db, original, modo)
+                self._medir(modo, options)
+        finally:
+            connections.close_all()
+            if 'pool' in modos:
+                connection.close_pool()
+            db['CONN_MAX_AGE'] = original['CONN_MAX_AGE']
+            db['OPTIONS'] = original['OPTIONS']
+
+    def _configurar(self, db, original, modo):
+        # Cada thread cria a própria conexão a partir destas configurações.
+        connections.close_all()
+        options = {k: v for k, v in original['OPTIONS'].items() if k != 'pool'}
+        if modo == 'pool':
+            db['CONN_MAX_AGE'] = 0
+            options['pool'] = original['OPTIONS'].get('pool') or True
+        else:
+            db['CONN_MAX_AGE'] = 0 if modo == 'sem-persistencia' else 600
+        db['OPTIONS'] = options
+
+    def _medir(self, modo, options):
+        restantes = [options['requests']]
+        latencias = []
+        lock = threading.Lock()
+
+        def trabalhador():
+            locais = []
+            try:
+                while True:
+                    with lock:
+                        if restantes[0] <= 0:
+                            break
+                        restantes[0] -= 1
+                    inicio = time.perf_counter()
+                    request_started.send(sender=self.__class__)
+                    try:
+                        for _ in range(options['queries']):
+                            Tournament.objects.filter(status='pending').exists()
+                    finally:
+                        request_finished.send(sender=self.__class__)
+                    locais.append((time.perf_counter() - inicio) * 1000)
+            finally:
+                connection.close()
+                with lock:
+                    latencias.extend(locais)
+
+        inicio = time.perf_counter()
+        threads = [threading.Thread(target=trabalhador) for _ in range(options['threads'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        duracao = time.perf_counter() - inicio
+
+        latencias.sort()
+        p95 = latencias[max(int(len(latencias) * 0.95) - 1, 0)]
+        self.stdout.write(
+            f'{modo:>16}: {len(latencias) / duracao:8.1f} req/s | '
+            f'p50 {statistics.median(latencias):.2f} ms, p95 {p95:.2f} ms'
+        )
@@ -0,0 +1,100 @@
+import statistics
+import threading
+import time
+from itertools import cycle
+from urllib.parse import urljoin
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+
+CENARIO_PADRAO = ['/', '/shop/', '/torneios/', '/health/ready/']
+
+
+class Command(BaseCommand):
+    help = (
+        'Teste de carga HTTP: N clientes em paralelo repetem o cenário de páginas '
+        'públicas durante X segundos e o comando mostra vazão e latências. '
+        'Rode contra o runserver e contra o gunicorn (clubpro/gunicorn.conf.py) '
+        'para comparar, de preferência de outra máquina ou contêiner.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://localhost:8000', help='Endereço do servidor. Padrão: http://localhost:8000')
+        parser.add_argument(
+            '--paths', nargs='+', default=CENARIO_PADRAO,
+            help=f"Caminhos requisitados em rodízio. Padrão: {' '.join(CENARIO_PADRAO)}",
+        )
+        parser.add_argument('--concurrency', type=int, default=16, help='Clientes simultâneos. Padrão: 16')
+        parser.add_argument('--duration', type=float, default=20, help='Duração em segundos. Padrão: 20')
+        parser.add_argument('--timeout', type=float, default=10, help='Timeout por requisição em segundos. Padrão: 10')
+
+    def handle(self, *args, **options):
+        concorrencia = options['concurrency']
+        duracao = options['duration']
+        if concorrencia < 1 or duracao <= 0:
+            raise CommandError('--concurrency e --duration devem ser maiores que zero.')
+
+        urls = [urljoin(options['url'].rstrip('/') + '/', path.lstrip('/')) for path in options['paths']]
+        try:
+            requests.get(urls[0], timeout=options['timeout'])
+        except requests.RequestException as exc:
+            raise CommandError(f'Servidor inacessível em {urls[0]}: {exc}')
+
+        self.stdout.write(
+            f'{concorrencia} cliente(s) por {duracao:g}s contra {options["url"]} ({len(urls)} página(s))'
+        )
+
+        latencias = {url: [] for url in urls}
+        erros = {'status': 0, 'rede': 0}
+        lock = threading.Lock()
+        fim = time.perf_counter() + duracao
+
+        def cliente(deslocamento):
+            # Uma sessão por cliente: keep-alive, como um navegador.
+            sessao = requests.Session()
+            paginas = cycle(urls[deslocamento % len(urls):] + urls[:deslocamento % len(urls)])
+            locais, falhas = [], {'status': 0, 'rede': 0}
+            while time.perf_counter() < fim:
+                url = next(paginas)
+                inicio = time.perf_counter()
+                try:
+                    resposta = sessao.get(url, timeout=options['timeout'], allow_redirects=False)
+                except requests.RequestException:
+                    falhas['rede'] += 1
+                    continue
+                if resposta.status_code >= 400:
+                    falhas['status'] += 1
+                locais.append((url, (time.perf_counter() - inicio) * 1000))
+            with lock:
+                for url, ms in locais:
+                    latencias[url].append(ms)
+                for chave, valor in falhas.items():
+                    erros[chave] += valor
+
+        inicio = time.perf_counter()
+        clientes = [threading.Thread(target=cliente, args=(i,)) for i in range(concorrencia)]
+        for thread in clientes:
+            thread.start()
+        for thread in clientes:
+            thread.join()
+        decorrido = time.perf_counter() - inicio
+
+        todas = sorted(ms for lista in latencias.values() for ms in lista)
+        if not todas:
+            raise CommandError('Nenhuma requisição foi concluída.')
+        self.stdout.write(
+            f'{len(todas)} requisição(ões) em {decorrido:.1f}s: {len(todas) / decorrido:.1f} req/s | '
+            f'{erros["status"]} resposta(s) 4xx/5xx, {erros["rede"]} erro(s) de rede'
+        )
+        self.stdout.write(f'Geral: {self._resumo(todas)}')
+        for url, lista in latencias.items():
+            if lista:
+                self.stdout.write(f'  {url}: {self._resumo(sorted(lista))}')
+
+    @staticmethod
+    def _resumo(latencias):
+        p95 = latencias[max(int(len(latencias) * 0.95) - 1, 0)]
+        return (
+            f'p50 {statistics.median(latencias):.1f} ms, p95 {p95:.1f} ms, '
+            f'máx {latencias[-1]:.1f} ms ({len(latencias)} req)'
+        )
@@ -0,0 +1,25 @@
+"""
+Sinais do app principal.
+
+Invalidam as páginas públicas em cache (``services.cache``) quando torneios ou
+inscrições mudam.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from services.cache import invalidate_on_commit
+
+from .models import Participant, Tournament
+
+
+@receiver(post_save, sender=Tournament)
+@receiver(post_delete, sender=Tournament)
+def invalidar_cache_torneios(sender, **kwargs):
+    invalidate_on_commit(Tournament)
+
+
+@receiver(post_save, sender=Participant)
+@receiver(post_delete, sender=Participant)
+def invalidar_cache_inscricoes(sender, **kwargs):
+    # A lista pública mostra o número de inscritos de cada torneio.
+    invalidate_on_commit(Participant)
@@ -8,6 +8,9 @@ from django.contrib import messages
 from django.views.decorators.http import require_POST
 from django.utils import timezone
 from django.urls import reverse
+from django.db.models import Count
+
+from services import cache as services_cache
 
 from ..models import Tournament, Participant
 from ..forms import TorneioAnuncioForm
@@ -19,13 +22,23 @@ def is_staff_or_superuser(user):
 
 # === Público: listar e ver torneios anunciados ===
 
+def _torneios_anunciados():
+    return list(
+        Tournament.objects.filter(status__in=['pending', 'created'])
+        .annotate(num_inscritos=Count('participants'))
+        .order_by('start_time')
+    )
+
+
 def torneios_lista(request):
     """Lista de torneios anunciados (público)."""
     agora = timezone.now()
-    torneios = Tournament.objects.filter(
-        status__in=['pending', 'created'],
-        start_time__gte=agora
-    ).order_by('start_time')
+    # O cache guarda todos os anunciados; os que já começaram saem aqui, sem
+    # depender de uma invalidação quando o horário passa.
+    anunciados = services_cache.get_or_set(
+        'torneios:anunciados', (Tournament, Participant), _torneios_anunciados,
+    )
+    torneios = [torneio for torneio in anunciados if torneio.start_time >= agora]
     return render(request, 'torneios/lista.html', {'torneios': torneios})
 
 
@@ -0,0 +1,19 @@
+from django.contrib import admin
+
+from .models import JobRun, ScheduledJob
+
+
+@admin.register(ScheduledJob)
+class ScheduledJobAdmin(admin.ModelAdmin):
+    list_display = ['name', 'enabled', 'interval_seconds', 'next_run_at', 'last_run_at', 'last_success', 'locked_by']
+    list_filter = ['enabled', 'last_success']
+    list_editable = ['enabled']
+    readonly_fields = ['last_run_at', 'last_success', 'locked_by', 'locked_until', 'created_at', 'updated_at']
+
+
+@admin.register(JobRun)
+class JobRunAdmin(admin.ModelAdmin):
+    list_display = ['job', 'status', 'started_at', 'duration_ms', 'worker']
+    list_filter = ['status', 'job']
+    date_hierarchy = 'started_at'
+    readonly_fields = ['job', 'worker', 'status', 'started_at', 'finished_at', 'duration_ms', 'result', 'error']
@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+
+
+class SchedulerConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'scheduler'
+    verbose_name = 'Agendador de Tarefas'
+
+    def ready(self):
+        # Each app declares its recurring jobs in a ``jobs.py`` module.
+        autodiscover_modules('jobs')
@@ -0,0 +1,79 @@
+import signal
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from scheduler.registry import get_jobs
+from scheduler.runner import run_pending, sync_jobs, worker_id
+
+
+class Command(BaseCommand):
+    help = 'Worker que executa as tarefas periódicas registradas (vencimentos, cobranças, carrinhos, Chess.com)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Executa as tarefas vencidas uma vez e encerra (útil para cron)',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=30,
+            help='Segundos entre verificações de tarefas vencidas. Padrão: 30',
+        )
+        parser.add_argument(
+            '--job',
+            action='append',
+            dest='jobs',
+            help='Executa apenas a(s) tarefa(s) informada(s). Pode ser repetido.',
+        )
+        parser.add_argument(
+            '--exclude',
+            action='append',
+            dest='excluded',
+            default=[],
+            help='Não executa a(s) tarefa(s) informada(s), deixando-as para outro worker. Pode ser repetido.',
+        )
+
+    def handle(self, *args, **options):
+        registered = get_jobs()
+        only = options['jobs']
+        excluded = options['excluded']
+        unknown = set(only or []) | set(excluded)
+        unknown -= set(registered)
+        if unknown:
+            raise CommandError(f'Tarefa(s) desconhecida(s): {", ".join(sorted(unknown))}')
+
+        worker = worker_id()
+        sync_jobs()
+        self.stdout.write(f'Worker {worker}: {len(registered)} tarefa(s) registrada(s)')
+
+        self._stop = False
+        signal.signal(signal.SIGTERM, self._request_stop)
+        signal.signal(signal.SIGINT, self._request_stop)
+
+        while True:
+            close_old_connections()
+            for run in run_pending(worker, only=only, exclude=excluded):
+                style = self.style.SUCCESS if run.status == run.STATUS_SUCCESS else self.style.ERROR
+                self.stdout.write(style(
+                    f'{run.job.name}: {run.get_status_display()} em {run.duration_ms} ms'
+                    + (f' – {run.result}' if run.result else '')
+                ))
+                if self._stop:
+                    break
+            if options['once']:
+                break
+            deadline = time.monotonic() + options['sleep']
+            while not self._stop and time.monotonic() < deadline:
+                time.sleep(min(1, deadline - time.monotonic()))
+            if self._stop:
+                break
+
+        self.stdout.write('Worker encerrado.')
+
+    def _request_stop(self, signum, frame):
+        # Finish the current job before exiting (graceful container stop).
+        self._stop = True
@@ -0,0 +1,57 @@
+# Generated by Django 5.1.6 on 2026-10-17 17:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduledJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=120, unique=True, verbose_name='Nome')),
+                ('enabled', models.BooleanField(default=True, verbose_name='Ativa')),
+                ('interval_seconds', models.PositiveIntegerField(verbose_name='Intervalo (s)')),
+                ('jitter_seconds', models.PositiveIntegerField(default=0, verbose_name='Variação Aleatória (s)')),
+                ('next_run_at', models.DateTimeField(verbose_name='Próxima Execução')),
+                ('last_run_at', models.DateTimeField(blank=True, null=True, verbose_name='Última Execução')),
+                ('last_success', models.BooleanField(blank=True, null=True, verbose_name='Última Execução com Sucesso')),
+                ('locked_by', models.CharField(blank=True, max_length=120, verbose_name='Em Execução por')),
+                ('locked_until', models.DateTimeField(blank=True, null=True, verbose_name='Bloqueada até')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Tarefa Agendada',
+                'verbose_name_plural': 'Tarefas Agendadas',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='JobRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('worker', models.CharField(max_length=120, verbose_name='Worker')),
+                ('status', models.CharField(choices=[('running', 'Em execução'), ('success', 'Sucesso'), ('failed', 'Falhou')], default='running', max_length=10, verbose_name='Status')),
+                ('started_at', models.DateTimeField(verbose_name='Início')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Fim')),
+                ('duration_ms', models.PositiveIntegerField(blank=True, null=True, verbose_name='Duração (ms)')),
+                ('result', models.TextField(blank=True, verbose_name='Resultado')),
+                ('error', models.TextField(blank=True, verbose_name='Erro')),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='runs', to='scheduler.scheduledjob', verbose_name='Tarefa')),
+            ],
+            options={
+                'verbose_name': 'Execução de Tarefa',
+                'verbose_name_plural': 'Execuções de Tarefas',
+                'ordering': ['-started_at'],
+                'indexes': [models.Index(fields=['job', '-started_at'], name='scheduler_j_job_id_f942e1_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,62 @@
+from django.db import models
+
+
+class ScheduledJob(models.Model):
+    """Schedule and lock state of a recurring job registered in ``scheduler.registry``."""
+
+    name = models.CharField(max_length=120, unique=True, verbose_name='Nome')
+    enabled = models.BooleanField(default=True, verbose_name='Ativa')
+    interval_seconds = models.PositiveIntegerField(verbose_name='Intervalo (s)')
+    jitter_seconds = models.PositiveIntegerField(default=0, verbose_name='Variação Aleatória (s)')
+    next_run_at = models.DateTimeField(verbose_name='Próxima Execução')
+    last_run_at = models.DateTimeField(null=True, blank=True, verbose_name='Última Execução')
+    last_success = models.BooleanField(null=True, blank=True, verbose_name='Última Execução com Sucesso')
+
+    # Lock: a worker owns the job while locked_until is in the future.
+    locked_by = models.CharField(max_length=120, blank=True, verbose_name='Em Execução por')
+    locked_until = models.DateTimeField(null=True, blank=True, verbose_name='Bloqueada até')
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Tarefa Agendada'
+        verbose_name_plural = 'Tarefas Agendadas'
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
+
+class JobRun(models.Model):
+    """History entry for one execution of a scheduled job."""
+
+    STATUS_RUNNING = 'running'
+    STATUS_SUCCESS = 'success'
+    STATUS_FAILED = 'failed'
+
+    STATUS_CHOICES = [
+        (STATUS_RUNNING, 'Em execução'),
+        (STATUS_SUCCESS, 'Sucesso'),
+        (STATUS_FAILED, 'Falhou'),
+    ]
+
+    job = models.ForeignKey(ScheduledJob, on_delete=models.CASCADE, related_name='runs', verbose_name='Tarefa')
+    worker = models.CharField(max_length=120, verbose_name='Worker')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_RUNNING, verbose_name='Status')
+    started_at = models.DateTimeField(verbose_name='Início')
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name='Fim')
+    duration_ms = models.PositiveIntegerField(null=True, blank=True, verbose_name='Duração (ms)')
+    result = models.TextField(blank=True, verbose_name='Resultado')
+    error = models.TextField(blank=True, verbose_name='Erro')
+
+    class Meta:
+        verbose_name = 'Execução de Tarefa'
+        verbose_name_plural = 'Execuções de Tarefas'
+        ordering = ['-started_at']
+        indexes = [
+            models.Index(fields=['job', '-started_at']),
+        ]
+
+    def __str__(self):
+        return f'{self.job.name} @ {self.started_at:%d/%m/%Y %H:%M} ({self.get_status_display()})'
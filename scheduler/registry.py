@@ -0,0 +1,74 @@
+"""
+In-code registry of recurring jobs.
+
+Apps declare jobs in their ``jobs.py`` module (auto-discovered by
+``SchedulerConfig.ready``)::
+
+    from scheduler.registry import register_job
+
+    @register_job('socios.atualizar_vencimentos', interval=timedelta(hours=6))
+    def atualizar_vencimentos():
+        ...
+
+The worker (``manage.py run_jobs``) mirrors every registered job into a
+``ScheduledJob`` row, which holds the schedule and the lock.
+"""
+from __future__ import annotations
+
+from datetime import timedelta
+from typing import Callable, Dict, Optional
+
+
+class JobSpec:
+    """A registered job: the callable plus its schedule."""
+
+    def __init__(self, name: str, func: Callable, interval: timedelta, jitter: timedelta, timeout: timedelta):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.jitter = jitter
+        self.timeout = timeout
+
+    def __repr__(self):
+        return f'<JobSpec {self.name} every {self.interval}>'
+
+
+_registry: Dict[str, JobSpec] = {}
+
+# Lower bound for the default lock timeout (a crashed worker's job waits this long).
+MIN_TIMEOUT = timedelta(minutes=10)
+
+
+def register_job(
+    name: str,
+    *,
+    interval: timedelta,
+    jitter: timedelta = timedelta(0),
+    timeout: Optional[timedelta] = None,
+):
+    """
+    Register ``func`` to run every ``interval`` (plus up to ``jitter``).
+
+    ``timeout`` bounds how long a run may hold the job lock; after that another
+    worker may take the job over. Defaults to the interval, capped at one hour
+    and never below ``MIN_TIMEOUT``, so short-interval jobs are not taken over
+    while a slow run is still going.
+    """
+    def decorator(func: Callable) -> Callable:
+        _registry[name] = JobSpec(
+            name=name,
+            func=func,
+            interval=interval,
+            jitter=jitter,
+            timeout=timeout or max(min(interval, timedelta(hours=1)), MIN_TIMEOUT),
+        )
+        return func
+    return decorator
+
+
+def get_jobs() -> Dict[str, JobSpec]:
+    return dict(_registry)
+
+
+def get_job(name: str) -> Optional[JobSpec]:
+    return _registry.get(name)
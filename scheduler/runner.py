@@ -0,0 +1,160 @@
+"""
+Execution of scheduled jobs.
+
+Several workers (e.g. one per web container) may run ``run_jobs`` at the same
+time. A job is *claimed* right before it runs: inside a transaction the due
+rows are read with ``SELECT ... FOR UPDATE SKIP LOCKED`` (where the database
+supports it) and the claim itself is a conditional UPDATE that only succeeds
+while the job is unlocked. Only one worker can win that UPDATE, so a job never
+runs twice concurrently; a crashed worker's lock expires after the job timeout.
+Jobs of one pass are claimed one by one, so a slow job does not eat into the
+lock of the jobs queued behind it.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import random
+import socket
+import time
+import traceback
+from datetime import timedelta
+from typing import Iterator
+
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import JobRun, ScheduledJob
+from .registry import get_jobs
+
+logger = logging.getLogger(__name__)
+
+
+def worker_id() -> str:
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def _next_run(spec, now):
+    jitter = random.uniform(0, spec.jitter.total_seconds()) if spec.jitter else 0
+    return now + spec.interval + timedelta(seconds=jitter)
+
+
+def sync_jobs() -> None:
+    """Create/update one ``ScheduledJob`` row per registered job."""
+    now = timezone.now()
+    for name, spec in get_jobs().items():
+        job, created = ScheduledJob.objects.get_or_create(
+            name=name,
+            defaults={
+                'interval_seconds': int(spec.interval.total_seconds()),
+                'jitter_seconds': int(spec.jitter.total_seconds()),
+                # Spread the first run of each job over its jitter window.
+                'next_run_at': now + timedelta(seconds=random.uniform(0, spec.jitter.total_seconds())),
+            },
+        )
+        if not created and (
+            job.interval_seconds != int(spec.interval.total_seconds())
+            or job.jitter_seconds != int(spec.jitter.total_seconds())
+        ):
+            job.interval_seconds = int(spec.interval.total_seconds())
+            job.jitter_seconds = int(spec.jitter.total_seconds())
+            job.save(update_fields=['interval_seconds', 'jitter_seconds', 'updated_at'])
+
+
+def claim_next_job(worker: str, only=None, skip=()) -> ScheduledJob | None:
+    """
+    Lock and return the most overdue job that is not running elsewhere.
+
+    Jobs are claimed one at a time, right before they run, so a lock never
+    waits behind other jobs of the same pass and its timeout only has to
+    cover the job's own runtime.
+    """
+    now = timezone.now()
+    specs = get_jobs()
+
+    with transaction.atomic():
+        due = ScheduledJob.objects.filter(
+            Q(locked_until__isnull=True) | Q(locked_until__lt=now),
+            enabled=True,
+            next_run_at__lte=now,
+            name__in=only or list(specs),
+        ).exclude(name__in=skip).order_by('next_run_at')
+        if connection.features.has_select_for_update_skip_locked:
+            due = due.select_for_update(skip_locked=True)
+
+        for job in due[:5]:
+            locked_until = now + specs[job.name].timeout
+            won = ScheduledJob.objects.filter(
+                Q(locked_until__isnull=True) | Q(locked_until__lt=now),
+                pk=job.pk,
+            ).update(locked_by=worker, locked_until=locked_until)
+            if won:
+                job.locked_by = worker
+                job.locked_until = locked_until
+                return job
+
+    return None
+
+
+def run_job(job: ScheduledJob, worker: str) -> JobRun | None:
+    """
+    Run a claimed job, record its history and release the lock.
+
+    The lock is re-checked (and renewed for a full timeout) right before the
+    job starts; if it expired and another worker took the job over in the
+    meantime, nothing runs and ``None`` is returned.
+    """
+    spec = get_jobs()[job.name]
+    started_at = timezone.now()
+    renewed = ScheduledJob.objects.filter(
+        pk=job.pk,
+        locked_by=worker,
+        locked_until__gt=started_at,
+    ).update(locked_until=started_at + spec.timeout)
+    if not renewed:
+        logger.warning('Scheduled job %s: lock lost before start, skipping', job.name)
+        return None
+    run = JobRun.objects.create(job=job, worker=worker, started_at=started_at)
+    inicio = time.monotonic()
+
+    try:
+        result = spec.func()
+        run.status = JobRun.STATUS_SUCCESS
+        run.result = '' if result is None else str(result)
+    except Exception:
+        logger.exception('Scheduled job %s failed', job.name)
+        run.status = JobRun.STATUS_FAILED
+        run.error = traceback.format_exc()
+
+    finished_at = timezone.now()
+    run.finished_at = finished_at
+    run.duration_ms = int((time.monotonic() - inicio) * 1000)
+    run.save(update_fields=['status', 'result', 'error', 'finished_at', 'duration_ms'])
+
+    # Release only our own lock; if it expired and someone else took over,
+    # leave their lock and schedule alone.
+    ScheduledJob.objects.filter(pk=job.pk, locked_by=worker).update(
+        locked_by='',
+        locked_until=None,
+        last_run_at=started_at,
+        last_success=run.status == JobRun.STATUS_SUCCESS,
+        next_run_at=_next_run(spec, finished_at),
+    )
+
+    logger.info('Scheduled job %s finished: %s in %d ms', job.name, run.status, run.duration_ms)
+    return run
+
+
+def run_pending(worker: str | None = None, only=None, exclude=()) -> Iterator[JobRun]:
+    """Run every job that is currently due, claiming each one as it starts."""
+    worker = worker or worker_id()
+    seen = set(exclude)
+    while True:
+        job = claim_next_job(worker, only=only, skip=seen)
+        if job is None:
+            return
+        seen.add(job.name)
+        run = run_job(job, worker)
+        if run is not None:
+            yield run
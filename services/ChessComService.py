@@ -1,6 +1,8 @@
 import requests
 from typing import Optional, Dict, Any
 
+from .http_client import OutboundClient
+
 API_BASE = 'https://api.chess.com/pub/player'
 HEADERS = {
     'Accept': 'application/json',
@@ -8,6 +10,8 @@ HEADERS = {
     'User-Agent': 'AXM-ClubPro/1.0 (https://clubpro.local; contact: admin@clubpro.local)',
 }
 
+chesscom_http = OutboundClient('chesscom', API_BASE, timeout=(3.05, 10), headers=HEADERS)
+
 
 class ChessComApi:
     """Thin wrapper around the public Chess.com API (no auth required)."""
@@ -16,7 +20,7 @@ class ChessComApi:
     def get_player_stats(username: str) -> Optional[Dict[str, Any]]:
         """GET /pub/player/{username}/stats"""
         try:
-            resp = requests.get(f'{API_BASE}/{username}/stats', headers=HEADERS, timeout=10)
+            resp = chesscom_http.get(f'/{username}/stats', endpoint='player/stats')
             resp.raise_for_status()
             return resp.json()
         except requests.RequestException as e:
@@ -27,7 +31,7 @@ class ChessComApi:
     def get_player_profile(username: str) -> Optional[Dict[str, Any]]:
         """GET /pub/player/{username}"""
         try:
-            resp = requests.get(f'{API_BASE}/{username}', headers=HEADERS, timeout=10)
+            resp = chesscom_http.get(f'/{username}', endpoint='player')
             resp.raise_for_status()
             return resp.json()
         except requests.RequestException as e:
@@ -39,12 +43,12 @@ class ChessComApi:
         """Checks whether a Chess.com username exists."""
         try:
             # Primary check by profile endpoint.
-            resp_profile = requests.get(f'{API_BASE}/{username}', headers=HEADERS, timeout=10)
+            resp_profile = chesscom_http.get(f'/{username}', endpoint='player')
             if resp_profile.status_code == 200:
                 return True
 
             # Fallback by stats endpoint (some edge cases can differ).
-            resp_stats = requests.get(f'{API_BASE}/{username}/stats', headers=HEADERS, timeout=10)
+            resp_stats = chesscom_http.get(f'/{username}/stats', endpoint='player/stats')
             return resp_stats.status_code == 200
         except requests.RequestException:
             return False
@@ -0,0 +1,99 @@
+"""
+Cache-aside helpers for public pages backed by the shared cache (``CACHES``).
+
+Entries are keyed by the *version* of the models they were built from. Each
+model (``main.tournament``, ``shop.product``...) has a counter in the cache;
+``invalidate(Model)`` bumps it, so every key built from the old version is
+simply never read again and expires on its own — nothing has to be found and
+deleted. The model signals (``main.signals``, ``shop.signals``) call
+``invalidate_on_commit`` whenever a tracked row changes.
+
+If the cache backend is unreachable (e.g. Redis restarting) the helpers log
+the error and fall back to computing the value, so a cache outage slows pages
+down instead of breaking them.
+"""
+from __future__ import annotations
+
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+logger = logging.getLogger('clubpro.cache')
+
+_MISSING = object()
+
+
+def _namespace(model_or_label) -> str:
+    if isinstance(model_or_label, str):
+        return model_or_label.lower()
+    return model_or_label._meta.label_lower
+
+
+def _version_key(namespace: str) -> str:
+    return f'cache:versao:{namespace}'
+
+
+def versions(*models) -> dict[str, int]:
+    """Current version of each model namespace (0 if never invalidated)."""
+    namespaces = [_namespace(model) for model in models]
+    keys = [_version_key(namespace) for namespace in namespaces]
+    try:
+        found = cache.get_many(keys)
+    except Exception:
+        logger.exception("Cache indisponível ao ler versões %s", namespaces)
+        found = {}
+    return {namespace: found.get(key, 0) for namespace, key in zip(namespaces, keys)}
+
+
+def make_key(name: str, models, *parts) -> str:
+    """
+    Key for ``name`` built from ``models`` at their current versions, e.g.
+    ``make_key('shop:produtos', (Product, Category), 'camisas', 2)``.
+    """
+    stamp = '.'.join(f'{namespace}@{version}' for namespace, version in versions(*models).items())
+    suffix = ':'.join(str(part) for part in parts)
+    return f'{name}:{stamp}:{suffix}' if suffix else f'{name}:{stamp}'
+
+
+def get_or_set(name: str, models, compute, *parts, timeout: int | None = None):
+    """
+    Returns the cached value for ``name``/``parts`` or calls ``compute()`` and
+    stores its result. ``compute`` must return something picklable (lists,
+    dicts, model instances — not lazy querysets).
+    """
+    timeout = settings.PUBLIC_CACHE_TTL if timeout is None else timeout
+    key = make_key(name, models, *parts)
+    try:
+        value = cache.get(key, _MISSING)
+    except Exception:
+        logger.exception("Cache indisponível ao ler %s", key)
+        return compute()
+    if value is not _MISSING:
+        return value
+
+    value = compute()
+    try:
+        cache.set(key, value, timeout)
+    except Exception:
+        logger.exception("Cache indisponível ao gravar %s", key)
+    return value
+
+
+def invalidate(*models) -> None:
+    """Drops every entry built from ``models`` by bumping their versions."""
+    for model in models:
+        key = _version_key(_namespace(model))
+        try:
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.set(key, 1, None)
+        except Exception:
+            logger.exception("Cache indisponível ao invalidar %s", key)
+
+
+def invalidate_on_commit(*models) -> None:
+    """``invalidate`` once the current transaction commits (immediately outside one)."""
+    transaction.on_commit(lambda: invalidate(*models))
@@ -0,0 +1,154 @@
+"""
+Streaming CSV/XLSX exports of querysets.
+
+An export is a queryset plus a list of ``Column(header, value)``, where
+``value`` takes the object and returns the cell value. Rows are read with
+``queryset.iterator(chunk_size=...)`` (a server-side cursor on PostgreSQL), so
+memory stays flat however many rows there are:
+
+* CSV goes out as a ``StreamingHttpResponse`` while it is being read;
+* XLSX is written by openpyxl in write-only mode, which spills the rows to a
+  temporary file instead of keeping them in memory. The finished workbook
+  is then sent with ``FileResponse`` in blocks. An XLSX file is a zip with an
+  index at the end, so the download starts only once the last row is written.
+
+``write_csv``/``write_xlsx`` produce the same files outside a request, for
+the background exports (``socios.exportacao``).
+
+Querysets must not use ``prefetch_related`` without a chunk size; aggregate
+related data with ``annotate`` instead.
+"""
+from __future__ import annotations
+
+import csv
+import io
+import tempfile
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, NamedTuple
+
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils import timezone
+
+FORMATS = ('csv', 'xlsx')
+
+CHUNK_SIZE = 2000
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+
+class Column(NamedTuple):
+    header: str
+    value: Callable[[Any], Any]
+
+
+def _local(value: datetime) -> datetime:
+    if timezone.is_aware(value):
+        value = timezone.localtime(value)
+    return value.replace(tzinfo=None)
+
+
+def csv_value(value) -> str:
+    """Cell text in the format the staff already uses (dd/mm/aaaa, no ``None``)."""
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'Sim' if value else 'Não'
+    if isinstance(value, datetime):
+        return _local(value).strftime('%d/%m/%Y %H:%M')
+    if isinstance(value, date):
+        return value.strftime('%d/%m/%Y')
+    return str(value)
+
+
+def xlsx_value(value):
+    """Cell value for openpyxl: native dates/numbers, naive local datetimes."""
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return 'Sim' if value else 'Não'
+    if isinstance(value, datetime):
+        return _local(value)
+    if isinstance(value, (date, int, float, Decimal)):
+        return value
+    return str(value)
+
+
+def iter_rows(queryset, columns, chunk_size=CHUNK_SIZE, progress=None):
+    """
+    Raw cell values of each row, read ``chunk_size`` objects at a time.
+    ``progress(rows_so_far)`` is called after every chunk and at the end.
+    """
+    count = 0
+    for obj in queryset.iterator(chunk_size=chunk_size):
+        yield [column.value(obj) for column in columns]
+        count += 1
+        if progress is not None and count % chunk_size == 0:
+            progress(count)
+    if progress is not None:
+        progress(count)
+
+
+def _csv_chunks(queryset, columns, chunk_size):
+    # One yielded chunk per batch of rows: fewer, larger writes to the socket.
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([column.header for column in columns])
+    for i, row in enumerate(iter_rows(queryset, columns, chunk_size), start=1):
+        writer.writerow([csv_value(value) for value in row])
+        if i % 500 == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def csv_response(queryset, columns, filename, chunk_size=CHUNK_SIZE) -> StreamingHttpResponse:
+    response = StreamingHttpResponse(
+        _csv_chunks(queryset, columns, chunk_size),
+        content_type='text/csv; charset=utf-8',
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
+    return response
+
+
+def write_csv(output, queryset, columns, chunk_size=CHUNK_SIZE, progress=None) -> None:
+    """Write the CSV to the text file ``output`` (e.g. a ``gzip.open(..., 'wt')``)."""
+    writer = csv.writer(output)
+    writer.writerow([column.header for column in columns])
+    for row in iter_rows(queryset, columns, chunk_size, progress):
+        writer.writerow([csv_value(value) for value in row])
+
+
+def write_xlsx(output, queryset, columns, sheet_title='Dados', chunk_size=CHUNK_SIZE, progress=None) -> None:
+    """Write the workbook to the binary file ``output``."""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=sheet_title[:31])
+    sheet.append([column.header for column in columns])
+    for row in iter_rows(queryset, columns, chunk_size, progress):
+        sheet.append([xlsx_value(value) for value in row])
+    workbook.save(output)
+
+
+def xlsx_response(queryset, columns, filename, sheet_title='Dados', chunk_size=CHUNK_SIZE) -> FileResponse:
+    output = tempfile.TemporaryFile()
+    write_xlsx(output, queryset, columns, sheet_title=sheet_title, chunk_size=chunk_size)
+    output.seek(0)
+    # FileResponse closes the temporary file (and so deletes it) when done.
+    return FileResponse(
+        output,
+        as_attachment=True,
+        filename=f'{filename}.xlsx',
+        content_type=XLSX_CONTENT_TYPE,
+    )
+
+
+def export_response(queryset, columns, filename, fmt='csv', sheet_title='Dados', chunk_size=CHUNK_SIZE):
+    """CSV or XLSX download of ``queryset``; unknown formats raise ``ValueError``."""
+    if fmt == 'csv':
+        return csv_response(queryset, columns, filename, chunk_size=chunk_size)
+    if fmt == 'xlsx':
+        return xlsx_response(queryset, columns, filename, sheet_title=sheet_title, chunk_size=chunk_size)
+    raise ValueError(f'Unknown export format: {fmt}')
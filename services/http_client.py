@@ -0,0 +1,230 @@
+"""
+Shared outbound HTTP client for third-party integrations.
+
+Every integration (AbacatePay, Chess.com, Lichess) talks HTTP through one
+process-wide ``requests.Session`` so connections are kept alive and pooled per
+host instead of paying a new TCP+TLS handshake on every call.
+
+Each integration gets an ``OutboundClient`` with its own base URL, timeouts,
+retry policy and circuit breaker:
+
+* idempotent requests (GET/HEAD) are retried with exponential backoff on
+  connection errors, 429 and 5xx, honouring ``Retry-After``; POSTs are only
+  retried when the connection could not be established;
+* after ``failure_threshold`` consecutive failures the breaker opens and calls
+  fail immediately with ``CircuitOpenError`` for ``reset_timeout`` seconds,
+  after which a single trial call decides whether it closes again;
+* every call is timed per endpoint; ``metrics()`` returns the counters and each
+  call is logged on the ``clubpro.http`` logger.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger('clubpro.http')
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_session = requests.Session()
+_session_lock = threading.Lock()
+
+_metrics: dict[tuple[str, str], dict] = {}
+_metrics_lock = threading.Lock()
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """Raised instead of calling a provider whose circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker (closed → open → half-open)."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return 'closed'
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return 'half-open'
+        return 'open'
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half-open' and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+
+def _record(integration: str, endpoint: str, elapsed_ms: float, status, error: bool) -> None:
+    with _metrics_lock:
+        entry = _metrics.setdefault(
+            (integration, endpoint),
+            {'calls': 0, 'errors': 0, 'total_ms': 0.0, 'max_ms': 0.0},
+        )
+        entry['calls'] += 1
+        entry['errors'] += int(error)
+        entry['total_ms'] += elapsed_ms
+        entry['max_ms'] = max(entry['max_ms'], elapsed_ms)
+    logger.info(
+        'http integration=%s endpoint=%s status=%s duration_ms=%.1f',
+        integration, endpoint, status, elapsed_ms,
+    )
+
+
+def metrics() -> dict[str, dict]:
+    """Snapshot of the per-endpoint latency counters, keyed ``integration:endpoint``."""
+    with _metrics_lock:
+        return {
+            f'{integration}:{endpoint}': {
+                **entry,
+                'avg_ms': entry['total_ms'] / entry['calls'] if entry['calls'] else 0.0,
+            }
+            for (integration, endpoint), entry in _metrics.items()
+        }
+
+
+def build_adapter(retries: int = 2, backoff: float = 0.5, pool_size: int = 10) -> HTTPAdapter:
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=retries,
+        backoff_factor=backoff,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({'GET', 'HEAD', 'OPTIONS'}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    return HTTPAdapter(max_retries=retry, pool_connections=pool_size, pool_maxsize=pool_size)
+
+
+class OutboundClient:
+    """HTTP client for one integration, sharing the process-wide session."""
+
+    def __init__(
+        self,
+        name: str,
+        base_url: str = '',
+        *,
+        timeout=(3.05, 10),
+        retries: int = 2,
+        backoff: float = 0.5,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30,
+        headers: dict | None = None,
+    ):
+        self.name = name
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.headers = headers or {}
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self._adapter = build_adapter(retries, backoff)
+        self._mounted: set[str] = set()
+
+    @property
+    def session(self) -> requests.Session:
+        return _session
+
+    def mount(self, session: requests.Session, prefix: str) -> None:
+        """Mounts this client's retrying, pooled adapter for ``prefix`` on ``session``."""
+        session.mount(prefix, self._adapter)
+
+    def _ensure_mounted(self, url: str) -> None:
+        prefix = '/'.join(url.split('/', 3)[:3]) + '/'
+        if prefix in self._mounted:
+            return
+        with _session_lock:
+            _session.mount(prefix, self._adapter)
+        self._mounted.add(prefix)
+
+    @contextmanager
+    def track(self, endpoint: str):
+        """
+        Wraps a call made by other means (e.g. a third-party SDK) with the
+        circuit breaker and latency metrics of this integration.
+        """
+        if not self.breaker.allow():
+            _record(self.name, endpoint, 0.0, 'circuit-open', True)
+            raise CircuitOpenError(f'{self.name}: circuit open, skipping {endpoint}')
+        inicio = time.monotonic()
+        try:
+            yield
+        except Exception:
+            self.breaker.record_failure()
+            _record(self.name, endpoint, (time.monotonic() - inicio) * 1000, 'error', True)
+            raise
+        self.breaker.record_success()
+        _record(self.name, endpoint, (time.monotonic() - inicio) * 1000, 'ok', False)
+
+    def request(self, method: str, path: str, *, endpoint: str | None = None, **kwargs) -> requests.Response:
+        """
+        Sends a request to ``base_url + path``.
+
+        ``endpoint`` labels the metrics (defaults to ``path``); pass a template
+        such as ``'player/stats'`` when the path contains identifiers. Returns
+        the response for any HTTP status; only 5xx and transport errors count
+        as failures for the circuit breaker.
+        """
+        url = f'{self.base_url}{path}' if self.base_url else path
+        endpoint = endpoint or path
+        if not self.breaker.allow():
+            _record(self.name, endpoint, 0.0, 'circuit-open', True)
+            raise CircuitOpenError(f'{self.name}: circuit open, skipping {endpoint}')
+
+        self._ensure_mounted(url)
+        kwargs.setdefault('timeout', self.timeout)
+        if self.headers:
+            kwargs['headers'] = {**self.headers, **(kwargs.get('headers') or {})}
+
+        inicio = time.monotonic()
+        try:
+            response = _session.request(method, url, **kwargs)
+        except requests.RequestException:
+            self.breaker.record_failure()
+            _record(self.name, endpoint, (time.monotonic() - inicio) * 1000, 'error', True)
+            raise
+
+        failed = response.status_code >= 500
+        if failed:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        _record(self.name, endpoint, (time.monotonic() - inicio) * 1000, response.status_code, failed)
+        return response
+
+    def get(self, path: str, **kwargs) -> requests.Response:
+        return self.request('GET', path, **kwargs)
+
+    def post(self, path: str, **kwargs) -> requests.Response:
+        return self.request('POST', path, **kwargs)
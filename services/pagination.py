@@ -0,0 +1,231 @@
+"""
+Keyset (cursor) pagination for large staff listings.
+
+Django's ``Paginator`` runs ``COUNT(*)`` over the whole filtered set and
+fetches page N with ``OFFSET``, so both get slower the further you go. The
+``KeysetPaginator`` instead remembers the sort key of the last row shown and
+asks for the rows *after* it::
+
+    WHERE (numero_socio, id) > ('000123', 456) ORDER BY numero_socio, id LIMIT 21
+
+which an index on the sort columns answers directly. Page 5.000 costs the
+same as page 1. The trade-offs: navigation is first/previous/next only, and
+the total is counted only up to ``count_limit`` rows (then estimated by the
+PostgreSQL planner, or shown as "mais de N").
+
+``ordering`` must end in a unique column (``id``) so ties are broken
+deterministically, and its fields must be non-null model fields or
+annotations of the queryset.
+"""
+from __future__ import annotations
+
+import base64
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import Q
+from django.http import JsonResponse, QueryDict
+
+AFTER_PARAM = 'after'
+BEFORE_PARAM = 'before'
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class KeysetPage:
+    """One page of a keyset listing, iterable like a ``Page``."""
+
+    def __init__(self, paginator, object_list, has_next, has_previous, query_params):
+        self.paginator = paginator
+        self.object_list = object_list
+        self.has_next = has_next
+        self.has_previous = has_previous
+        self._query_params = query_params
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+    @property
+    def has_other_pages(self) -> bool:
+        return self.has_next or self.has_previous
+
+    @property
+    def next_cursor(self) -> str | None:
+        return self.paginator.encode_cursor(self.object_list[-1]) if self.has_next else None
+
+    @property
+    def previous_cursor(self) -> str | None:
+        return self.paginator.encode_cursor(self.object_list[0]) if self.has_previous else None
+
+    def _query(self, **cursor) -> str:
+        params = self._query_params.copy() if self._query_params is not None else QueryDict(mutable=True)
+        for name in (AFTER_PARAM, BEFORE_PARAM, 'page'):
+            params.pop(name, None)
+        for name, value in cursor.items():
+            params[name] = value
+        return params.urlencode()
+
+    @property
+    def first_query(self) -> str:
+        """Querystring (filters kept) of the first page."""
+        return self._query()
+
+    @property
+    def next_query(self) -> str:
+        return self._query(**{AFTER_PARAM: self.next_cursor}) if self.has_next else ''
+
+    @property
+    def previous_query(self) -> str:
+        return self._query(**{BEFORE_PARAM: self.previous_cursor}) if self.has_previous else ''
+
+
+class KeysetPaginator:
+    def __init__(self, queryset, ordering, per_page=20, count_limit=1000):
+        self.queryset = queryset
+        self.ordering = tuple(ordering)
+        self.per_page = per_page
+        self.count_limit = count_limit
+        self._fields = [(name.lstrip('-'), name.startswith('-')) for name in self.ordering]
+        self._count = None
+
+    # ------------------------------------------------------------------
+    # Cursors
+    # ------------------------------------------------------------------
+
+    def _output_field(self, name):
+        annotation = self.queryset.query.annotations.get(name)
+        if annotation is not None:
+            return annotation.output_field
+        return self.queryset.model._meta.get_field(name)
+
+    def encode_cursor(self, obj) -> str:
+        values = [getattr(obj, name) for name, _ in self._fields]
+        raw = json.dumps(values, cls=DjangoJSONEncoder, separators=(',', ':'))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor: str) -> list:
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            values = json.loads(raw)
+        except (ValueError, TypeError) as exc:
+            raise InvalidCursor(cursor) from exc
+        if not isinstance(values, list) or len(values) != len(self._fields):
+            raise InvalidCursor(cursor)
+        try:
+            return [self._output_field(name).to_python(value) for (name, _), value in zip(self._fields, values)]
+        except Exception as exc:
+            raise InvalidCursor(cursor) from exc
+
+    def _seek(self, values, backwards):
+        # (a, b) > (x, y)  ==  a > x OR (a = x AND b > y), per column direction.
+        # The redundant a >= x in front gives the planner an index range to
+        # start from instead of filtering the index from its first entry.
+        condition = Q()
+        for i, (name, descending) in enumerate(self._fields):
+            lookup = 'lt' if descending != backwards else 'gt'
+            equal = {prev: values[j] for j, (prev, _) in enumerate(self._fields[:i])}
+            condition |= Q(**equal, **{f'{name}__{lookup}': values[i]})
+        name, descending = self._fields[0]
+        return Q(**{f"{name}__{'lte' if descending != backwards else 'gte'}": values[0]}) & condition
+
+    # ------------------------------------------------------------------
+    # Pages
+    # ------------------------------------------------------------------
+
+    def get_page(self, request=None, *, after=None, before=None) -> KeysetPage:
+        """
+        Page after/before the given cursors; with ``request`` they are read from
+        ``?after=``/``?before=``. An unreadable cursor falls back to the first page.
+        """
+        query_params = request.GET if request is not None else None
+        if request is not None:
+            after = request.GET.get(AFTER_PARAM) or after
+            before = request.GET.get(BEFORE_PARAM) or before
+
+        queryset = self.queryset
+        backwards = False
+        try:
+            if after:
+                queryset = queryset.filter(self._seek(self.decode_cursor(after), backwards=False))
+            elif before:
+                backwards = True
+                queryset = queryset.filter(self._seek(self.decode_cursor(before), backwards=True))
+        except InvalidCursor:
+            queryset, after, before, backwards = self.queryset, None, None, False
+
+        ordering = self.ordering
+        if backwards:
+            ordering = tuple(name[1:] if name.startswith('-') else f'-{name}' for name in ordering)
+        rows = list(queryset.order_by(*ordering)[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backwards:
+            rows.reverse()
+            return KeysetPage(self, rows, has_next=True, has_previous=has_more, query_params=query_params)
+        return KeysetPage(self, rows, has_next=has_more, has_previous=bool(after), query_params=query_params)
+
+    # ------------------------------------------------------------------
+    # Totals
+    # ------------------------------------------------------------------
+
+    def count_info(self) -> tuple[int, bool]:
+        """
+        ``(total, exact)``. Counts at most ``count_limit + 1`` rows; beyond that
+        PostgreSQL's planner estimate is used (or ``count_limit`` elsewhere).
+        """
+        if self._count is None:
+            base = self.queryset.order_by()
+            total = base[:self.count_limit + 1].count()
+            if total <= self.count_limit:
+                self._count = (total, True)
+            else:
+                self._count = (max(self._estimate(base), self.count_limit + 1), False)
+        return self._count
+
+    def _estimate(self, queryset) -> int:
+        if connections[queryset.db].vendor != 'postgresql':
+            return 0
+        plan = json.loads(queryset.explain(format='json'))
+        return int(plan[0]['Plan']['Plan Rows'])
+
+    @property
+    def count(self) -> int:
+        return self.count_info()[0]
+
+    @property
+    def count_is_exact(self) -> bool:
+        return self.count_info()[1]
+
+    @property
+    def count_display(self) -> str:
+        total, exact = self.count_info()
+        if exact:
+            return str(total)
+        if connections[self.queryset.db].vendor == 'postgresql':
+            return f'~{total}'
+        return f'mais de {self.count_limit}'
+
+
+def json_page(page: KeysetPage, serialize) -> JsonResponse:
+    """
+    Infinite-scroll payload: ``results`` plus the cursor to send as ``?after=``
+    for the next batch. The total is only computed for the first batch.
+    """
+    data = {
+        'results': [serialize(obj) for obj in page],
+        'next': page.next_cursor,
+        'has_next': page.has_next,
+    }
+    if not page.has_previous:
+        data['count'] = page.paginator.count
+        data['count_exact'] = page.paginator.count_is_exact
+    return JsonResponse(data)
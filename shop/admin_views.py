@@ -5,14 +5,19 @@ Designed for non-technical business admins
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
-from django.core.paginator import Paginator
 from django.db.models import Q, Count, Sum
+from django.urls import reverse
 from django.utils import timezone
 from django.views.decorators.http import require_POST
 from decimal import Decimal
 
+from services.exports import export_response
+from services.pagination import KeysetPaginator, json_page
+
 from .models import Product, Category, Order, OrderItem
 from .forms import ProductForm, CategoryForm, OrderForm
+from .estoque import converter_reservas, liberar_reservas
+from .exports import ORDER_COLUMNS
 
 
 def is_shop_admin(user):
@@ -67,17 +72,9 @@ def shop_admin_dashboard(request):
     return render(request, 'shop/admin/dashboard.html', context)
 
 
-@login_required
-@user_passes_test(is_shop_admin)
-def product_list_admin(request):
-    """List all products with management options"""
+def _product_page(request, search, category_filter, status_filter):
     products = Product.objects.select_related('category').all()
     
-    # Filters
-    search = request.GET.get('search', '')
-    category_filter = request.GET.get('category', '')
-    status_filter = request.GET.get('status', '')
-    
     if search:
         products = products.filter(
             Q(name__icontains=search) |
@@ -97,10 +94,18 @@ def product_list_admin(request):
     elif status_filter == 'low_stock':
         products = products.filter(stock__lt=10, stock__gt=0)
     
-    # Pagination
-    paginator = Paginator(products, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Cursor pagination: newest first, no OFFSET
+    return KeysetPaginator(products, ('-created_at', '-id'), per_page=20).get_page(request)
+
+
+@login_required
+@user_passes_test(is_shop_admin)
+def product_list_admin(request):
+    """List all products with management options"""
+    search = request.GET.get('search', '')
+    category_filter = request.GET.get('category', '')
+    status_filter = request.GET.get('status', '')
+    page_obj = _product_page(request, search, category_filter, status_filter)
     
     categories = Category.objects.filter(is_active=True)
     
@@ -115,6 +120,29 @@ def product_list_admin(request):
     return render(request, 'shop/admin/product_list.html', context)
 
 
+@login_required
+@user_passes_test(is_shop_admin)
+def product_list_admin_json(request):
+    """Products as JSON for infinite scroll (``?after=<next>``)"""
+    page_obj = _product_page(
+        request,
+        request.GET.get('search', ''),
+        request.GET.get('category', ''),
+        request.GET.get('status', ''),
+    )
+    return json_page(page_obj, lambda product: {
+        'id': product.id,
+        'name': product.name,
+        'sku': product.sku,
+        'category': product.category.name if product.category else None,
+        'price': product.price,
+        'stock': product.stock,
+        'is_active': product.is_active,
+        'created_at': product.created_at,
+        'url': reverse('shop:admin_product_edit', args=[product.id]),
+    })
+
+
 @login_required
 @user_passes_test(is_shop_admin)
 def product_create(request):
@@ -235,16 +263,8 @@ def category_edit(request, category_id):
     return render(request, 'shop/admin/category_form.html', context)
 
 
-@login_required
-@user_passes_test(is_shop_admin)
-def order_list_admin(request):
-    """List all orders"""
-    orders = Order.objects.select_related('user').prefetch_related('items').all()
-    
-    # Filters
-    status_filter = request.GET.get('status', '')
-    payment_filter = request.GET.get('payment_status', '')
-    search = request.GET.get('search', '')
+def _filter_orders(status_filter, payment_filter, search):
+    orders = Order.objects.select_related('user').all()
     
     if status_filter:
         orders = orders.filter(status=status_filter)
@@ -259,10 +279,23 @@ def order_list_admin(request):
             Q(customer_email__icontains=search)
         )
     
-    # Pagination
-    paginator = Paginator(orders, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    return orders
+
+
+def _order_page(request, status_filter, payment_filter, search):
+    orders = _filter_orders(status_filter, payment_filter, search).prefetch_related('items')
+    # Cursor pagination: newest first, no OFFSET
+    return KeysetPaginator(orders, ('-created_at', '-id'), per_page=20).get_page(request)
+
+
+@login_required
+@user_passes_test(is_shop_admin)
+def order_list_admin(request):
+    """List all orders"""
+    status_filter = request.GET.get('status', '')
+    payment_filter = request.GET.get('payment_status', '')
+    search = request.GET.get('search', '')
+    page_obj = _order_page(request, status_filter, payment_filter, search)
     
     context = {
         'orders': page_obj,
@@ -274,6 +307,44 @@ def order_list_admin(request):
     return render(request, 'shop/admin/order_list.html', context)
 
 
+@login_required
+@user_passes_test(is_shop_admin)
+def order_list_admin_json(request):
+    """Orders as JSON for infinite scroll (``?after=<next>``)"""
+    page_obj = _order_page(
+        request,
+        request.GET.get('status', ''),
+        request.GET.get('payment_status', ''),
+        request.GET.get('search', ''),
+    )
+    return json_page(page_obj, lambda order: {
+        'order_number': order.order_number,
+        'customer_name': order.customer_name,
+        'customer_email': order.customer_email,
+        'status': order.status,
+        'status_display': order.get_status_display(),
+        'payment_status': order.payment_status,
+        'payment_status_display': order.get_payment_status_display(),
+        'total': order.total,
+        'items': len(order.items.all()),
+        'created_at': order.created_at,
+        'url': reverse('shop:admin_order_detail', args=[order.order_number]),
+    })
+
+
+@login_required
+@user_passes_test(is_shop_admin)
+def order_export_admin(request, fmt='csv'):
+    """Export orders (same filters as the order list) to CSV or XLSX, streamed"""
+    orders = _filter_orders(
+        request.GET.get('status', ''),
+        request.GET.get('payment_status', ''),
+        request.GET.get('search', ''),
+    ).annotate(item_count=Count('items')).order_by('-created_at', '-id')
+    filename = f'pedidos_{timezone.localtime().strftime("%Y%m%d_%H%M%S")}'
+    return export_response(orders, ORDER_COLUMNS, filename, fmt, sheet_title='Pedidos')
+
+
 @login_required
 @user_passes_test(is_shop_admin)
 def order_detail_admin(request, order_number):
@@ -281,9 +352,16 @@ def order_detail_admin(request, order_number):
     order = get_object_or_404(Order, order_number=order_number)
     
     if request.method == 'POST':
+        estava_pago = order.payment_status == 'paid'
         form = OrderForm(request.POST, instance=order)
         if form.is_valid():
             order = form.save()
+            # Pagamento confirmado manualmente baixa o estoque reservado;
+            # cancelamento devolve a reserva.
+            if order.payment_status == 'paid' and not estava_pago:
+                converter_reservas(order)
+            elif order.status == 'cancelled' or order.payment_status in ('failed', 'refunded'):
+                liberar_reservas(order)
             messages.success(request, f'Pedido {order.order_number} atualizado com sucesso!')
             return redirect('shop:admin_order_list')
     else:
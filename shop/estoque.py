@@ -0,0 +1,181 @@
+"""
+Reserva de estoque dos pedidos da loja.
+
+``Product.stock`` é o estoque físico e ``Product.reserved_stock`` o que está
+preso em pedidos aguardando pagamento; só ``stock - reserved_stock`` pode ser
+vendido. Toda alteração é um UPDATE condicional com ``F()``, então dois
+checkouts simultâneos nunca vendem a mesma unidade:
+
+* ``reservar_estoque`` (na criação do pedido) soma a quantidade em
+  ``reserved_stock`` apenas se ainda houver saldo disponível;
+* ``converter_reservas`` (no pagamento) baixa ``stock`` e ``reserved_stock``;
+* ``liberar_reservas`` (cancelamento) e ``liberar_reservas_expiradas``
+  (tarefa periódica) devolvem o saldo reservado.
+
+Os produtos de um pedido são sempre atualizados em ordem de ``id`` dentro de
+uma única transação, para que pedidos concorrentes travem as linhas na mesma
+ordem e não entrem em deadlock.
+"""
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from services.cache import invalidate_on_commit
+
+from .models import Product, StockReservation
+
+logger = logging.getLogger(__name__)
+
+
+class EstoqueInsuficiente(Exception):
+    """Não há saldo disponível para reservar um produto do pedido."""
+
+    def __init__(self, product_id: int, nome: str = ''):
+        self.product_id = product_id
+        self.nome = nome
+        super().__init__(f'Estoque insuficiente para {nome or product_id}')
+
+
+def _quantidades_por_produto(itens) -> list[tuple[int, int]]:
+    """Soma as quantidades por produto e ordena por id (ordem de travamento)."""
+    quantidades = defaultdict(int)
+    for product_id, quantidade in itens:
+        quantidades[product_id] += quantidade
+    return sorted(quantidades.items())
+
+
+def reservar_estoque(order, itens, ttl: timedelta | None = None) -> list[StockReservation]:
+    """
+    Reserva ``itens`` (pares ``(product_id, quantidade)``) para ``order``.
+
+    Tudo ou nada: se algum produto não tiver saldo, levanta
+    ``EstoqueInsuficiente`` e a transação desfaz as reservas já feitas.
+    """
+    ttl = ttl or timedelta(minutes=settings.SHOP_RESERVA_ESTOQUE_MINUTOS)
+    expira_em = timezone.now() + ttl
+    reservas = []
+
+    with transaction.atomic():
+        for product_id, quantidade in _quantidades_por_produto(itens):
+            reservado = Product.objects.filter(
+                pk=product_id,
+                stock__gte=F('reserved_stock') + quantidade,
+            ).update(reserved_stock=F('reserved_stock') + quantidade)
+            if not reservado:
+                nome = Product.objects.filter(pk=product_id).values_list('name', flat=True).first()
+                raise EstoqueInsuficiente(product_id, nome or '')
+            reservas.append(StockReservation(
+                order=order,
+                product_id=product_id,
+                quantity=quantidade,
+                expires_at=expira_em,
+            ))
+        StockReservation.objects.bulk_create(reservas)
+        invalidate_on_commit(Product)
+
+    return reservas
+
+
+def converter_reservas(order) -> None:
+    """
+    Baixa do estoque físico as unidades do pedido pago.
+
+    Reservas ativas são convertidas. Se a reserva já tinha expirado, tenta
+    baixar direto do saldo disponível; sem saldo, o pedido fica registrado
+    como pago e o problema vai para o log para a equipe resolver.
+    """
+    with transaction.atomic():
+        # A vitrine em cache mostra "em estoque"/"esgotado".
+        invalidate_on_commit(Product)
+        reservas = list(
+            StockReservation.objects.select_for_update()
+            .filter(order=order)
+            .order_by('product_id')
+        )
+        if not reservas:
+            # Pedido anterior às reservas: baixa direto, sem deixar negativo.
+            itens = [(item.product_id, item.quantity) for item in order.items.all()]
+            for product_id, quantidade in _quantidades_por_produto(itens):
+                _baixar_disponivel(order, product_id, quantidade)
+            return
+
+        pendentes = [r for r in reservas if r.status != StockReservation.STATUS_CONVERTED]
+        agora = timezone.now()
+        for reserva in pendentes:
+            if reserva.status == StockReservation.STATUS_ACTIVE:
+                Product.objects.filter(pk=reserva.product_id).update(
+                    stock=F('stock') - reserva.quantity,
+                    reserved_stock=F('reserved_stock') - reserva.quantity,
+                )
+            else:
+                _baixar_disponivel(order, reserva.product_id, reserva.quantity)
+            reserva.status = StockReservation.STATUS_CONVERTED
+            reserva.updated_at = agora
+
+        StockReservation.objects.bulk_update(pendentes, ['status', 'updated_at'])
+
+
+def _baixar_disponivel(order, product_id: int, quantidade: int) -> None:
+    baixado = Product.objects.filter(
+        pk=product_id,
+        stock__gte=F('reserved_stock') + quantidade,
+    ).update(stock=F('stock') - quantidade)
+    if not baixado:
+        logger.error(
+            "Pedido %s pago sem estoque disponível para o produto %s (%d unidade(s))",
+            order.order_number,
+            product_id,
+            quantidade,
+        )
+
+
+def _liberar(reservas) -> int:
+    """Devolve o saldo de reservas ativas já travadas pela transação corrente."""
+    itens = [(reserva.product_id, reserva.quantity) for reserva in reservas]
+    for product_id, quantidade in _quantidades_por_produto(itens):
+        Product.objects.filter(pk=product_id).update(
+            reserved_stock=F('reserved_stock') - quantidade,
+        )
+    agora = timezone.now()
+    for reserva in reservas:
+        reserva.status = StockReservation.STATUS_RELEASED
+        reserva.updated_at = agora
+    StockReservation.objects.bulk_update(reservas, ['status', 'updated_at'])
+    invalidate_on_commit(Product)
+    return len(reservas)
+
+
+def liberar_reservas(order) -> int:
+    """Libera as reservas ativas de um pedido cancelado."""
+    with transaction.atomic():
+        reservas = list(
+            StockReservation.objects.select_for_update()
+            .filter(order=order, status=StockReservation.STATUS_ACTIVE)
+            .order_by('product_id')
+        )
+        return _liberar(reservas)
+
+
+def liberar_reservas_expiradas(tamanho_lote: int = 500) -> int:
+    """Libera, em lotes, as reservas ativas que passaram do prazo. Retorna quantas foram liberadas."""
+    total = 0
+    while True:
+        with transaction.atomic():
+            reservas = list(
+                StockReservation.objects.select_for_update()
+                .filter(status=StockReservation.STATUS_ACTIVE, expires_at__lt=timezone.now())
+                .order_by('product_id', 'pk')[:tamanho_lote]
+            )
+            total += _liberar(reservas)
+        if len(reservas) < tamanho_lote:
+            break
+    if total:
+        logger.info("Estoque: %d reserva(s) expirada(s) liberada(s)", total)
+    return total
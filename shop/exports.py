@@ -0,0 +1,23 @@
+"""
+Columns of the shop order export (see services.exports).
+"""
+from services.exports import Column
+
+ORDER_COLUMNS = [
+    Column('Pedido', lambda o: o.order_number),
+    Column('Data', lambda o: o.created_at),
+    Column('Cliente', lambda o: o.customer_name),
+    Column('E-mail', lambda o: o.customer_email),
+    Column('Telefone', lambda o: o.customer_phone),
+    Column('CPF', lambda o: o.customer_cpf),
+    Column('Usuário', lambda o: o.user.username if o.user else ''),
+    Column('Itens', lambda o: o.item_count),
+    Column('Subtotal', lambda o: o.subtotal),
+    Column('Desconto', lambda o: o.discount),
+    Column('Total', lambda o: o.total),
+    Column('Status', lambda o: o.get_status_display()),
+    Column('Pagamento', lambda o: o.get_payment_status_display()),
+    Column('Método', lambda o: o.get_payment_method_display()),
+    Column('Cidade', lambda o: o.shipping_city),
+    Column('Estado', lambda o: o.shipping_state),
+]
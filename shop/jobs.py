@@ -0,0 +1,33 @@
+"""
+Periodic shop jobs (run by ``manage.py run_jobs``).
+
+Unpaid orders are reconciled together with membership billings by the
+``socios.reconciliar_cobrancas`` job.
+"""
+from datetime import timedelta
+
+from django.utils import timezone
+
+from scheduler.registry import register_job
+
+from .estoque import liberar_reservas_expiradas
+from .models import Cart
+
+# Carts untouched for this long are considered abandoned.
+CART_MAX_AGE = timedelta(days=30)
+
+
+@register_job('shop.limpar_carrinhos', interval=timedelta(days=1), jitter=timedelta(hours=1))
+def limpar_carrinhos():
+    """Deletes anonymous carts and empty user carts that were abandoned."""
+    limite = timezone.now() - CART_MAX_AGE
+    abandonados = Cart.objects.filter(updated_at__lt=limite).exclude(items__updated_at__gte=limite)
+    anonimos, _ = abandonados.filter(user__isnull=True).delete()
+    vazios, _ = abandonados.filter(user__isnull=False, items__isnull=True).delete()
+    return f'{anonimos + vazios} registro(s) removido(s)'
+
+
+@register_job('shop.liberar_reservas', interval=timedelta(minutes=5), jitter=timedelta(seconds=30))
+def liberar_reservas():
+    """Returns stock held by unpaid orders whose reservation expired."""
+    return f'{liberar_reservas_expiradas()} reserva(s) liberada(s)'
@@ -0,0 +1,176 @@
+import queue
+import statistics
+import threading
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Sum
+
+from shop.estoque import EstoqueInsuficiente
+from shop.models import Cart, CartItem, Order, OrderItem, Product, StockReservation
+from shop.pricing import PricingContext
+from shop.services import place_order
+
+DADOS_CLIENTE = {
+    'customer_name': 'Benchmark',
+    'customer_email': 'benchmark@clubpro.local',
+    'customer_phone': '(00) 00000-0000',
+    'shipping_address': 'Rua do Benchmark, 1',
+    'shipping_city': 'Rio de Janeiro',
+    'shipping_state': 'RJ',
+    'shipping_zip': '00000-000',
+    'payment_method': 'bank_transfer',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Mede a vazão de shop.services.place_order com pedidos de N itens feitos '
+        'em paralelo e confere que nenhum produto foi vendido além do estoque. '
+        'Cria produtos e carrinhos temporários e os remove ao final. '
+        'Use com PostgreSQL: no SQLite as escritas concorrentes se serializam.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--orders', type=int, default=200, help='Quantidade de pedidos. Padrão: 200')
+        parser.add_argument('--items', type=int, default=5, help='Itens (produtos distintos) por pedido. Padrão: 5')
+        parser.add_argument('--threads', type=int, default=8, help='Pedidos feitos em paralelo. Padrão: 8')
+        parser.add_argument(
+            '--stock',
+            type=int,
+            help='Estoque de cada produto. Padrão: igual a --orders (todos os pedidos cabem); '
+                 'use um valor menor para simular uma venda relâmpago esgotando',
+        )
+        parser.add_argument('--keep', action='store_true', help='Não remove os dados criados')
+
+    def handle(self, *args, **options):
+        total_pedidos = options['orders']
+        itens = options['items']
+        threads = options['threads']
+        estoque = options['stock'] if options['stock'] is not None else total_pedidos
+        if min(total_pedidos, itens, threads) < 1:
+            raise CommandError('--orders, --items e --threads devem ser maiores que zero.')
+
+        prefixo = f'bench-{uuid.uuid4().hex[:6]}'
+        Product.objects.bulk_create([
+            Product(
+                name=f'Benchmark {i}',
+                slug=f'{prefixo}-{i}',
+                sku=f'{prefixo}-{i}'.upper(),
+                description='Produto temporário do benchmark',
+                price=10,
+                stock=estoque,
+            )
+            for i in range(itens)
+        ])
+        produtos = list(Product.objects.filter(slug__startswith=prefixo).order_by('id'))
+        Cart.objects.bulk_create([
+            Cart(session_key=f'{prefixo}-{i}') for i in range(total_pedidos)
+        ])
+        carrinhos = list(Cart.objects.filter(session_key__startswith=prefixo))
+        CartItem.objects.bulk_create([
+            CartItem(cart=carrinho, product=produto, quantity=1)
+            for carrinho in carrinhos
+            for produto in produtos
+        ])
+
+        self.stdout.write(
+            f'{total_pedidos} pedido(s) de {itens} item(ns), {threads} em paralelo, '
+            f'estoque de {estoque} por produto ({connection.vendor})'
+        )
+
+        fila = queue.Queue()
+        for carrinho in carrinhos:
+            fila.put(carrinho)
+        latencias, resultados = [], {'ok': 0, 'sem_estoque': 0, 'erros': 0}
+        lock = threading.Lock()
+
+        def trabalhador():
+            pricing = PricingContext()
+            try:
+                while True:
+                    try:
+                        carrinho = fila.get_nowait()
+                    except queue.Empty:
+                        return
+                    inicio = time.perf_counter()
+                    try:
+                        place_order(
+                            cart=carrinho,
+                            priced_cart=carrinho.priced(pricing),
+                            user=None,
+                            dados=DADOS_CLIENTE,
+                        )
+                        chave = 'ok'
+                    except EstoqueInsuficiente:
+                        chave = 'sem_estoque'
+                    except Exception as exc:
+                        self.stderr.write(f'Erro: {exc}')
+                        chave = 'erros'
+                    with lock:
+                        resultados[chave] += 1
+                        latencias.append((time.perf_counter() - inicio) * 1000)
+            finally:
+                connection.close()
+
+        inicio = time.perf_counter()
+        workers = [threading.Thread(target=trabalhador) for _ in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        duracao = time.perf_counter() - inicio
+
+        latencias.sort()
+        p95 = latencias[int(len(latencias) * 0.95) - 1] if latencias else 0
+        self.stdout.write(
+            f"Concluído em {duracao:.2f}s: {resultados['ok']} pedido(s) criados, "
+            f"{resultados['sem_estoque']} recusado(s) por falta de estoque, {resultados['erros']} erro(s)"
+        )
+        self.stdout.write(
+            f"Vazão: {resultados['ok'] / max(duracao, 0.001):.1f} pedidos/s | "
+            f"latência p50 {statistics.median(latencias) if latencias else 0:.1f} ms, "
+            f"p95 {p95:.1f} ms, máx {latencias[-1] if latencias else 0:.1f} ms"
+        )
+
+        consistente = self._conferir_estoque(produtos, estoque, resultados['ok'])
+        if not options['keep']:
+            self._limpar(prefixo)
+        if not consistente:
+            raise CommandError('Estoque inconsistente após o benchmark.')
+
+    def _conferir_estoque(self, produtos, estoque, pedidos_ok):
+        consistente = True
+        reservado_por_produto = dict(
+            StockReservation.objects.filter(
+                product__in=produtos, status=StockReservation.STATUS_ACTIVE,
+            ).values_list('product').annotate(total=Sum('quantity'))
+        )
+        for produto in Product.objects.filter(pk__in=[p.pk for p in produtos]):
+            reservado = reservado_por_produto.get(produto.pk, 0)
+            if (
+                produto.reserved_stock != reservado
+                or produto.reserved_stock > produto.stock
+                or reservado != pedidos_ok
+                or produto.stock != estoque
+            ):
+                consistente = False
+                self.stderr.write(
+                    f'{produto.name}: estoque {produto.stock}, reservado {produto.reserved_stock}, '
+                    f'reservas ativas {reservado}, pedidos {pedidos_ok}'
+                )
+        if consistente:
+            self.stdout.write(self.style.SUCCESS('Estoque consistente: nenhuma unidade vendida em excesso.'))
+        return consistente
+
+    def _limpar(self, prefixo):
+        pedidos = list(
+            Order.objects.filter(items__product__slug__startswith=prefixo).values_list('pk', flat=True).distinct()
+        )
+        StockReservation.objects.filter(product__slug__startswith=prefixo).delete()
+        OrderItem.objects.filter(product__slug__startswith=prefixo).delete()
+        Order.objects.filter(pk__in=pedidos).delete()
+        Cart.objects.filter(session_key__startswith=prefixo).delete()
+        Product.objects.filter(slug__startswith=prefixo).delete()
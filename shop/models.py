@@ -58,6 +58,11 @@ class Product(models.Model):
     
     # Inventory
     stock = models.IntegerField(default=0, verbose_name="Estoque")
+    reserved_stock = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Estoque Reservado",
+        help_text="Unidades presas em pedidos aguardando pagamento (mantido por shop.estoque)"
+    )
     sku = models.CharField(
         max_length=50,
         unique=True,
@@ -104,6 +109,10 @@ class Product(models.Model):
         verbose_name = "Produto"
         verbose_name_plural = "Produtos"
         ordering = ['-created_at']
+        indexes = [
+            # Listagem do admin paginada por cursor em (-created_at, -id).
+            models.Index(fields=['created_at', 'id'], name='shop_produto_criado_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -111,6 +120,13 @@ class Product(models.Model):
     def save(self, *args, **kwargs):
         if not self.sku:
             self.sku = f"PROD-{uuid.uuid4().hex[:8].upper()}"
+        # reserved_stock só muda por UPDATE condicional em shop.estoque; um
+        # save() completo com a instância antiga não pode sobrescrevê-lo.
+        if self.pk and not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'reserved_stock'
+            ]
         super().save(*args, **kwargs)
 
     def get_absolute_url(self):
@@ -118,22 +134,17 @@ class Product(models.Model):
 
     def get_price_for_user(self, user=None):
         """Get price with member discount if applicable"""
-        price = self.price
-        if user and user.is_authenticated:
-            # Check if user is a member (socio)
-            try:
-                from socios.models import Socio
-                socio = Socio.objects.get(usuario=user, status='ativo')
-                if self.member_discount_percent > 0:
-                    discount = price * (self.member_discount_percent / 100)
-                    price = price - discount
-            except:
-                pass
-        return price
+        from .pricing import PricingContext
+        return PricingContext(user).price_for(self)
+
+    @property
+    def available_stock(self):
+        """Units that can still be sold (on hand minus reserved)"""
+        return max(0, self.stock - self.reserved_stock)
 
     @property
     def in_stock(self):
-        return self.stock > 0
+        return self.available_stock > 0
 
     @property
     def member_price(self):
@@ -185,13 +196,18 @@ class Cart(models.Model):
             return f"Cart - {self.user.username}"
         return f"Cart - {self.session_key}"
 
+    def priced(self, pricing=None):
+        """Items priced for the cart owner (see ``shop.pricing``)"""
+        from .pricing import PricingContext, price_cart
+        return price_cart(self, pricing or PricingContext(self.user))
+
     def get_total(self):
         """Calculate cart total"""
-        return sum(item.get_total() for item in self.items.all())
+        return self.priced().total
 
     def get_item_count(self):
         """Get total number of items"""
-        return sum(item.quantity for item in self.items.all())
+        return self.items.aggregate(total=models.Sum('quantity'))['total'] or 0
 
 
 class CartItem(models.Model):
@@ -332,6 +348,10 @@ class Order(models.Model):
         verbose_name = "Pedido"
         verbose_name_plural = "Pedidos"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['payment_status', 'created_at'], name='shop_pedido_pagamento_idx'),
+            models.Index(fields=['created_at', 'id'], name='shop_pedido_criado_idx'),
+        ]
 
     def __str__(self):
         return f"Order {self.order_number}"
@@ -345,6 +365,51 @@ class Order(models.Model):
         return reverse('shop:order_detail', kwargs={'order_number': self.order_number})
 
 
+class StockReservation(models.Model):
+    """Stock held for an order until it is paid, cancelled or expires"""
+    STATUS_ACTIVE = 'active'
+    STATUS_CONVERTED = 'converted'
+    STATUS_RELEASED = 'released'
+
+    STATUS_CHOICES = [
+        (STATUS_ACTIVE, 'Ativa'),
+        (STATUS_CONVERTED, 'Convertida'),
+        (STATUS_RELEASED, 'Liberada'),
+    ]
+
+    order = models.ForeignKey(
+        Order,
+        on_delete=models.CASCADE,
+        related_name='reservations'
+    )
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.PROTECT,
+        related_name='reservations'
+    )
+    quantity = models.PositiveIntegerField()
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=STATUS_ACTIVE,
+        verbose_name="Status"
+    )
+    expires_at = models.DateTimeField(verbose_name="Expira em")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Reserva de Estoque"
+        verbose_name_plural = "Reservas de Estoque"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'expires_at'], name='shop_reserva_expira_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.quantity}x {self.product.name} ({self.order.order_number})"
+
+
 class OrderItem(models.Model):
     """Items in an order"""
     order = models.ForeignKey(
@@ -0,0 +1,86 @@
+"""
+Preços da loja para o usuário corrente.
+
+``PricingContext`` descobre uma única vez por requisição se o usuário é sócio
+ativo (e, portanto, tem direito ao desconto de sócio). ``price_cart`` carrega
+os itens do carrinho com o produto em uma consulta e calcula os totais de
+linha e do carrinho em uma passada; o ``PricedCart`` resultante é usado pela
+página do carrinho, pelo checkout e pela criação do pedido.
+"""
+from __future__ import annotations
+
+from decimal import Decimal
+
+
+class PricingContext:
+    """Resolves the member discount for one user, at most one query."""
+
+    def __init__(self, user=None, request=None):
+        self.user = user if user is not None and user.is_authenticated else None
+        self.request = request
+        self._is_member = None
+
+    @classmethod
+    def for_request(cls, request) -> 'PricingContext':
+        """Returns the context cached on ``request`` (one per request)."""
+        context = getattr(request, '_pricing_context', None)
+        if context is None:
+            context = cls(getattr(request, 'user', None), request=request)
+            request._pricing_context = context
+        return context
+
+    @property
+    def is_member(self) -> bool:
+        if self._is_member is None:
+            if self.user is None:
+                self._is_member = False
+            elif self.request is not None and hasattr(self.request, 'is_active_member'):
+                # Shares the lookup made by socios.middleware.SocioMiddleware.
+                self._is_member = bool(self.request.is_active_member)
+            else:
+                from socios.models import Socio
+                self._is_member = Socio.objects.filter(usuario=self.user, status='ativo').exists()
+        return self._is_member
+
+    def price_for(self, product) -> Decimal:
+        if self.is_member and product.member_discount_percent > 0:
+            return product.member_price
+        return product.price
+
+
+class PricedLine:
+    """A cart item with its resolved unit price and line total."""
+
+    def __init__(self, item, unit_price: Decimal):
+        self.item = item
+        self.id = item.id
+        self.product = item.product
+        self.quantity = item.quantity
+        self.unit_price = unit_price
+        self.total = unit_price * item.quantity
+
+
+class PricedCart:
+    """Cart items priced for one user, with the totals computed once."""
+
+    def __init__(self, cart, lines: list[PricedLine]):
+        self.cart = cart
+        self.lines = lines
+        self.subtotal = sum((line.total for line in lines), Decimal('0.00'))
+        self.total = self.subtotal
+        self.item_count = sum(line.quantity for line in lines)
+
+    def __iter__(self):
+        return iter(self.lines)
+
+    def __len__(self):
+        return len(self.lines)
+
+    def __bool__(self):
+        return bool(self.lines)
+
+
+def price_cart(cart, pricing: PricingContext) -> PricedCart:
+    """Prices every item of ``cart`` with one query for items and products."""
+    items = cart.items.select_related('product').order_by('created_at')
+    return PricedCart(cart, [PricedLine(item, pricing.price_for(item.product)) for item in items])
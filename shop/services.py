@@ -1,5 +1,5 @@
 """
-AbacatePay integration service for shop order payments.
+Shop order placement and the AbacatePay integration for order payments.
 """
 from __future__ import annotations
 
@@ -7,8 +7,13 @@ import logging
 from abacatepay.billings.models import Billing
 from abacatepay.constants import BASE_URL, USER_AGENT
 from django.conf import settings
+from django.db import transaction
+from django.urls import reverse
 from socios.services import _api_key, _post_billing, sanitize_abacatepay_url
 
+from .estoque import reservar_estoque
+from .models import Order, OrderItem
+
 logger = logging.getLogger(__name__)
 
 
@@ -26,7 +31,7 @@ def criar_cobranca_pedido(
     return_url = sanitize_abacatepay_url(return_url)
     completion_url = sanitize_abacatepay_url(completion_url)
     products_payload = []
-    for item in order.items.all():
+    for item in order.items.select_related('product'):
         # Valor em centavos
         valor_cents = int(item.price * 100)
         products_payload.append({
@@ -58,3 +63,75 @@ def criar_cobranca_pedido(
         "billing_url": billing.url,
         "valor_cents": int(order.total * 100),
     }
+
+
+# Métodos pagos online pelo AbacatePay; os demais são confirmados pela equipe.
+METODOS_ONLINE = ('pix', 'credit_card')
+
+CAMPOS_CLIENTE = (
+    'customer_name', 'customer_email', 'customer_phone', 'customer_cpf',
+    'shipping_address', 'shipping_city', 'shipping_state', 'shipping_zip',
+    'payment_method', 'notes',
+)
+
+
+def place_order(*, cart, priced_cart, user, dados: dict, base_url: str | None = None) -> Order:
+    """
+    Places an order for ``priced_cart`` in a single transaction.
+
+    Creates the order, bulk-creates its items from the already priced lines,
+    reserves stock (raising ``shop.estoque.EstoqueInsuficiente`` if any
+    product ran out, in which case nothing is saved) and empties the cart.
+
+    For online payment methods the AbacatePay billing is created only after
+    the transaction commits, so a slow or failing provider never holds row
+    locks nor rolls the order back; when ``place_order`` is called outside an
+    outer transaction the billing fields are already filled on return.
+    """
+    with transaction.atomic():
+        order = Order.objects.create(
+            user=user if user is not None and user.is_authenticated else None,
+            subtotal=priced_cart.subtotal,
+            total=priced_cart.total,
+            **{campo: dados.get(campo, '' if campo == 'notes' else None) for campo in CAMPOS_CLIENTE},
+        )
+        OrderItem.objects.bulk_create([
+            OrderItem(
+                order=order,
+                product=line.product,
+                quantity=line.quantity,
+                price=line.unit_price,
+                total=line.total,
+            )
+            for line in priced_cart
+        ])
+        reservar_estoque(order, [(line.product.id, line.quantity) for line in priced_cart])
+        cart.items.all().delete()
+
+        if base_url and order.payment_method in METODOS_ONLINE:
+            transaction.on_commit(lambda: gerar_cobranca(order, base_url))
+
+    return order
+
+
+def gerar_cobranca(order, base_url: str) -> bool:
+    """
+    Creates the AbacatePay billing for ``order`` and stores its id and URL.
+    Returns False (and logs) if the provider call fails.
+    """
+    return_url = base_url + reverse('shop:order_detail', args=[order.order_number])
+    completion_url = base_url + reverse('shop:pagamento_sucesso_pedido', args=[order.order_number])
+    try:
+        resultado = criar_cobranca_pedido(
+            order=order,
+            return_url=return_url,
+            completion_url=completion_url,
+        )
+    except Exception as exc:
+        logger.error("Erro ao criar cobrança do pedido %s no AbacatePay: %s", order.order_number, exc)
+        return False
+
+    order.payment_id = resultado['billing_id']
+    order.billing_url = resultado['billing_url']
+    order.save(update_fields=['payment_id', 'billing_url'])
+    return True
@@ -0,0 +1,25 @@
+"""
+Sinais da loja.
+
+Invalidam as páginas públicas em cache (``services.cache``) quando produtos ou
+categorias mudam. Alterações de estoque feitas com ``update()`` não disparam
+sinais; ``shop.estoque`` invalida por conta própria.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from services.cache import invalidate_on_commit
+
+from .models import Category, Product
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidar_cache_produtos(sender, **kwargs):
+    invalidate_on_commit(Product)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidar_cache_categorias(sender, **kwargs):
+    invalidate_on_commit(Category)
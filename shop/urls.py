@@ -22,6 +22,7 @@ urlpatterns = [
     # Admin views
     path('admin/', admin_views.shop_admin_dashboard, name='admin_dashboard'),
     path('admin/produtos/', admin_views.product_list_admin, name='admin_product_list'),
+    path('admin/produtos.json', admin_views.product_list_admin_json, name='admin_product_list_json'),
     path('admin/produtos/criar/', admin_views.product_create, name='admin_product_create'),
     path('admin/produtos/<int:product_id>/editar/', admin_views.product_edit, name='admin_product_edit'),
     path('admin/produtos/<int:product_id>/toggle/', admin_views.product_toggle_active, name='admin_product_toggle'),
@@ -29,5 +30,8 @@ urlpatterns = [
     path('admin/categorias/criar/', admin_views.category_create, name='admin_category_create'),
     path('admin/categorias/<int:category_id>/editar/', admin_views.category_edit, name='admin_category_edit'),
     path('admin/pedidos/', admin_views.order_list_admin, name='admin_order_list'),
+    path('admin/pedidos.json', admin_views.order_list_admin_json, name='admin_order_list_json'),
+    path('admin/pedidos/exportar-csv/', admin_views.order_export_admin, {'fmt': 'csv'}, name='admin_order_export_csv'),
+    path('admin/pedidos/exportar-xlsx/', admin_views.order_export_admin, {'fmt': 'xlsx'}, name='admin_order_export_xlsx'),
     path('admin/pedidos/<str:order_number>/', admin_views.order_detail_admin, name='admin_order_detail'),
 ]
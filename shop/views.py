@@ -2,53 +2,79 @@ import logging
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse
 from django.db.models import Q
 from django.core.paginator import Paginator
 from django.views.decorators.http import require_POST
+from django.db import transaction
 from decimal import Decimal
-from django.urls import reverse
 from django.conf import settings
+from django.utils import timezone
 
 from .models import (
-    Product, Category, Cart, CartItem, Order, OrderItem
+    Product, Category, Cart, CartItem, Order
 )
-from .services import criar_cobranca_pedido
+from .services import METODOS_ONLINE, gerar_cobranca, place_order
+from .estoque import EstoqueInsuficiente, converter_reservas
+from .pricing import PricingContext
+from services import cache as services_cache
+from socios.middleware import get_socio
 
 logger = logging.getLogger(__name__)
 
 
+def _categorias_ativas():
+    return services_cache.get_or_set(
+        'shop:categorias', (Category,),
+        lambda: list(Category.objects.filter(is_active=True)),
+    )
+
+
 def product_list(request):
     """List all products with filtering"""
-    products = Product.objects.filter(is_active=True)
-    
+    categories = _categorias_ativas()
+
     # Filter by category
+    category = None
     category_slug = request.GET.get('category')
     if category_slug:
-        category = get_object_or_404(Category, slug=category_slug, is_active=True)
-        products = products.filter(category=category)
-    
-    # Search
+        category = next((c for c in categories if c.slug == category_slug), None)
+        if category is None:
+            raise Http404('Categoria não encontrada')
+
     search_query = request.GET.get('q')
+    featured = request.GET.get('featured')
+
+    def listar_produtos():
+        products = Product.objects.filter(is_active=True)
+        if category is not None:
+            products = products.filter(category=category)
+        # Search
+        if search_query:
+            products = products.filter(
+                Q(name__icontains=search_query) |
+                Q(description__icontains=search_query) |
+                Q(short_description__icontains=search_query)
+            )
+        # Featured products
+        if featured:
+            products = products.filter(is_featured=True)
+        return list(products)
+
     if search_query:
-        products = products.filter(
-            Q(name__icontains=search_query) |
-            Q(description__icontains=search_query) |
-            Q(short_description__icontains=search_query)
+        # Buscas livres geram chaves demais para valer a pena guardar.
+        products = listar_produtos()
+    else:
+        products = services_cache.get_or_set(
+            'shop:produtos', (Product, Category), listar_produtos,
+            category_slug or '-', 'destaque' if featured else '-',
         )
-    
-    # Featured products
-    featured = request.GET.get('featured')
-    if featured:
-        products = products.filter(is_featured=True)
-    
+
     # Pagination
     paginator = Paginator(products, 12)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
-    
-    categories = Category.objects.filter(is_active=True)
-    
+
     context = {
         'products': page_obj,
         'categories': categories,
@@ -66,7 +92,7 @@ def product_detail(request, slug):
     # Get member price if user is logged in
     member_price = None
     if request.user.is_authenticated:
-        member_price = product.get_price_for_user(request.user)
+        member_price = PricingContext.for_request(request).price_for(product)
     
     # Related products
     related_products = Product.objects.filter(
@@ -107,7 +133,7 @@ def add_to_cart(request, product_id):
         messages.error(request, 'Quantidade inválida')
         return redirect('shop:product_detail', slug=product.slug)
     
-    if product.stock < quantity:
+    if product.available_stock < quantity:
         messages.error(request, 'Estoque insuficiente')
         return redirect('shop:product_detail', slug=product.slug)
     
@@ -130,11 +156,11 @@ def add_to_cart(request, product_id):
 def cart_view(request):
     """View shopping cart"""
     cart = get_or_create_cart(request)
-    cart_items = cart.items.all()
+    priced_cart = cart.priced(PricingContext.for_request(request))
     
     context = {
-        'cart': cart,
-        'cart_items': cart_items,
+        'cart': priced_cart,
+        'cart_items': priced_cart.lines,
     }
     
     return render(request, 'shop/cart.html', context)
@@ -161,7 +187,7 @@ def update_cart_item(request, item_id):
         cart_item.delete()
         messages.success(request, 'Item removido do carrinho')
     else:
-        if cart_item.product.stock < quantity:
+        if cart_item.product.available_stock < quantity:
             messages.error(request, 'Estoque insuficiente')
         else:
             cart_item.quantity = quantity
@@ -195,75 +221,38 @@ def remove_from_cart(request, item_id):
 def checkout(request):
     """Checkout process"""
     cart = get_or_create_cart(request)
-    cart_items = cart.items.all()
+    priced_cart = cart.priced(PricingContext.for_request(request))
     
-    if not cart_items.exists():
+    if not priced_cart:
         messages.error(request, 'Seu carrinho está vazio')
         return redirect('shop:cart')
     
     # Check stock
-    for item in cart_items:
-        if item.product.stock < item.quantity:
+    for item in priced_cart:
+        if item.product.available_stock < item.quantity:
             messages.error(request, f'{item.product.name} está fora de estoque')
             return redirect('shop:cart')
     
     if request.method == 'POST':
-        # Create order
-        order = Order.objects.create(
-            user=request.user if request.user.is_authenticated else None,
-            customer_name=request.POST.get('customer_name'),
-            customer_email=request.POST.get('customer_email'),
-            customer_phone=request.POST.get('customer_phone'),
-            customer_cpf=request.POST.get('customer_cpf'),
-            shipping_address=request.POST.get('shipping_address'),
-            shipping_city=request.POST.get('shipping_city'),
-            shipping_state=request.POST.get('shipping_state'),
-            shipping_zip=request.POST.get('shipping_zip'),
-            payment_method=request.POST.get('payment_method'),
-            subtotal=cart.get_total(),
-            total=cart.get_total(),
-            notes=request.POST.get('notes', ''),
-        )
-        
-        # Create order items
-        for item in cart_items:
-            price = item.product.get_price_for_user(request.user)
-            OrderItem.objects.create(
-                order=order,
-                product=item.product,
-                quantity=item.quantity,
-                price=price,
-                total=price * item.quantity
+        # Pedido, itens, reserva de estoque e limpeza do carrinho em uma transação.
+        try:
+            order = place_order(
+                cart=cart,
+                priced_cart=priced_cart,
+                user=request.user,
+                dados=request.POST,
+                base_url=f"{settings.PROTOCOL}://{request.get_host()}",
             )
-        
-        # Clear cart
-        cart.items.all().delete()
-        
+        except EstoqueInsuficiente as exc:
+            messages.error(request, f'{exc.nome or "Um produto"} não tem estoque suficiente para este pedido')
+            return redirect('shop:cart')
+
         # AbacatePay checkout redirect
-        metodo = request.POST.get('payment_method')
-        if metodo in ['pix', 'credit_card']:
-            protocol = settings.PROTOCOL
-            host = request.get_host()
-            base = f"{protocol}://{host}"
-            
-            return_url = base + reverse('shop:order_detail', args=[order.order_number])
-            completion_url = base + reverse('shop:pagamento_sucesso_pedido', args=[order.order_number])
-
-            try:
-                resultado = criar_cobranca_pedido(
-                    order=order,
-                    return_url=return_url,
-                    completion_url=completion_url,
-                )
-                order.payment_id = resultado['billing_id']
-                order.billing_url = resultado['billing_url']
-                order.save(update_fields=['payment_id', 'billing_url'])
-                
+        if order.payment_method in METODOS_ONLINE:
+            if order.billing_url:
                 messages.success(request, f'Pedido {order.order_number} criado! Redirecionando para pagamento...')
-                return redirect(resultado['billing_url'])
-            except Exception as exc:
-                logger.error("Erro ao criar cobrança do pedido %s no AbacatePay: %s", order.order_number, exc)
-                messages.error(request, 'Não foi possível criar a cobrança online no momento. Você poderá pagar pelo link na página de detalhes do pedido.')
+                return redirect(order.billing_url)
+            messages.error(request, 'Não foi possível criar a cobrança online no momento. Você poderá pagar pelo link na página de detalhes do pedido.')
         
         messages.success(request, f'Pedido {order.order_number} criado com sucesso!')
         return redirect('shop:order_detail', order_number=order.order_number)
@@ -271,9 +260,8 @@ def checkout(request):
     # Get member info if logged in
     member_info = {}
     if request.user.is_authenticated:
-        try:
-            from socios.models import Socio
-            socio = Socio.objects.get(usuario=request.user)
+        socio = get_socio(request)
+        if socio is not None:
             member_info = {
                 'name': socio.nome_completo,
                 'email': socio.email,
@@ -287,43 +275,51 @@ def checkout(request):
                 'estado': socio.estado,
                 'cep': socio.cep,
             }
-        except:
+        else:
             member_info = {
                 'name': request.user.get_full_name() or request.user.username,
                 'email': request.user.email,
             }
     
     context = {
-        'cart': cart,
-        'cart_items': cart_items,
+        'cart': priced_cart,
+        'cart_items': priced_cart.lines,
         'member_info': member_info,
     }
     
     return render(request, 'shop/checkout.html', context)
 
 
-def _confirmar_pagamento_pedido(order) -> None:
-    """Confirma o pagamento do pedido, atualiza os status e deduz o estoque."""
+def _confirmar_pagamento_pedido(order) -> bool:
+    """
+    Confirma o pagamento do pedido, atualiza os status e baixa o estoque
+    reservado. Retorna False se o pedido já tinha sido confirmado.
+    """
     if order.payment_status == 'paid':
-        return
-        
-    order.payment_status = 'paid'
-    order.status = 'processing'
-    order.save(update_fields=['payment_status', 'status'])
-    
-    # Deduzir estoque
-    for item in order.items.all():
-        product = item.product
-        product.stock = max(0, product.stock - item.quantity)
-        product.save(update_fields=['stock'])
-        
+        return False
+
+    with transaction.atomic():
+        # UPDATE condicional: se o webhook e a página de sucesso confirmarem ao
+        # mesmo tempo, só um deles baixa o estoque.
+        confirmado = Order.objects.filter(pk=order.pk).exclude(payment_status='paid').update(
+            payment_status='paid',
+            status='processing',
+            updated_at=timezone.now(),
+        )
+        order.payment_status = 'paid'
+        order.status = 'processing'
+        if not confirmado:
+            return False
+        converter_reservas(order)
+
     logger.info("Pedido %s marcado como PAGO. Estoque atualizado com sucesso.", order.order_number)
+    return True
 
 
 @login_required
 def verificar_pagamento_pedido(request, order_number):
     """Consulta o status do pagamento do pedido no AbacatePay e atualiza."""
-    from socios.services import verificar_status_cobranca
+    from socios.reconciliacao import sincronizar_pedido
     
     if request.user.is_superuser or request.user.is_staff:
         order = get_object_or_404(Order, order_number=order_number)
@@ -339,14 +335,10 @@ def verificar_pagamento_pedido(request, order_number):
         return redirect('shop:order_detail', order_number=order.order_number)
         
     try:
-        status = verificar_status_cobranca(order.payment_id)
+        status = sincronizar_pedido(order)
         if status == 'PAID':
-            _confirmar_pagamento_pedido(order)
             messages.success(request, 'Pagamento confirmado com sucesso!')
         elif status in ['CANCELLED', 'EXPIRED']:
-            order.payment_status = 'failed'
-            order.status = 'cancelled'
-            order.save(update_fields=['payment_status', 'status'])
             messages.warning(request, f'O pagamento foi {status.lower()}.')
         else:
             messages.info(request, f'Pagamento ainda não confirmado (status: {status or "pendente"}).')
@@ -373,26 +365,10 @@ def gerar_cobranca_pedido(request, order_number):
     if order.billing_url:
         return redirect(order.billing_url)
 
-    protocol = settings.PROTOCOL
-    host = request.get_host()
-    base = f"{protocol}://{host}"
-    return_url = base + reverse('shop:order_detail', args=[order.order_number])
-    completion_url = base + reverse('shop:pagamento_sucesso_pedido', args=[order.order_number])
-
-    try:
-        resultado = criar_cobranca_pedido(
-            order=order,
-            return_url=return_url,
-            completion_url=completion_url,
-        )
-        order.payment_id = resultado['billing_id']
-        order.billing_url = resultado['billing_url']
-        order.save(update_fields=['payment_id', 'billing_url'])
-        return redirect(resultado['billing_url'])
-    except Exception as exc:
-        logger.error("Erro ao gerar cobrança do pedido %s no AbacatePay: %s", order.order_number, exc)
-        messages.error(request, 'Não foi possível gerar a cobrança online no momento. Tente novamente em instantes ou entre em contato com o clube.')
-        return redirect('shop:order_detail', order_number=order.order_number)
+    if gerar_cobranca(order, f"{settings.PROTOCOL}://{request.get_host()}"):
+        return redirect(order.billing_url)
+    messages.error(request, 'Não foi possível gerar a cobrança online no momento. Tente novamente em instantes ou entre em contato com o clube.')
+    return redirect('shop:order_detail', order_number=order.order_number)
 
 
 @login_required
@@ -418,7 +394,7 @@ def pagamento_sucesso_pedido(request, order_number):
     billing status so the order is confirmed even when the webhook can't reach
     the server (e.g. in local/Docker dev).
     """
-    from socios.services import verificar_status_cobranca
+    from socios.reconciliacao import sincronizar_pedido
 
     if request.user.is_superuser or request.user.is_staff:
         order = get_object_or_404(Order, order_number=order_number)
@@ -427,9 +403,7 @@ def pagamento_sucesso_pedido(request, order_number):
 
     if order.payment_id and order.payment_status != 'paid':
         try:
-            status = verificar_status_cobranca(order.payment_id)
-            if status == 'PAID':
-                _confirmar_pagamento_pedido(order)
+            sincronizar_pedido(order)
         except Exception as exc:
             logger.error(
                 "Erro ao verificar pagamento do pedido %s na página de sucesso: %s",
@@ -2,7 +2,14 @@ from django.contrib import admin
 from django.utils.html import format_html
 from django.urls import reverse
 from django.utils.safestring import mark_safe
-from .models import TipoAssinatura, Socio, DocumentoSocio, HistoricoPagamento
+
+from services.exports import export_response
+
+from .exportacao import COLUNAS_PAGAMENTOS, COLUNAS_SOCIOS, nome_arquivo
+from .models import (
+    TipoAssinatura, Socio, DocumentoSocio, HistoricoPagamento, ResumoFinanceiroMensal,
+    LoteAtualizacaoStatus, WebhookEvent, Exportacao, Importacao, LancamentoExtrato,
+)
 
 
 @admin.register(TipoAssinatura)
@@ -113,7 +120,7 @@ class SocioAdmin(admin.ModelAdmin):
     readonly_fields = ['foto_preview', 'dias_vencimento']
     inlines = [DocumentoSocioInline, HistoricoPagamentoInline]
     
-    actions = ['marcar_como_ativo', 'marcar_como_inadimplente', 'exportar_csv']
+    actions = ['marcar_como_ativo', 'marcar_como_inadimplente', 'exportar_csv', 'exportar_xlsx']
     
     def foto_preview(self, obj):
         if obj.foto:
@@ -172,35 +179,18 @@ class SocioAdmin(admin.ModelAdmin):
     marcar_como_inadimplente.short_description = 'Marcar selecionados como inadimplentes'
     
     def exportar_csv(self, request, queryset):
-        import csv
-        from django.http import HttpResponse
-        from datetime import datetime
-        
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="socios_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv"'
-        
-        writer = csv.writer(response)
-        writer.writerow([
-            'Número', 'Nome', 'CPF', 'Email', 'Telefone', 
-            'Status', 'Plano', 'Associação', 'Vencimento'
-        ])
-        
-        for socio in queryset:
-            writer.writerow([
-                socio.numero_socio,
-                socio.nome_completo,
-                socio.cpf,
-                socio.email or '',
-                socio.telefone or '',
-                socio.get_status_display(),
-                socio.tipo_assinatura.nome if socio.tipo_assinatura else '',
-                socio.data_associacao.strftime('%d/%m/%Y') if socio.data_associacao else '',
-                socio.data_vencimento.strftime('%d/%m/%Y') if socio.data_vencimento else ''
-            ])
-        
-        return response
+        return export_response(
+            queryset.select_related('tipo_assinatura'), COLUNAS_SOCIOS, nome_arquivo('socios'), 'csv',
+        )
     exportar_csv.short_description = 'Exportar selecionados para CSV'
     
+    def exportar_xlsx(self, request, queryset):
+        return export_response(
+            queryset.select_related('tipo_assinatura'), COLUNAS_SOCIOS, nome_arquivo('socios'), 'xlsx',
+            sheet_title='Sócios',
+        )
+    exportar_xlsx.short_description = 'Exportar selecionados para Excel'
+    
     def get_queryset(self, request):
         return super().get_queryset(request).select_related('tipo_assinatura')
 
@@ -209,7 +199,7 @@ class SocioAdmin(admin.ModelAdmin):
 class DocumentoSocioAdmin(admin.ModelAdmin):
     list_display = ['nome', 'socio', 'tipo', 'data_upload', 'arquivo_link']
     list_filter = ['tipo', 'data_upload']
-    search_fields = ['nome', 'socio__nome', 'socio__numero_socio']
+    search_fields = ['nome', 'socio__nome_completo', 'socio__numero_socio']
     ordering = ['-data_upload']
     date_hierarchy = 'data_upload'
     
@@ -233,17 +223,18 @@ class HistoricoPagamentoAdmin(admin.ModelAdmin):
         'status', 'data_pagamento', 'mes_referencia'
     ]
     search_fields = [
-        'socio__nome', 'socio__numero_socio', 'observacoes'
+        'socio__nome_completo', 'socio__numero_socio', 'descricao'
     ]
     ordering = ['-data_pagamento']
     date_hierarchy = 'data_pagamento'
+    actions = ['exportar_csv', 'exportar_xlsx']
     
     fieldsets = (
         ('Informações do Pagamento', {
             'fields': ('socio', 'valor', 'data_pagamento', 'mes_referencia')
         }),
         ('Status e Observações', {
-            'fields': ('status', 'observacoes')
+            'fields': ('status', 'descricao')
         })
     )
     
@@ -268,11 +259,100 @@ class HistoricoPagamentoAdmin(admin.ModelAdmin):
     status_badge.admin_order_field = 'status'
     
     def observacoes_resumo(self, obj):
-        if obj.observacoes:
-            return obj.observacoes[:50] + '...' if len(obj.observacoes) > 50 else obj.observacoes
+        if obj.descricao:
+            return obj.descricao[:50] + '...' if len(obj.descricao) > 50 else obj.descricao
         return '-'
     observacoes_resumo.short_description = 'Observações'
+    
+    def exportar_csv(self, request, queryset):
+        return export_response(
+            queryset.select_related('socio'), COLUNAS_PAGAMENTOS, nome_arquivo('pagamentos'), 'csv',
+        )
+    exportar_csv.short_description = 'Exportar selecionados para CSV'
+    
+    def exportar_xlsx(self, request, queryset):
+        return export_response(
+            queryset.select_related('socio'), COLUNAS_PAGAMENTOS, nome_arquivo('pagamentos'), 'xlsx',
+            sheet_title='Pagamentos',
+        )
+    exportar_xlsx.short_description = 'Exportar selecionados para Excel'
+
+
+@admin.register(ResumoFinanceiroMensal)
+class ResumoFinanceiroMensalAdmin(admin.ModelAdmin):
+    list_display = [
+        'mes', 'receita', 'pagamentos_confirmados', 'novos_socios',
+        'socios_perdidos', 'valor_inadimplencia', 'atualizado_em'
+    ]
+    ordering = ['-mes']
+    readonly_fields = [
+        'mes', 'receita', 'pagamentos_confirmados', 'novos_socios', 'socios_perdidos',
+        'valor_inadimplencia', 'inadimplencia_por_plano', 'atualizado_em'
+    ]
+
+
+@admin.register(LoteAtualizacaoStatus)
+class LoteAtualizacaoStatusAdmin(admin.ModelAdmin):
+    list_display = ['executado_em', 'origem', 'status_anterior', 'status_novo', 'quantidade', 'duracao_ms']
+    list_filter = ['origem', 'status_novo']
+    ordering = ['-executado_em']
+    readonly_fields = [
+        'origem', 'status_anterior', 'status_novo', 'data_referencia',
+        'quantidade', 'socio_ids', 'duracao_ms', 'executado_em'
+    ]
+
+
+@admin.register(WebhookEvent)
+class WebhookEventAdmin(admin.ModelAdmin):
+    list_display = ['recebido_em', 'billing_id', 'status_remoto', 'estado', 'tentativas', 'processado_em']
+    list_filter = ['estado', 'status_remoto']
+    search_fields = ['billing_id', 'chave']
+    ordering = ['-recebido_em']
+    readonly_fields = [
+        'chave', 'evento', 'billing_id', 'status_remoto', 'payload',
+        'tentativas', 'erro', 'recebido_em', 'processado_em'
+    ]
+    actions = ['reprocessar']
+
+    def reprocessar(self, request, queryset):
+        atualizados = queryset.exclude(estado=WebhookEvent.ESTADO_PENDENTE).update(
+            estado=WebhookEvent.ESTADO_PENDENTE, tentativas=0, erro=''
+        )
+        self.message_user(request, f'{atualizados} evento(s) devolvido(s) à fila.')
+    reprocessar.short_description = 'Devolver eventos selecionados à fila'
+
+
+@admin.register(Exportacao)
+class ExportacaoAdmin(admin.ModelAdmin):
+    list_display = ['created_at', 'tipo', 'formato', 'status', 'linhas_processadas', 'total_linhas', 'solicitado_por', 'expira_em']
+    list_filter = ['status', 'tipo', 'formato']
+    ordering = ['-created_at']
+    readonly_fields = [
+        'tipo', 'formato', 'filtros', 'chave', 'status', 'total_linhas', 'linhas_processadas',
+        'arquivo', 'erro', 'solicitado_por', 'created_at', 'iniciado_em', 'concluido_em', 'expira_em',
+    ]
+
+
+
+@admin.register(Importacao)
+class ImportacaoAdmin(admin.ModelAdmin):
+    list_display = ['created_at', 'nome_original', 'status', 'linhas_processadas', 'importados', 'recusados', 'solicitado_por']
+    list_filter = ['status']
+    ordering = ['-created_at']
+    readonly_fields = [
+        'arquivo', 'nome_original', 'status', 'linhas_processadas', 'importados', 'recusados',
+        'erros', 'relatorio', 'erro', 'solicitado_por', 'created_at', 'iniciado_em', 'concluido_em',
+    ]
+
 
+@admin.register(LancamentoExtrato)
+class LancamentoExtratoAdmin(admin.ModelAdmin):
+    list_display = ['data', 'valor', 'descricao', 'status', 'criterio', 'socio', 'arquivo']
+    list_filter = ['status', 'criterio']
+    search_fields = ['descricao', 'pagador', 'documento', 'socio__nome_completo']
+    ordering = ['-data', '-id']
+    raw_id_fields = ['socio', 'pagamento']
+    readonly_fields = ['chave', 'created_at', 'created_by', 'conciliado_em']
 
 # Configurações personalizadas do admin
 admin.site.site_header = 'ClubPro - Administração'
@@ -0,0 +1,208 @@
+"""
+Peças comuns às rotinas de arquivo do app de sócios.
+
+* Leitura de planilhas (CSV ou XLSX) em streaming e conversão das células,
+  usadas pela importação de sócios (``socios.importacao``) e pela conciliação
+  de extratos (``socios.conciliacao``).
+* Fila de trabalhos em segundo plano: ``Exportacao`` e ``Importacao`` têm os
+  mesmos status e campos de controle (``iniciado_em``, ``atualizado_em``,
+  ``concluido_em``, ``erro``). Cada trabalho é reservado com um UPDATE
+  condicional (só um worker ganha) e, enquanto roda, atualiza
+  ``atualizado_em`` como sinal de vida; sem sinal por mais de
+  ``EXECUCAO_ABANDONADA``, o worker é dado como morto.
+* ``apagar_arquivo`` remove um arquivo gerado ou recebido junto com a pasta
+  exclusiva (``<prefixo>/<uuid>/``) em que foi salvo.
+"""
+import codecs
+import csv
+import logging
+import os
+import traceback
+from datetime import date, datetime, timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+EXTENSOES_PLANILHA = ('.csv', '.xlsx')
+
+FORMATOS_DATA = ('%d/%m/%Y', '%Y-%m-%d', '%d-%m-%Y')
+
+# Sem atualização por mais que isso, a exportação/importação é dada como interrompida.
+EXECUCAO_ABANDONADA = timedelta(minutes=15)
+
+
+class PlanilhaInvalida(ValueError):
+    """Arquivo ilegível ou sem as colunas obrigatórias (nenhuma linha é importada)."""
+
+
+# ----------------------------------------------------------------------
+# Planilhas
+# ----------------------------------------------------------------------
+
+def _ler_csv(arquivo):
+    amostra = arquivo.read(64 * 1024)
+    arquivo.seek(0)
+    encoding = 'utf-8-sig'
+    try:
+        amostra.decode('utf-8')
+    except UnicodeDecodeError as exc:
+        # Um caractere cortado no fim da amostra não conta; fora isso, é o
+        # Windows-1252 do Excel em português.
+        if exc.start < len(amostra) - 3:
+            encoding = 'cp1252'
+    primeira_linha = amostra.decode(encoding, errors='ignore').split('\n', 1)[0]
+    delimitador = ';' if primeira_linha.count(';') > primeira_linha.count(',') else ','
+    texto = codecs.getreader(encoding)(arquivo, errors='replace')
+    yield from csv.reader(texto, delimiter=delimitador)
+
+
+def _ler_xlsx(arquivo):
+    from openpyxl import load_workbook
+
+    try:
+        planilha = load_workbook(arquivo, read_only=True, data_only=True)
+    except Exception as exc:
+        raise PlanilhaInvalida('Não foi possível abrir o arquivo XLSX.') from exc
+    try:
+        yield from planilha.worksheets[0].iter_rows(values_only=True)
+    finally:
+        planilha.close()
+
+
+def ler_planilha(arquivo, nome):
+    """Linhas (listas de valores) do arquivo binário ``arquivo``, cabeçalho incluído."""
+    extensao = os.path.splitext(nome.lower())[1]
+    if extensao == '.xlsx':
+        return _ler_xlsx(arquivo)
+    if extensao == '.csv':
+        return _ler_csv(arquivo)
+    raise PlanilhaInvalida(f'Formato não suportado: use {" ou ".join(EXTENSOES_PLANILHA)}.')
+
+
+def texto_celula(valor):
+    """Conteúdo da célula como texto, sem espaços nas pontas."""
+    if valor is None:
+        return ''
+    if isinstance(valor, float) and valor.is_integer():
+        valor = int(valor)  # número digitado numa célula do Excel
+    return str(valor).strip()
+
+
+def data_celula(valor):
+    """Data de uma célula (data do Excel ou texto em ``FORMATOS_DATA``); ValueError se não for."""
+    if isinstance(valor, datetime):
+        return valor.date()
+    if isinstance(valor, date):
+        return valor
+    texto = texto_celula(valor)
+    for formato in FORMATOS_DATA:
+        try:
+            return datetime.strptime(texto, formato).date()
+        except ValueError:
+            continue
+    raise ValueError
+
+
+# ----------------------------------------------------------------------
+# Arquivos
+# ----------------------------------------------------------------------
+
+def apagar_arquivo(arquivo):
+    """Apaga o arquivo do ``FileField`` e a pasta exclusiva dele, se ficou vazia."""
+    pasta = None
+    try:
+        pasta = os.path.dirname(arquivo.path)
+    except NotImplementedError:
+        pass  # storage remoto, sem caminho local
+    arquivo.delete(save=False)
+    if pasta:
+        try:
+            os.rmdir(pasta)
+        except OSError:
+            pass
+
+
+# ----------------------------------------------------------------------
+# Fila de trabalhos (Exportacao, Importacao)
+# ----------------------------------------------------------------------
+
+def reservar(modelo, retomar_abandonados=False, **campos):
+    """
+    Marca como em andamento o trabalho mais antigo da fila de ``modelo`` e o
+    devolve; None se não houver. Com ``retomar_abandonados``, trabalhos cujo
+    worker parou de dar sinal de vida também são reservados de novo.
+    ``campos`` são gravados no mesmo UPDATE.
+    """
+    disponivel = Q(status=modelo.STATUS_PENDENTE)
+    if retomar_abandonados:
+        disponivel |= Q(
+            status=modelo.STATUS_PROCESSANDO,
+            atualizado_em__lt=timezone.now() - EXECUCAO_ABANDONADA,
+        )
+
+    for trabalho in modelo.objects.filter(disponivel).order_by('created_at')[:5]:
+        agora = timezone.now()
+        ganhou = modelo.objects.filter(disponivel, pk=trabalho.pk).update(
+            status=modelo.STATUS_PROCESSANDO,
+            iniciado_em=agora,
+            atualizado_em=agora,
+            **campos,
+        )
+        if ganhou:
+            trabalho.refresh_from_db()
+            return trabalho
+    return None
+
+
+def sinal_de_vida(trabalho, **campos):
+    """Grava o andamento de ``trabalho``; também adia ``EXECUCAO_ABANDONADA``."""
+    type(trabalho).objects.filter(pk=trabalho.pk).update(atualizado_em=timezone.now(), **campos)
+
+
+def abandonados(modelo):
+    """Trabalhos em andamento cujo worker não dá sinal de vida há ``EXECUCAO_ABANDONADA``."""
+    return modelo.objects.filter(
+        status=modelo.STATUS_PROCESSANDO,
+        atualizado_em__lt=timezone.now() - EXECUCAO_ABANDONADA,
+    )
+
+
+def marcar_falha(trabalho, erro, **campos):
+    """Encerra ``trabalho`` como falha com a mensagem ``erro``."""
+    agora = timezone.now()
+    type(trabalho).objects.filter(pk=trabalho.pk).update(
+        status=type(trabalho).STATUS_FALHOU,
+        erro=erro,
+        concluido_em=agora,
+        atualizado_em=agora,
+        **campos,
+    )
+
+
+def processar_fila(reservar_proximo, executar, limite, ao_falhar=marcar_falha):
+    """
+    Reserva (``reservar_proximo()``) e executa até ``limite`` trabalhos.
+
+    Uma ``PlanilhaInvalida`` vira a mensagem de erro do trabalho; qualquer
+    outra exceção é registrada no log e grava o traceback. Devolve
+    (concluídos, com erro).
+    """
+    concluidos = falhas = 0
+    for _ in range(limite):
+        trabalho = reservar_proximo()
+        if trabalho is None:
+            break
+        try:
+            executar(trabalho)
+            concluidos += 1
+        except Exception as exc:
+            if isinstance(exc, PlanilhaInvalida):
+                erro = str(exc)
+            else:
+                logger.exception('Falha em %s %s', trabalho._meta.verbose_name, trabalho.pk)
+                erro = traceback.format_exc()[-4000:]
+            ao_falhar(trabalho, erro)
+            falhas += 1
+    return concluidos, falhas
@@ -0,0 +1,181 @@
+"""
+Busca de sócios por nome, número, e-mail, CPF ou telefone.
+
+Cada sócio guarda em ``Socio.busca`` um documento normalizado: os textos em
+minúsculas e sem acentos, e CPF, telefones e número do sócio também só com
+dígitos. Assim "joao" encontra "João" e "123.456.789-00", "12345678900" e
+"456.789" encontram o mesmo CPF, independentemente da formatação.
+
+O documento é indexado por banco:
+
+* PostgreSQL: índice GIN ``gin_trgm_ops`` (extensão ``pg_trgm``), que atende
+  ``LIKE '%termo%'`` sem varrer a tabela; os resultados são ordenados por
+  ``word_similarity``;
+* SQLite (desenvolvimento): tabela virtual FTS5 com o tokenizador
+  ``trigram``, mantida por triggers; os resultados vêm primeiro pelos que
+  casam no nome.
+
+Nos demais bancos (ou sem a tabela FTS5) cai num ``LIKE`` simples sobre o
+documento, que continua correto, só que sem índice.
+"""
+import re
+import unicodedata
+
+from django.db import connections
+from django.db.models import FloatField, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast, StrIndex
+
+CAMPOS_TEXTO = ('nome_completo', 'nome_social', 'numero_socio', 'email')
+CAMPOS_DIGITOS = ('numero_socio', 'cpf', 'telefone', 'celular')
+CAMPOS_BUSCA = frozenset(CAMPOS_TEXTO + CAMPOS_DIGITOS)
+
+TABELA_FTS = 'socios_socio_busca'
+
+# Só dígitos e pontuação de CPF/telefone: "(21) 99999-0000", "123.456.789-00".
+_TERMO_NUMERICO = re.compile(r'[\d\s.\-()/+]+')
+_SEM_DIGITOS = re.compile(r'\D')
+
+_tem_fts = {}
+
+
+def normalizar(texto) -> str:
+    """Minúsculas, sem acentos e com espaços simples."""
+    texto = unicodedata.normalize('NFKD', str(texto or ''))
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    return ' '.join(texto.lower().split())
+
+
+def somente_digitos(texto) -> str:
+    return _SEM_DIGITOS.sub('', str(texto or ''))
+
+
+def documento_busca(socio) -> str:
+    """Documento de busca de ``socio`` (valor de ``Socio.busca``)."""
+    partes = [normalizar(getattr(socio, campo)) for campo in CAMPOS_TEXTO]
+    partes += [somente_digitos(getattr(socio, campo)) for campo in CAMPOS_DIGITOS]
+    return ' '.join(parte for parte in partes if parte)
+
+
+def termos_busca(termo) -> list[str]:
+    """Quebra a busca digitada nos termos que o documento precisa conter."""
+    termo = str(termo or '').strip()
+    if _TERMO_NUMERICO.fullmatch(termo):
+        digitos = somente_digitos(termo)
+        return [digitos] if digitos else []
+    return normalizar(termo).split()
+
+
+def _tabela_fts_disponivel(connection) -> bool:
+    if connection.alias not in _tem_fts:
+        _tem_fts[connection.alias] = TABELA_FTS in connection.introspection.table_names()
+    return _tem_fts[connection.alias]
+
+
+def _sql_indice_sqlite(tabela):
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABELA_FTS} USING fts5("
+        f"busca, content='{tabela}', content_rowid='id', tokenize='trigram')",
+        f"CREATE TRIGGER IF NOT EXISTS {TABELA_FTS}_ai AFTER INSERT ON {tabela} BEGIN "
+        f"INSERT INTO {TABELA_FTS}(rowid, busca) VALUES (new.id, new.busca); END",
+        f"CREATE TRIGGER IF NOT EXISTS {TABELA_FTS}_ad AFTER DELETE ON {tabela} BEGIN "
+        f"INSERT INTO {TABELA_FTS}({TABELA_FTS}, rowid, busca) VALUES ('delete', old.id, old.busca); END",
+        f"CREATE TRIGGER IF NOT EXISTS {TABELA_FTS}_au AFTER UPDATE OF busca ON {tabela} BEGIN "
+        f"INSERT INTO {TABELA_FTS}({TABELA_FTS}, rowid, busca) VALUES ('delete', old.id, old.busca); "
+        f"INSERT INTO {TABELA_FTS}(rowid, busca) VALUES (new.id, new.busca); END",
+    ]
+
+
+def instalar_indice(connection, tabela='socios_socio') -> bool:
+    """
+    Cria (se faltar) o índice de busca do banco de ``connection``. Idempotente:
+    roda na migração e depois de cada ``migrate``, porque no SQLite o Django
+    recria a tabela ao alterar colunas e os triggers da FTS5 vão junto.
+    Devolve False quando o banco não tem índice próprio (fica o ``LIKE``).
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS {tabela}_busca_trgm '
+                f'ON {tabela} USING gin (busca gin_trgm_ops)'
+            )
+            return True
+        if connection.vendor != 'sqlite':
+            return False
+
+        cursor.execute(
+            "SELECT count(*) FROM sqlite_master WHERE type = 'trigger' AND name LIKE %s",
+            [f'{TABELA_FTS}_a_'],
+        )
+        if cursor.fetchone()[0] == 3:
+            return True
+        try:
+            for sql in _sql_indice_sqlite(tabela):
+                cursor.execute(sql)
+        except Exception:
+            # SQLite compilado sem FTS5 ou anterior ao tokenizador trigram (3.34).
+            _tem_fts.pop(connection.alias, None)
+            return False
+        # Tabela nova ou triggers recriados: reindexa tudo a partir do documento.
+        cursor.execute(f"INSERT INTO {TABELA_FTS}({TABELA_FTS}) VALUES ('rebuild')")
+    _tem_fts.pop(connection.alias, None)
+    return True
+
+
+def remover_indice(connection, tabela='socios_socio') -> None:
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(f'DROP INDEX IF EXISTS {tabela}_busca_trgm')
+        elif connection.vendor == 'sqlite':
+            for sufixo in ('ai', 'ad', 'au'):
+                cursor.execute(f'DROP TRIGGER IF EXISTS {TABELA_FTS}_{sufixo}')
+            cursor.execute(f'DROP TABLE IF EXISTS {TABELA_FTS}')
+    _tem_fts.pop(connection.alias, None)
+
+
+def _expressao_fts(termos) -> str:
+    # Cada termo entre aspas é uma busca de substring no tokenizador trigram.
+    return ' AND '.join('"{}"'.format(termo.replace('"', '""')) for termo in termos)
+
+
+def buscar_socios(queryset, termo):
+    """
+    Filtra ``queryset`` pelos sócios que contêm todos os termos de ``termo``,
+    do mais parecido para o menos parecido. Busca vazia devolve o queryset
+    sem alterações.
+    """
+    termos = termos_busca(termo)
+    if not termos:
+        return queryset
+
+    for parte in termos:
+        queryset = queryset.filter(busca__contains=parte)
+
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql':
+        from django.contrib.postgres.search import TrigramWordSimilarity
+
+        # word_similarity devolve real; em double precision o valor volta
+        # idêntico no cursor da paginação (services.pagination).
+        return queryset.annotate(
+            relevancia=Cast(TrigramWordSimilarity(' '.join(termos), 'busca'), FloatField()),
+        ).order_by('-relevancia', 'nome_completo')
+
+    if connection.vendor == 'sqlite' and _tabela_fts_disponivel(connection):
+        # O tokenizador trigram só indexa termos com 3 caracteres ou mais; os
+        # menores ficam só no filtro acima.
+        longos = [parte for parte in termos if len(parte) >= 3]
+        if longos:
+            # Um bm25() por linha refaria o MATCH para cada resultado; a posição
+            # do termo no documento (nomes vêm primeiro) basta para o dev.
+            return queryset.filter(
+                pk__in=RawSQL(
+                    f'SELECT rowid FROM {TABELA_FTS} WHERE {TABELA_FTS} MATCH %s',
+                    [_expressao_fts(longos)],
+                ),
+            ).annotate(
+                relevancia=-StrIndex('busca', Value(longos[0])),
+            ).order_by('-relevancia', 'nome_completo')
+
+    return queryset.order_by('nome_completo')
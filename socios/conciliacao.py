@@ -0,0 +1,365 @@
+"""
+Conciliação de mensalidades a partir do extrato bancário/PIX.
+
+O tesoureiro envia o extrato exportado pelo banco (OFX, CSV ou XLSX) e cada
+crédito é associado a um sócio usando dicionários montados uma vez:
+
+1. CPF: o documento do pagador, ou um CPF que apareça na descrição;
+2. nome: o nome do pagador ou o trecho mais longo da descrição que seja o
+   nome completo (ou social) de um sócio; homônimos são desempatados pelo
+   valor do plano;
+3. valor: o único sócio inadimplente ou aguardando pagamento cujo plano
+   custa exatamente aquele valor.
+
+Os créditos associados viram ``HistoricoPagamento`` com um ``bulk_create``
+e os sócios têm ``data_vencimento``/``status`` avançados num único UPDATE
+(como faz ``registrar_pagamento``, um de cada vez). Os demais ficam na fila
+de revisão (``LancamentoExtrato`` pendente), onde alguém indica o sócio ou
+ignora o lançamento. Débitos são descartados e lançamentos já importados
+(mesma ``chave``) não geram pagamento de novo.
+"""
+import hashlib
+import os
+import re
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.db.models import Case, DateField, Value, When
+from django.utils import timezone
+
+from .arquivos import PlanilhaInvalida, data_celula, ler_planilha, texto_celula
+from .busca import normalizar, somente_digitos
+from .financeiro import recalcular_meses
+from .models import HistoricoPagamento, LancamentoExtrato, Socio
+
+EXTENSOES_EXTRATO = ('.ofx', '.csv', '.xlsx')
+
+# Cabeçalho normalizado -> campo, para extratos em CSV/XLSX.
+CABECALHOS_EXTRATO = {
+    'data': 'data',
+    'data lancamento': 'data',
+    'data do lancamento': 'data',
+    'data movimento': 'data',
+    'valor': 'valor',
+    'valor (r$)': 'valor',
+    'credito': 'credito',
+    'credito (r$)': 'credito',
+    'entrada': 'credito',
+    'descricao': 'descricao',
+    'historico': 'descricao',
+    'lancamento': 'descricao',
+    'detalhes': 'descricao',
+    'nome': 'pagador',
+    'pagador': 'pagador',
+    'nome do pagador': 'pagador',
+    'remetente': 'pagador',
+    'origem': 'pagador',
+    'cpf': 'documento',
+    'cpf/cnpj': 'documento',
+    'documento': 'documento',
+    'cpf do pagador': 'documento',
+    'id': 'id',
+    'identificador': 'id',
+    'id transacao': 'id',
+    'id da transacao': 'id',
+    'e2e': 'id',
+    'end to end': 'id',
+}
+
+# Sócios nesses status são os candidatos da associação só pelo valor.
+STATUS_AGUARDANDO = ('inadimplente', 'pendente_pagamento')
+
+# Maior nome (em palavras) procurado dentro da descrição.
+MAX_PALAVRAS_NOME = 8
+
+_CPF = re.compile(r'(?<!\d)\d{3}\.?\d{3}\.?\d{3}-?\d{2}(?!\d)')
+_TRANSACAO_OFX = re.compile(r'<STMTTRN>(.*?)</STMTTRN>', re.S | re.I)
+
+
+def _valor(bruto):
+    """Decimal de ``1.234,56``, ``1234.56``, ``R$ -50,00`` ou de uma célula numérica."""
+    if isinstance(bruto, (int, float, Decimal)):
+        return Decimal(str(bruto)).quantize(Decimal('0.01'))
+    texto = texto_celula(bruto).replace('R$', '').replace(' ', '')
+    if ',' in texto:
+        texto = texto.replace('.', '').replace(',', '.')
+    try:
+        return Decimal(texto).quantize(Decimal('0.01'))
+    except InvalidOperation:
+        raise ValueError(bruto)
+
+
+def _lancamento(data, valor, descricao='', pagador='', documento='', identificador='', arquivo=''):
+    return LancamentoExtrato(
+        chave=identificador,
+        data=data,
+        valor=valor,
+        descricao=descricao[:255],
+        pagador=pagador[:200],
+        documento=somente_digitos(documento)[:20],
+        arquivo=arquivo[:255],
+    )
+
+
+def _ler_ofx(arquivo, nome):
+    bruto = arquivo.read()
+    try:
+        texto = bruto.decode('utf-8')
+    except UnicodeDecodeError:
+        texto = bruto.decode('cp1252', errors='replace')
+
+    def campo(bloco, tag):
+        encontrado = re.search(rf'<{tag}>([^<\r\n]*)', bloco, re.I)
+        return encontrado.group(1).strip() if encontrado else ''
+
+    for bloco in _TRANSACAO_OFX.findall(texto):
+        try:
+            data = datetime.strptime(campo(bloco, 'DTPOSTED')[:8], '%Y%m%d').date()
+            valor = _valor(campo(bloco, 'TRNAMT'))
+        except ValueError:
+            continue
+        yield _lancamento(
+            data, valor,
+            descricao=campo(bloco, 'MEMO') or campo(bloco, 'NAME'),
+            pagador=campo(bloco, 'NAME'),
+            identificador=campo(bloco, 'FITID'),
+            arquivo=nome,
+        )
+
+
+def _ler_planilha_extrato(arquivo, nome):
+    linhas = ler_planilha(arquivo, nome)
+    cabecalho = next(linhas, None) or []
+    colunas = {}
+    for indice, titulo in enumerate(cabecalho):
+        campo = CABECALHOS_EXTRATO.get(normalizar(texto_celula(titulo)))
+        if campo and campo not in colunas.values():
+            colunas[indice] = campo
+    if 'data' not in colunas.values() or not {'valor', 'credito'} & set(colunas.values()):
+        raise PlanilhaInvalida('O extrato precisa das colunas Data e Valor (ou Crédito).')
+
+    for linha in linhas:
+        valores = {campo: linha[indice] for indice, campo in colunas.items() if indice < len(linha)}
+        try:
+            data = data_celula(valores.get('data'))
+            valor = _valor(valores.get('valor') if texto_celula(valores.get('valor')) else valores.get('credito'))
+        except ValueError:
+            continue  # linhas de saldo, totais e cabeçalhos repetidos
+        yield _lancamento(
+            data, valor,
+            descricao=texto_celula(valores.get('descricao')),
+            pagador=texto_celula(valores.get('pagador')),
+            documento=texto_celula(valores.get('documento')),
+            identificador=texto_celula(valores.get('id')),
+            arquivo=nome,
+        )
+
+
+def ler_extrato(arquivo, nome):
+    """Lançamentos (``LancamentoExtrato`` não salvos) do extrato ``arquivo`` (binário)."""
+    extensao = os.path.splitext(nome.lower())[1]
+    if extensao == '.ofx':
+        lancamentos = _ler_ofx(arquivo, nome)
+    elif extensao in ('.csv', '.xlsx'):
+        lancamentos = _ler_planilha_extrato(arquivo, nome)
+    else:
+        raise PlanilhaInvalida(f'Formato não suportado: use {", ".join(EXTENSOES_EXTRATO)}.')
+
+    # Sem identificador do banco, a chave é um hash do conteúdo; lançamentos
+    # idênticos no mesmo extrato (dois PIX iguais no dia) são numerados. Um
+    # identificador repetido no arquivo também é numerado a partir do segundo.
+    ocorrencias = Counter()
+    for lancamento in lancamentos:
+        if lancamento.chave:
+            base = f'id|{lancamento.chave}'
+            ocorrencias[base] += 1
+            if ocorrencias[base] > 1:
+                base = f'{base}|{ocorrencias[base]}'
+        else:
+            base = '|'.join([
+                lancamento.data.isoformat(), str(lancamento.valor),
+                lancamento.descricao, lancamento.pagador, lancamento.documento,
+            ])
+            ocorrencias[base] += 1
+            base = f'{base}|{ocorrencias[base]}'
+        lancamento.chave = hashlib.sha256(base.encode()).hexdigest()
+        yield lancamento
+
+
+class Conciliador:
+    """Associa lançamentos a sócios com dicionários de CPF, nome e valor montados uma vez."""
+
+    def __init__(self):
+        self.socios = {}
+        self.por_cpf = {}
+        self.por_nome = defaultdict(set)
+        self.por_valor = defaultdict(set)
+
+        for socio in Socio.objects.select_related('tipo_assinatura').exclude(status='inativo'):
+            self.socios[socio.pk] = socio
+            self.por_cpf[somente_digitos(socio.cpf)] = socio.pk
+            for nome in (socio.nome_completo, socio.nome_social):
+                if len(normalizar(nome).split()) >= 2:
+                    self.por_nome[normalizar(nome)].add(socio.pk)
+            if socio.status in STATUS_AGUARDANDO and socio.tipo_assinatura and not socio.bolsista:
+                self.por_valor[socio.tipo_assinatura.valor_mensal].add(socio.pk)
+
+    def _valor_do_plano(self, pk):
+        plano = self.socios[pk].tipo_assinatura
+        return plano.valor_mensal if plano else None
+
+    def _por_nome(self, texto):
+        """Sócios cujo nome é o trecho mais longo de ``texto``."""
+        palavras = normalizar(texto).split()
+        for tamanho in range(min(MAX_PALAVRAS_NOME, len(palavras)), 1, -1):
+            encontrados = set()
+            for inicio in range(len(palavras) - tamanho + 1):
+                encontrados |= self.por_nome.get(' '.join(palavras[inicio:inicio + tamanho]), set())
+            if encontrados:
+                return encontrados
+        return set()
+
+    def encontrar(self, lancamento):
+        """``(socio, criterio)`` do lançamento, ou ``(None, '')``."""
+        cpfs = [lancamento.documento] + [somente_digitos(c) for c in _CPF.findall(lancamento.descricao)]
+        for cpf in cpfs:
+            if cpf in self.por_cpf:
+                return self.socios[self.por_cpf[cpf]], 'cpf'
+
+        for texto in (lancamento.pagador, lancamento.descricao):
+            candidatos = self._por_nome(texto)
+            if len(candidatos) > 1:
+                candidatos = {pk for pk in candidatos if self._valor_do_plano(pk) == lancamento.valor}
+            if len(candidatos) == 1:
+                return self.socios[candidatos.pop()], 'nome'
+
+        candidatos = self.por_valor.get(lancamento.valor, set())
+        if len(candidatos) == 1:
+            return self.socios[next(iter(candidatos))], 'valor'
+        return None, ''
+
+    def pago(self, socio):
+        """Tira o sócio da busca por valor: a pendência dele foi paga."""
+        for candidatos in self.por_valor.values():
+            candidatos.discard(socio.pk)
+
+
+def registrar_pagamentos(itens, usuario=None, forma_pagamento='pix'):
+    """
+    Cria os pagamentos confirmados de ``itens`` (``[(lancamento, socio,
+    criterio)]``) e avança vencimento e status dos sócios com plano, como
+    ``registrar_pagamento``, mas sem recuar um vencimento já adiantado.
+    Marca os lançamentos como conciliados; salvá-los fica com quem chama.
+    """
+    agora = timezone.now()
+    pagamentos, vencimentos = [], {}
+    for lancamento, socio, criterio in itens:
+        origem = f'extrato {lancamento.arquivo}' if lancamento.arquivo else 'extrato'
+        pagamentos.append(HistoricoPagamento(
+            socio=socio,
+            data_pagamento=lancamento.data,
+            data_vencimento=socio.data_vencimento or lancamento.data,
+            valor=lancamento.valor,
+            mes_referencia=lancamento.data.replace(day=1),
+            forma_pagamento=forma_pagamento,
+            status='confirmado',
+            descricao=f'Conciliação de {origem}: {lancamento.descricao or lancamento.pagador}',
+            created_by=usuario,
+        ))
+        if socio.tipo_assinatura:
+            novo = lancamento.data + timedelta(days=socio.tipo_assinatura.duracao_dias)
+            vencimentos[socio.pk] = max(novo, vencimentos.get(socio.pk, date.min), socio.data_vencimento or date.min)
+
+    HistoricoPagamento.objects.bulk_create(pagamentos)
+    for (lancamento, socio, criterio), pagamento in zip(itens, pagamentos):
+        lancamento.socio = socio
+        lancamento.pagamento = pagamento
+        lancamento.criterio = criterio
+        lancamento.status = LancamentoExtrato.STATUS_CONCILIADO
+        lancamento.conciliado_em = agora
+
+    meses = {pagamento.data_pagamento for pagamento in pagamentos}
+    if vencimentos:
+        reativados = Socio.objects.filter(pk__in=vencimentos).exclude(data_inativacao=None)
+        # Sócios inativos reativados saem dos "perdidos" do mês em que saíram
+        meses.update(reativados.values_list('data_inativacao', flat=True))
+        Socio.objects.filter(pk__in=vencimentos).update(
+            status='ativo',
+            data_inativacao=None,
+            data_vencimento=Case(
+                *[When(pk=pk, then=Value(vencimento)) for pk, vencimento in vencimentos.items()],
+                output_field=DateField(),
+            ),
+            updated_at=agora,
+        )
+
+    # bulk_create e update() não disparam os sinais que mantêm o resumo financeiro.
+    if meses:
+        transaction.on_commit(lambda: recalcular_meses(meses))
+    return pagamentos
+
+
+@transaction.atomic
+def conciliar_extrato(arquivo, nome, usuario=None, forma_pagamento='pix'):
+    """
+    Lê o extrato, registra os pagamentos identificados e põe o resto na fila
+    de revisão. Devolve ``{'creditos', 'conciliados', 'revisao', 'repetidos',
+    'debitos'}``.
+    """
+    lancamentos = list(ler_extrato(arquivo, nome))
+    creditos = [lancamento for lancamento in lancamentos if lancamento.valor > 0]
+    resultado = {
+        'creditos': len(creditos),
+        'debitos': len(lancamentos) - len(creditos),
+        'conciliados': 0,
+        'revisao': 0,
+        'repetidos': 0,
+    }
+
+    existentes = set(
+        LancamentoExtrato.objects.filter(chave__in=[l.chave for l in creditos]).values_list('chave', flat=True)
+    )
+    novos = [lancamento for lancamento in creditos if lancamento.chave not in existentes]
+    resultado['repetidos'] = len(creditos) - len(novos)
+
+    conciliador = Conciliador()
+    itens = []
+    for lancamento in novos:
+        lancamento.created_by = usuario
+        socio, criterio = conciliador.encontrar(lancamento)
+        if socio is not None:
+            itens.append((lancamento, socio, criterio))
+            conciliador.pago(socio)
+
+    registrar_pagamentos(itens, usuario, forma_pagamento)
+    LancamentoExtrato.objects.bulk_create(novos)
+    resultado['conciliados'] = len(itens)
+    resultado['revisao'] = len(novos) - len(itens)
+    return resultado
+
+
+@transaction.atomic
+def conciliar_manualmente(lancamento, socio, usuario=None, forma_pagamento='pix'):
+    """
+    Registra o pagamento de um lançamento da fila de revisão para ``socio``.
+    Devolve False se o lançamento já tinha saído da fila.
+    """
+    # UPDATE condicional: um envio duplo do formulário (ou dois usuários na
+    # mesma fila) não registra o mesmo crédito duas vezes.
+    if not resolver_pendente(lancamento, LancamentoExtrato.STATUS_CONCILIADO):
+        return False
+    registrar_pagamentos([(lancamento, socio, 'manual')], usuario, forma_pagamento)
+    lancamento.save(update_fields=['socio', 'pagamento', 'criterio', 'status', 'conciliado_em'])
+    return True
+
+
+def resolver_pendente(lancamento, status):
+    """Tira ``lancamento`` da fila de revisão com ``status``; False se outro processo já o fez."""
+    if not LancamentoExtrato.objects.filter(
+        pk=lancamento.pk, status=LancamentoExtrato.STATUS_PENDENTE,
+    ).update(status=status):
+        return False
+    lancamento.status = status
+    return True
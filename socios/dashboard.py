@@ -0,0 +1,161 @@
+"""
+Métricas agregadas do dashboard de sócios.
+
+O ``DashboardSnapshot`` calcula todos os contadores, a série de evolução dos
+últimos 12 meses e a distribuição por plano em um número fixo de consultas,
+independente da quantidade de sócios. É usado pela página do dashboard e pelo
+endpoint JSON, que compartilham exatamente os mesmos números.
+"""
+from __future__ import annotations
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from .models import HistoricoPagamento, Socio, TipoAssinatura
+
+
+def _inicio_mes(dia: date) -> date:
+    return dia.replace(day=1)
+
+
+def _mes_anterior(mes: date) -> date:
+    return (mes - timedelta(days=1)).replace(day=1)
+
+
+def ultimos_meses(hoje: date, quantidade: int = 12) -> list[date]:
+    """Primeiro dia de cada um dos últimos ``quantidade`` meses, do mais antigo ao atual."""
+    meses = [_inicio_mes(hoje)]
+    for _ in range(quantidade - 1):
+        meses.append(_mes_anterior(meses[-1]))
+    meses.reverse()
+    return meses
+
+
+class DashboardSnapshot:
+    """Fotografia das métricas do dashboard de sócios em uma data de referência."""
+
+    DIAS_VENCE_EM_BREVE = 7
+    MESES_EVOLUCAO = 12
+    LIMITE_LISTAS = 5
+
+    def __init__(self, hoje: date | None = None):
+        self.hoje = hoje or timezone.now().date()
+        self._contadores = None
+        self._receita_mensal = None
+        self._evolucao_socios = None
+        self._distribuicao_planos = None
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+
+    @property
+    def contadores(self) -> dict:
+        """Totais de sócios por situação, em uma única consulta agregada."""
+        if self._contadores is None:
+            data_limite = self.hoje + timedelta(days=self.DIAS_VENCE_EM_BREVE)
+            self._contadores = Socio.objects.aggregate(
+                total_socios=Count('id'),
+                socios_ativos=Count('id', filter=Q(status='ativo')),
+                socios_inadimplentes=Count('id', filter=Q(status='inadimplente')),
+                vencem_em_breve=Count('id', filter=Q(
+                    status='ativo',
+                    bolsista=False,
+                    data_vencimento__isnull=False,
+                    data_vencimento__lte=data_limite,
+                )),
+            )
+        return self._contadores
+
+    @property
+    def receita_mensal(self) -> Decimal:
+        """Pagamentos confirmados com referência a partir do mês atual."""
+        if self._receita_mensal is None:
+            self._receita_mensal = HistoricoPagamento.objects.filter(
+                socio__deleted_at__isnull=True,
+                mes_referencia__gte=_inicio_mes(self.hoje),
+                status='confirmado',
+            ).aggregate(total=Sum('valor'))['total'] or Decimal('0.00')
+        return self._receita_mensal
+
+    @property
+    def evolucao_socios(self) -> list[dict]:
+        """
+        Total acumulado de sócios ao fim de cada um dos últimos 12 meses.
+
+        Um único GROUP BY por mês de associação; o acumulado é somado em Python
+        sobre poucas linhas (uma por mês com novas associações).
+        """
+        if self._evolucao_socios is None:
+            novos_por_mes = (
+                Socio.objects
+                .filter(data_associacao__isnull=False, data_associacao__lte=self.hoje)
+                .annotate(mes=TruncMonth('data_associacao'))
+                .values('mes')
+                .annotate(novos=Count('id'))
+                .order_by('mes')
+            )
+            novos = {linha['mes']: linha['novos'] for linha in novos_por_mes}
+
+            meses = ultimos_meses(self.hoje, self.MESES_EVOLUCAO)
+            acumulado = sum(total for mes, total in novos.items() if mes < meses[0])
+            evolucao = []
+            for mes in meses:
+                acumulado += novos.get(mes, 0)
+                evolucao.append({'mes': mes.strftime('%m/%Y'), 'total': acumulado})
+            self._evolucao_socios = evolucao
+        return self._evolucao_socios
+
+    @property
+    def distribuicao_planos(self) -> list[dict]:
+        """Quantidade de sócios (não excluídos) por tipo de assinatura."""
+        if self._distribuicao_planos is None:
+            self._distribuicao_planos = list(
+                TipoAssinatura.objects.annotate(
+                    total_socios=Count('socio', filter=Q(socio__deleted_at__isnull=True))
+                ).values('id', 'nome', 'total_socios', 'cor')
+            )
+        return self._distribuicao_planos
+
+    def proximos_vencimentos(self):
+        """Os próximos vencimentos de sócios ativos (exclui bolsistas)."""
+        return Socio.objects.filter(
+            status='ativo',
+            data_vencimento__isnull=False,
+            bolsista=False,
+        ).order_by('data_vencimento')[:self.LIMITE_LISTAS]
+
+    def novos_socios(self):
+        """Os sócios associados mais recentemente."""
+        return Socio.objects.filter(
+            data_associacao__isnull=False
+        ).select_related('tipo_assinatura').order_by('-data_associacao')[:self.LIMITE_LISTAS]
+
+    # ------------------------------------------------------------------
+    # Saídas
+    # ------------------------------------------------------------------
+
+    def as_context(self) -> dict:
+        """Contexto usado pelo template ``socios/dashboard.html``."""
+        return {
+            **self.contadores,
+            'receita_mensal': self.receita_mensal,
+            'evolucao_socios': self.evolucao_socios,
+            'distribuicao_planos': self.distribuicao_planos,
+            'proximos_vencimentos': self.proximos_vencimentos(),
+            'novos_socios': self.novos_socios(),
+        }
+
+    def as_dict(self) -> dict:
+        """Versão serializável em JSON (sem as listas de sócios)."""
+        return {
+            'data_referencia': self.hoje.isoformat(),
+            **self.contadores,
+            'receita_mensal': str(self.receita_mensal),
+            'evolucao_socios': self.evolucao_socios,
+            'distribuicao_planos': self.distribuicao_planos,
+        }
@@ -0,0 +1,231 @@
+"""
+Exportações de sócios e pagamentos (CSV/XLSX).
+
+A geração em si (leitura em blocos e resposta em streaming) fica em
+``services.exports``; aqui ficam as colunas, os filtros (os mesmos da
+listagem) e as exportações em segundo plano:
+
+* ``solicitar_exportacao`` enfileira um ``Exportacao`` — ou devolve o já
+  existente para o mesmo tipo, formato e filtros, se ainda estiver na fila,
+  sendo gerado ou dentro do prazo de ``EXPORTACAO_TTL_MINUTOS``;
+* o job ``socios.gerar_exportacoes`` chama ``processar_exportacoes``, que
+  reserva cada pedido pela fila de ``socios.arquivos`` (só um worker ganha) e
+  grava o arquivo em ``MEDIA_ROOT``: CSV compactado em gzip ou XLSX (que já
+  é zip);
+* ``limpar_exportacoes`` apaga arquivos e registros vencidos.
+"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from services.exports import Column, write_csv, write_xlsx
+
+from .arquivos import apagar_arquivo, processar_fila, reservar, sinal_de_vida
+from .busca import buscar_socios
+from .models import Exportacao, HistoricoPagamento, Socio
+
+logger = logging.getLogger(__name__)
+
+COLUNAS_SOCIOS = [
+    Column('Número Sócio', lambda s: s.numero_socio),
+    Column('Nome Completo', lambda s: s.nome_completo),
+    Column('Nome Social', lambda s: s.nome_social),
+    Column('CPF', lambda s: s.cpf),
+    Column('Email', lambda s: s.email),
+    Column('Telefone', lambda s: s.telefone or s.celular),
+    Column('Status', lambda s: s.get_status_display()),
+    Column('Tipo Assinatura', lambda s: s.tipo_assinatura.nome if s.tipo_assinatura else ''),
+    Column('Bolsista', lambda s: s.bolsista),
+    Column('Data Associação', lambda s: s.data_associacao),
+    Column('Data Vencimento', lambda s: s.data_vencimento),
+    Column('Rating FIDE', lambda s: s.rating_fide),
+    Column('Rating CBX', lambda s: s.rating_cbx),
+    Column('Cidade', lambda s: s.cidade),
+    Column('Estado', lambda s: s.estado),
+]
+
+COLUNAS_PAGAMENTOS = [
+    Column('Número Sócio', lambda p: p.socio.numero_socio),
+    Column('Sócio', lambda p: p.socio.nome_completo),
+    Column('Mês Referência', lambda p: p.mes_referencia.strftime('%m/%Y')),
+    Column('Data Pagamento', lambda p: p.data_pagamento),
+    Column('Data Vencimento', lambda p: p.data_vencimento),
+    Column('Valor', lambda p: p.valor),
+    Column('Forma de Pagamento', lambda p: p.get_forma_pagamento_display()),
+    Column('Status', lambda p: p.get_status_display()),
+    Column('Descrição', lambda p: p.descricao),
+    Column('Registrado em', lambda p: p.created_at),
+]
+
+
+def nome_arquivo(prefixo):
+    return f'{prefixo}_{timezone.localtime().strftime("%Y%m%d_%H%M%S")}'
+
+
+def filtrar_socios(params):
+    """Sócios filtrados como na listagem: ``status``, ``plano`` e ``busca``."""
+    socios = Socio.objects.select_related('tipo_assinatura').all()
+
+    if params.get('status'):
+        socios = socios.filter(status=params['status'])
+    if params.get('plano'):
+        socios = socios.filter(tipo_assinatura_id=params['plano'])
+    if params.get('busca'):
+        socios = buscar_socios(socios, params['busca'])
+
+    return socios
+
+
+def _data(valor):
+    try:
+        return parse_date(valor or '')
+    except ValueError:
+        return None
+
+
+def filtrar_pagamentos(params):
+    """
+    Pagamentos filtrados por ``status``, ``forma_pagamento``, ``socio`` (id) e
+    período de pagamento (``data_inicio``/``data_fim``, AAAA-MM-DD).
+    """
+    pagamentos = HistoricoPagamento.objects.select_related('socio').order_by('-data_pagamento', '-id')
+
+    if params.get('status'):
+        pagamentos = pagamentos.filter(status=params['status'])
+    if params.get('forma_pagamento'):
+        pagamentos = pagamentos.filter(forma_pagamento=params['forma_pagamento'])
+    if str(params.get('socio') or '').isdigit():
+        pagamentos = pagamentos.filter(socio_id=params['socio'])
+
+    # Datas inválidas são ignoradas: o erro apareceria só no meio do download.
+    data_inicio = _data(params.get('data_inicio'))
+    data_fim = _data(params.get('data_fim'))
+    if data_inicio:
+        pagamentos = pagamentos.filter(data_pagamento__gte=data_inicio)
+    if data_fim:
+        pagamentos = pagamentos.filter(data_pagamento__lte=data_fim)
+
+    return pagamentos
+
+
+# tipo -> (filtros aceitos, função de filtro, colunas, nome da planilha)
+EXPORTACOES = {
+    Exportacao.TIPO_SOCIOS: (('status', 'plano', 'busca'), filtrar_socios, COLUNAS_SOCIOS, 'Sócios'),
+    Exportacao.TIPO_PAGAMENTOS: (
+        ('status', 'forma_pagamento', 'socio', 'data_inicio', 'data_fim'),
+        filtrar_pagamentos, COLUNAS_PAGAMENTOS, 'Pagamentos',
+    ),
+}
+
+
+def normalizar_filtros(tipo, params):
+    """Só os filtros que o tipo aceita, sem vazios (dois pedidos iguais geram o mesmo dict)."""
+    aceitos = EXPORTACOES[tipo][0]
+    return {nome: str(params.get(nome)).strip() for nome in aceitos if str(params.get(nome) or '').strip()}
+
+
+def chave_exportacao(tipo, formato, filtros):
+    bruto = json.dumps([tipo, formato, filtros], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(bruto.encode()).hexdigest()
+
+
+def solicitar_exportacao(tipo, formato, params, usuario=None):
+    """
+    ``(exportacao, reaproveitada)``. Reaproveita a exportação com a mesma chave
+    que ainda está na fila, sendo gerada ou concluída e dentro da validade.
+    """
+    filtros = normalizar_filtros(tipo, params)
+    chave = chave_exportacao(tipo, formato, filtros)
+    agora = timezone.now()
+
+    existente = Exportacao.objects.filter(chave=chave).filter(
+        Q(status__in=[Exportacao.STATUS_PENDENTE, Exportacao.STATUS_PROCESSANDO])
+        | Q(status=Exportacao.STATUS_CONCLUIDO, expira_em__gt=agora)
+    ).order_by('-created_at').first()
+    if existente is not None:
+        return existente, True
+
+    exportacao = Exportacao.objects.create(
+        tipo=tipo,
+        formato=formato,
+        filtros=filtros,
+        chave=chave,
+        solicitado_por=usuario if usuario is not None and usuario.is_authenticated else None,
+    )
+    return exportacao, False
+
+
+def gerar_arquivo(exportacao):
+    """Gera o arquivo de ``exportacao`` e o salva em ``MEDIA_ROOT``."""
+    _, filtrar, colunas, planilha = EXPORTACOES[exportacao.tipo]
+    queryset = filtrar(exportacao.filtros)
+    total = queryset.count()
+    sinal_de_vida(exportacao, total_linhas=total)
+
+    def progresso(linhas):
+        sinal_de_vida(exportacao, linhas_processadas=linhas)
+
+    carimbo = timezone.localtime().strftime('%Y%m%d_%H%M%S')
+    with tempfile.TemporaryDirectory() as pasta:
+        if exportacao.formato == 'xlsx':
+            nome = f'{exportacao.tipo}_{carimbo}.xlsx'
+            caminho = os.path.join(pasta, nome)
+            with open(caminho, 'wb') as saida:
+                write_xlsx(saida, queryset, colunas, sheet_title=planilha, progress=progresso)
+        else:
+            nome = f'{exportacao.tipo}_{carimbo}.csv.gz'
+            caminho = os.path.join(pasta, nome)
+            with gzip.open(caminho, 'wt', encoding='utf-8', newline='') as saida:
+                write_csv(saida, queryset, colunas, progress=progresso)
+
+        with open(caminho, 'rb') as arquivo:
+            exportacao.arquivo.save(nome, File(arquivo), save=False)
+
+    agora = timezone.now()
+    exportacao.status = Exportacao.STATUS_CONCLUIDO
+    exportacao.total_linhas = total
+    exportacao.linhas_processadas = total
+    exportacao.erro = ''
+    exportacao.concluido_em = agora
+    exportacao.expira_em = agora + timedelta(minutes=settings.EXPORTACAO_TTL_MINUTOS)
+    exportacao.save(update_fields=[
+        'arquivo', 'status', 'total_linhas', 'linhas_processadas', 'erro',
+        'concluido_em', 'expira_em', 'atualizado_em',
+    ])
+    return exportacao
+
+
+def _reservar():
+    """Reserva o pedido mais antigo; um abandonado no meio da geração é refeito."""
+    return reservar(Exportacao, retomar_abandonados=True, linhas_processadas=0, erro='')
+
+
+def processar_exportacoes(limite=5):
+    """Gera até ``limite`` exportações da fila. Devolve (concluídas, com erro)."""
+    return processar_fila(_reservar, gerar_arquivo, limite)
+
+
+def limpar_exportacoes():
+    """Apaga arquivo e registro das exportações vencidas ou que falharam há mais de um dia."""
+    agora = timezone.now()
+    vencidas = Exportacao.objects.filter(
+        Q(status=Exportacao.STATUS_CONCLUIDO, expira_em__lt=agora)
+        | Q(status=Exportacao.STATUS_FALHOU, concluido_em__lt=agora - timedelta(days=1))
+    )
+    removidas = 0
+    for exportacao in vencidas.iterator():
+        if exportacao.arquivo:
+            apagar_arquivo(exportacao.arquivo)
+        exportacao.delete()
+        removidas += 1
+    return removidas
@@ -0,0 +1,123 @@
+"""
+Resumo financeiro mensal materializado (``ResumoFinanceiroMensal``).
+
+Cada linha guarda os números de um mês: receita e quantidade de pagamentos
+confirmados, novos sócios, sócios perdidos (pela ``data_inativacao``) e a
+inadimplência por plano. O relatório financeiro lê essas linhas em vez de
+varrer o histórico de pagamentos e os vencimentos a cada requisição.
+
+As linhas são recalculadas por mês inteiro, de forma idempotente:
+``recalcular_mes`` pode ser chamado quantas vezes for preciso que o resultado
+é o mesmo. Os sinais em ``socios.signals`` chamam ``recalcular_meses`` apenas
+com os meses tocados por um pagamento criado, editado, estornado ou removido.
+"""
+from __future__ import annotations
+
+import logging
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from .dashboard import ultimos_meses
+from .models import HistoricoPagamento, ResumoFinanceiroMensal, Socio
+
+logger = logging.getLogger(__name__)
+
+
+def inicio_mes(dia: date) -> date:
+    return dia.replace(day=1)
+
+
+def fim_mes(mes: date) -> date:
+    proximo = (mes.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return proximo - timedelta(days=1)
+
+
+def _inadimplencia_por_plano(hoje: date) -> tuple[Decimal, dict]:
+    """Valor em atraso agrupado por plano (exclui bolsistas)."""
+    inadimplentes = Socio.objects.inadimplentes(hoje)
+    por_plano = {
+        linha['tipo_assinatura__nome'] or 'Sem plano': {
+            'socios': linha['socios'],
+            'valor': str(linha['valor'] or Decimal('0.00')),
+        }
+        for linha in inadimplentes.por_plano()
+    }
+    return inadimplentes.valor_total(), por_plano
+
+
+def recalcular_mes(mes: date) -> ResumoFinanceiroMensal:
+    """Recalcula (ou cria) o resumo do mês que contém ``mes``."""
+    mes = inicio_mes(mes)
+    ultimo_dia = fim_mes(mes)
+    hoje = timezone.now().date()
+
+    pagamentos = HistoricoPagamento.objects.filter(
+        data_pagamento__gte=mes,
+        data_pagamento__lte=ultimo_dia,
+        status='confirmado',
+    ).aggregate(receita=Sum('valor'), quantidade=Count('id'))
+
+    socios = Socio.all_objects.aggregate(
+        novos=Count('id', filter=Q(
+            deleted_at__isnull=True,
+            data_associacao__gte=mes,
+            data_associacao__lte=ultimo_dia,
+        )),
+        perdidos=Count('id', filter=Q(
+            status='inativo',
+            data_inativacao__gte=mes,
+            data_inativacao__lte=ultimo_dia,
+        )),
+    )
+
+    valores = {
+        'receita': pagamentos['receita'] or Decimal('0.00'),
+        'pagamentos_confirmados': pagamentos['quantidade'],
+        'novos_socios': socios['novos'],
+        'socios_perdidos': socios['perdidos'],
+    }
+
+    # A inadimplência é uma fotografia: só o mês corrente é atualizado, os
+    # meses fechados mantêm o valor registrado no último cálculo.
+    if mes == inicio_mes(hoje):
+        valores['valor_inadimplencia'], valores['inadimplencia_por_plano'] = _inadimplencia_por_plano(hoje)
+
+    resumo, _ = ResumoFinanceiroMensal.objects.update_or_create(mes=mes, defaults=valores)
+    return resumo
+
+
+def recalcular_meses(meses) -> None:
+    """Recalcula cada mês distinto de ``meses`` (datas quaisquer dentro do mês)."""
+    for mes in sorted({inicio_mes(m) for m in meses if m}):
+        recalcular_mes(mes)
+
+
+def resumos_ultimos_meses(hoje: date | None = None, quantidade: int = 12) -> list[ResumoFinanceiroMensal]:
+    """
+    Resumos dos últimos ``quantidade`` meses, do mais antigo ao atual.
+
+    Lê as linhas materializadas em uma consulta; meses que ainda não têm
+    resumo, e o mês corrente se não foi recalculado hoje, são calculados na
+    hora e gravados.
+    """
+    hoje = hoje or timezone.now().date()
+    meses = ultimos_meses(hoje, quantidade)
+    existentes = {
+        resumo.mes: resumo
+        for resumo in ResumoFinanceiroMensal.objects.filter(mes__gte=meses[0], mes__lte=meses[-1])
+    }
+    faltando = [mes for mes in meses if mes not in existentes]
+    # A fotografia da inadimplência do mês corrente envelhece com os dias
+    # (vencimentos passam sem que nenhum pagamento dispare os sinais):
+    # refaz o mês no primeiro acesso de cada dia.
+    atual = existentes.get(meses[-1])
+    if atual is not None and atual.atualizado_em.date() < hoje:
+        faltando.append(meses[-1])
+    if faltando:
+        logger.info("Resumo financeiro: calculando %d mês(es) sem resumo", len(faltando))
+        for mes in faltando:
+            existentes[mes] = recalcular_mes(mes)
+    return [existentes[mes] for mes in meses]
@@ -537,4 +537,51 @@ class FiltroSociosForm(forms.Form):
             'class': 'form-control',
             'placeholder': 'Buscar por nome, CPF, email...'
         })
-    )
\ No newline at end of file
+    )
+
+class ImportacaoSociosForm(forms.Form):
+    """Upload da planilha de sócios a importar (processada em segundo plano)"""
+
+    arquivo = forms.FileField(
+        label='Planilha',
+        help_text='CSV (separado por vírgula ou ponto e vírgula) ou Excel (.xlsx), com cabeçalho na primeira linha.',
+        widget=forms.FileInput(attrs={
+            'class': 'form-control',
+            'accept': '.csv,.xlsx',
+        })
+    )
+
+    def clean_arquivo(self):
+        from .importacao import EXTENSOES
+
+        arquivo = self.cleaned_data['arquivo']
+        if not arquivo.name.lower().endswith(EXTENSOES):
+            raise ValidationError('Envie um arquivo .csv ou .xlsx.')
+        return arquivo
+
+
+class ExtratoConciliacaoForm(forms.Form):
+    """Upload do extrato bancário/PIX para conciliar mensalidades"""
+
+    arquivo = forms.FileField(
+        label='Extrato',
+        help_text='OFX, ou CSV/Excel com as colunas Data, Valor (ou Crédito) e, se houver, Descrição, Nome do pagador, CPF e ID da transação.',
+        widget=forms.FileInput(attrs={
+            'class': 'form-control',
+            'accept': '.ofx,.csv,.xlsx',
+        })
+    )
+    forma_pagamento = forms.ChoiceField(
+        label='Forma de pagamento',
+        choices=HistoricoPagamento.forma_pagamento_choices,
+        initial='pix',
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+
+    def clean_arquivo(self):
+        from .conciliacao import EXTENSOES_EXTRATO
+
+        arquivo = self.cleaned_data['arquivo']
+        if not arquivo.name.lower().endswith(EXTENSOES_EXTRATO):
+            raise ValidationError('Envie um extrato .ofx, .csv ou .xlsx.')
+        return arquivo
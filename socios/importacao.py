@@ -0,0 +1,484 @@
+"""
+Importação de sócios em lote a partir de planilhas (CSV ou XLSX).
+
+A planilha é lida em streaming por ``socios.arquivos.ler_planilha`` (``csv``
+sobre o arquivo, openpyxl em modo somente leitura) e processada em lotes de
+``TAMANHO_LOTE`` linhas:
+
+* cada linha é validada com as regras do cadastro: as regexes de
+  ``Socio.cpf_validator`` e ``Socio.telefone_validator``, e-mail, datas,
+  opções e tamanho máximo dos campos;
+* CPFs (só os dígitos) e números de sócio já usados são carregados uma vez,
+  em conjuntos que também pegam repetições dentro do próprio arquivo;
+* os sócios sem ``Número Sócio`` recebem números reservados de uma vez no
+  contador (``Socio.gerar_numeros_socio``) e o lote entra com um único
+  ``bulk_create``, na mesma transação: se o INSERT falhar, os números voltam.
+
+``bulk_create`` não chama ``Socio.save``, então os padrões de ``save``
+(status, data de associação e de inativação, endereço vazio) e o documento
+de busca são preenchidos aqui, e o resumo financeiro dos meses tocados é
+recalculado depois do commit de cada lote. As linhas recusadas vão para um
+CSV com as colunas originais mais ``Linha`` e ``Erros``; corrigido, ele pode
+ser importado de novo.
+
+O job ``socios.processar_importacoes`` processa, pela fila de
+``socios.arquivos``, os ``Importacao`` enviados pela tela de importação;
+``manage.py importar_socios`` faz o mesmo na hora.
+"""
+import csv
+import io
+import logging
+import os
+import tempfile
+from datetime import timedelta
+
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .arquivos import (
+    EXTENSOES_PLANILHA,
+    PlanilhaInvalida,
+    abandonados,
+    apagar_arquivo,
+    data_celula,
+    ler_planilha,
+    marcar_falha,
+    processar_fila,
+    reservar,
+    sinal_de_vida,
+    texto_celula,
+)
+from .busca import documento_busca, normalizar, somente_digitos
+from .financeiro import recalcular_meses
+from .models import Importacao, Socio, TipoAssinatura
+
+logger = logging.getLogger(__name__)
+
+TAMANHO_LOTE = 1000
+
+EXTENSOES = EXTENSOES_PLANILHA
+
+# Linhas recusadas guardadas em Importacao.erros (o relatório tem todas).
+MAX_ERROS_AMOSTRA = 100
+
+# Importações encerradas (e o relatório de linhas recusadas) somem depois disso.
+VALIDADE_RELATORIO = timedelta(days=30)
+
+# Cabeçalho normalizado (minúsculas, sem acento) -> campo de Socio. Inclui os
+# cabeçalhos da exportação, para que uma planilha exportada volte igual.
+CABECALHOS = {
+    'numero socio': 'numero_socio',
+    'numero do socio': 'numero_socio',
+    'matricula': 'numero_socio',
+    'nome completo': 'nome_completo',
+    'nome': 'nome_completo',
+    'nome social': 'nome_social',
+    'cpf': 'cpf',
+    'rg': 'rg',
+    'data nascimento': 'data_nascimento',
+    'data de nascimento': 'data_nascimento',
+    'nascimento': 'data_nascimento',
+    'genero': 'genero',
+    'sexo': 'genero',
+    'email': 'email',
+    'e-mail': 'email',
+    'telefone': 'telefone',
+    'celular': 'celular',
+    'cep': 'cep',
+    'endereco': 'endereco',
+    'rua': 'endereco',
+    'numero': 'numero',
+    'complemento': 'complemento',
+    'bairro': 'bairro',
+    'cidade': 'cidade',
+    'estado': 'estado',
+    'uf': 'estado',
+    'tipo assinatura': 'tipo_assinatura',
+    'plano': 'tipo_assinatura',
+    'status': 'status',
+    'bolsista': 'bolsista',
+    'data associacao': 'data_associacao',
+    'data de associacao': 'data_associacao',
+    'data vencimento': 'data_vencimento',
+    'data de vencimento': 'data_vencimento',
+    'rating fide': 'rating_fide',
+    'rating cbx': 'rating_cbx',
+    'rating fexerj': 'rating_fexerj',
+    'profissao': 'profissao',
+    'observacoes': 'observacoes',
+}
+
+COLUNAS_OBRIGATORIAS = ('nome_completo', 'cpf', 'data_nascimento', 'email')
+
+CAMPOS_TEXTO = (
+    'nome_completo', 'nome_social', 'rg', 'email', 'cep', 'endereco', 'numero',
+    'complemento', 'bairro', 'cidade', 'profissao', 'observacoes',
+)
+CAMPOS_DATA = ('data_nascimento', 'data_associacao', 'data_vencimento')
+CAMPOS_INTEIROS = ('rating_fide', 'rating_cbx', 'rating_fexerj')
+
+VERDADEIROS = {'sim', 's', 'x', 'true', 'verdadeiro', '1'}
+FALSOS = {'', 'nao', 'n', 'false', 'falso', '0'}
+
+
+def _opcoes(choices):
+    """Código ou rótulo (sem acento, minúsculo) -> código."""
+    mapa = {}
+    for codigo, rotulo in choices:
+        mapa[normalizar(codigo)] = codigo
+        mapa[normalizar(rotulo)] = codigo
+    return mapa
+
+
+GENEROS = {**_opcoes(Socio.genero_choices), 'masculino': 'M', 'feminino': 'F'}
+STATUS = _opcoes(Socio.status_choices)
+
+
+# ----------------------------------------------------------------------
+# Leitura
+# ----------------------------------------------------------------------
+
+def mapear_colunas(cabecalho):
+    """Índice da coluna -> campo de Socio; colunas desconhecidas são ignoradas."""
+    colunas = {}
+    for indice, titulo in enumerate(cabecalho):
+        campo = CABECALHOS.get(normalizar(titulo))
+        if campo and campo not in colunas.values():
+            colunas[indice] = campo
+    faltando = [campo for campo in COLUNAS_OBRIGATORIAS if campo not in colunas.values()]
+    if 'telefone' not in colunas.values() and 'celular' not in colunas.values():
+        faltando.append('telefone')
+    if faltando:
+        nomes = ', '.join(str(Socio._meta.get_field(campo).verbose_name) for campo in faltando)
+        raise PlanilhaInvalida(f'Colunas obrigatórias ausentes: {nomes}.')
+    return colunas
+
+
+# ----------------------------------------------------------------------
+# Validação
+# ----------------------------------------------------------------------
+
+def _telefone(valor):
+    """Telefone como digitado, ou só os dígitos se só a pontuação não bate."""
+    texto = texto_celula(valor)
+    if not texto or Socio.telefone_validator.regex.search(texto):
+        return texto
+    digitos = somente_digitos(texto)
+    if Socio.telefone_validator.regex.search(digitos):
+        return digitos
+    raise ValueError
+
+
+class Validador:
+    """
+    Valida as linhas de uma importação. Guarda os CPFs e números já usados
+    (banco + linhas aceitas do arquivo) e os planos pelo nome.
+    """
+
+    def __init__(self):
+        self.cpfs = {
+            somente_digitos(cpf): None for cpf in Socio.all_objects.values_list('cpf', flat=True).iterator()
+        }
+        self.numeros = {
+            numero: None for numero in Socio.all_objects.values_list('numero_socio', flat=True).iterator()
+        }
+        self.planos = {normalizar(nome): pk for pk, nome in TipoAssinatura.objects.values_list('pk', 'nome')}
+        self.tamanhos = {
+            campo.name: campo.max_length
+            for campo in Socio._meta.get_fields()
+            if getattr(campo, 'max_length', None) and not campo.is_relation
+        }
+        self.hoje = timezone.localdate()
+
+    def _duplicado(self, vistos, chave, rotulo):
+        if chave not in vistos:
+            return None
+        linha = vistos[chave]
+        return f'{rotulo} já cadastrado' if linha is None else f'{rotulo} repetido (linha {linha})'
+
+    def validar(self, linha, valores):
+        """``(dados, erros)`` da linha; ``dados`` só vale se não houver erros."""
+        dados, erros = {}, []
+
+        for campo in CAMPOS_TEXTO:
+            dados[campo] = texto_celula(valores.get(campo))
+        if not dados['nome_completo']:
+            erros.append('Nome completo é obrigatório')
+
+        cpf = valores.get('cpf')
+        if isinstance(cpf, (int, float)):
+            cpf = texto_celula(cpf).zfill(11)  # célula numérica perde o zero à esquerda
+        cpf = texto_celula(cpf)
+        if not cpf:
+            erros.append('CPF é obrigatório')
+        elif not Socio.cpf_validator.regex.search(cpf):
+            erros.append(Socio.cpf_validator.message)
+        else:
+            duplicado = self._duplicado(self.cpfs, somente_digitos(cpf), 'CPF')
+            if duplicado:
+                erros.append(duplicado)
+        dados['cpf'] = cpf
+
+        numero_socio = texto_celula(valores.get('numero_socio'))
+        if numero_socio:
+            duplicado = self._duplicado(self.numeros, numero_socio, 'Número de sócio')
+            if duplicado:
+                erros.append(duplicado)
+        dados['numero_socio'] = numero_socio
+
+        for campo in CAMPOS_DATA:
+            dados[campo] = None
+            if texto_celula(valores.get(campo)):
+                try:
+                    dados[campo] = data_celula(valores[campo])
+                except ValueError:
+                    erros.append(f'{Socio._meta.get_field(campo).verbose_name} inválida (use dd/mm/aaaa)')
+        if not texto_celula(valores.get('data_nascimento')):
+            erros.append('Data de nascimento é obrigatória')
+        dados['data_associacao'] = dados['data_associacao'] or self.hoje
+
+        if dados['email']:
+            try:
+                validate_email(dados['email'])
+            except ValidationError:
+                erros.append('E-mail inválido')
+        else:
+            erros.append('E-mail é obrigatório')
+
+        telefone_invalido = False
+        for campo in ('telefone', 'celular'):
+            try:
+                dados[campo] = _telefone(valores.get(campo))
+            except ValueError:
+                erros.append(f'{Socio._meta.get_field(campo).verbose_name}: {Socio.telefone_validator.message}')
+                dados[campo] = ''
+                telefone_invalido = True
+        if not dados['telefone']:
+            dados['telefone'] = dados['celular']
+        if not dados['telefone'] and not telefone_invalido:
+            erros.append('Telefone ou celular é obrigatório')
+
+        genero = normalizar(valores.get('genero'))
+        dados['genero'] = GENEROS.get(genero, 'N' if not genero else None)
+        if dados['genero'] is None:
+            erros.append('Gênero inválido')
+
+        status = normalizar(valores.get('status'))
+        dados['status'] = STATUS.get(status, 'ativo' if not status else None)
+        if dados['status'] is None:
+            erros.append('Status inválido')
+        elif dados['status'] == 'inativo':
+            dados['data_inativacao'] = self.hoje
+
+        plano = normalizar(valores.get('tipo_assinatura'))
+        dados['tipo_assinatura_id'] = self.planos.get(plano) if plano else None
+        if plano and dados['tipo_assinatura_id'] is None:
+            erros.append(f'Plano "{texto_celula(valores.get("tipo_assinatura"))}" não cadastrado')
+
+        bolsista = normalizar(valores.get('bolsista'))
+        dados['bolsista'] = bolsista in VERDADEIROS
+        if bolsista not in VERDADEIROS | FALSOS:
+            erros.append('Bolsista deve ser Sim ou Não')
+
+        for campo in CAMPOS_INTEIROS:
+            texto = texto_celula(valores.get(campo))
+            try:
+                dados[campo] = int(texto) if texto else None
+            except ValueError:
+                erros.append(f'{Socio._meta.get_field(campo).verbose_name} deve ser um número inteiro')
+
+        dados['estado'] = texto_celula(valores.get('estado')).upper()
+
+        for campo, tamanho in self.tamanhos.items():
+            valor = dados.get(campo)
+            if isinstance(valor, str) and len(valor) > tamanho:
+                erros.append(f'{Socio._meta.get_field(campo).verbose_name}: máximo de {tamanho} caracteres')
+
+        if not erros:
+            self.cpfs[somente_digitos(cpf)] = linha
+            if numero_socio:
+                self.numeros[numero_socio] = linha
+        return dados, erros
+
+
+# ----------------------------------------------------------------------
+# Inserção
+# ----------------------------------------------------------------------
+
+def _inserir(lote, ocupados):
+    """
+    Insere os sócios de ``lote`` (``[(linha, socio)]``). Devolve as linhas
+    recusadas pelo banco (``[(linha, mensagem)]``), normalmente nenhuma.
+    """
+    sem_numero = [socio for _, socio in lote if not socio.numero_socio]
+    try:
+        with transaction.atomic():
+            numeros = Socio.gerar_numeros_socio(len(sem_numero), ocupados) if sem_numero else []
+            for socio, numero in zip(sem_numero, numeros):
+                socio.numero_socio = numero
+            for _, socio in lote:
+                socio.busca = documento_busca(socio)
+            Socio.objects.bulk_create([socio for _, socio in lote], batch_size=500)
+            # bulk_create não dispara o post_save que mantém o resumo financeiro
+            meses = {socio.data_associacao for _, socio in lote}
+            meses |= {socio.data_inativacao for _, socio in lote if socio.data_inativacao}
+            transaction.on_commit(lambda: recalcular_meses(meses))
+        return []
+    except IntegrityError:
+        # Alguém cadastrou o mesmo CPF ou número durante a importação: insere
+        # um a um para saber quais linhas estão em conflito.
+        logger.info('Conflito no lote da importação; inserindo linha a linha', exc_info=True)
+
+    for socio in sem_numero:
+        socio.numero_socio = ''
+    recusadas = []
+    for linha, socio in lote:
+        socio.pk = None
+        socio._state.adding = True
+        try:
+            with transaction.atomic():
+                socio.save(force_insert=True)
+        except IntegrityError:
+            recusadas.append((linha, 'CPF ou número de sócio já cadastrado'))
+    return recusadas
+
+
+def importar_planilha(arquivo, nome, usuario=None, relatorio=None, progresso=None, tamanho_lote=TAMANHO_LOTE):
+    """
+    Importa os sócios da planilha ``arquivo`` (aberto em modo binário; ``nome``
+    define o formato). As linhas recusadas são escritas no arquivo de texto
+    ``relatorio``, se dado. ``progresso(resultado)`` é chamado a cada lote.
+
+    Devolve ``{'linhas', 'importados', 'recusados', 'erros'}``, com ``erros``
+    limitado às primeiras ``MAX_ERROS_AMOSTRA`` linhas recusadas.
+    """
+    linhas = ler_planilha(arquivo, nome)
+    cabecalho = next(linhas, None)
+    if not cabecalho:
+        raise PlanilhaInvalida('A planilha está vazia.')
+    cabecalho = [texto_celula(titulo) for titulo in cabecalho]
+    colunas = mapear_colunas(cabecalho)
+
+    escritor = None
+    if relatorio is not None:
+        escritor = csv.writer(relatorio)
+        escritor.writerow(['Linha', 'Erros'] + cabecalho)
+
+    validador = Validador()
+    resultado = {'linhas': 0, 'importados': 0, 'recusados': 0, 'erros': []}
+
+    def recusar(linha, mensagem, bruta):
+        resultado['recusados'] += 1
+        if len(resultado['erros']) < MAX_ERROS_AMOSTRA:
+            resultado['erros'].append([linha, mensagem])
+        if escritor is not None:
+            escritor.writerow([linha, mensagem] + [texto_celula(valor) for valor in bruta])
+
+    def gravar(lote, brutas):
+        # validador.numeros: os números já usados, que o contador deve pular.
+        recusadas = _inserir(lote, validador.numeros)
+        for linha, mensagem in recusadas:
+            recusar(linha, mensagem, brutas[linha])
+        resultado['importados'] += len(lote) - len(recusadas)
+        if progresso is not None:
+            progresso(resultado)
+
+    lote, brutas = [], {}
+    for numero_linha, bruta in enumerate(linhas, start=2):
+        if not any(texto_celula(valor) for valor in bruta):
+            continue
+        resultado['linhas'] += 1
+        valores = {campo: bruta[indice] for indice, campo in colunas.items() if indice < len(bruta)}
+        dados, erros = validador.validar(numero_linha, valores)
+        if erros:
+            recusar(numero_linha, '; '.join(erros), bruta)
+            continue
+        lote.append((numero_linha, Socio(created_by=usuario, **dados)))
+        brutas[numero_linha] = bruta
+        if len(lote) >= tamanho_lote:
+            gravar(lote, brutas)
+            lote, brutas = [], {}
+    if lote:
+        gravar(lote, brutas)
+    elif progresso is not None:
+        progresso(resultado)
+    return resultado
+
+
+# ----------------------------------------------------------------------
+# Fila (job socios.processar_importacoes)
+# ----------------------------------------------------------------------
+
+def _reservar():
+    """Reserva a importação mais antiga da fila; None se não houver."""
+    return reservar(Importacao)
+
+
+def executar_importacao(importacao):
+    """Importa a planilha de ``importacao`` e grava o resultado e o relatório."""
+    def progresso(resultado):
+        sinal_de_vida(
+            importacao,
+            linhas_processadas=resultado['linhas'],
+            importados=resultado['importados'],
+            recusados=resultado['recusados'],
+        )
+
+    with tempfile.TemporaryFile('w+', encoding='utf-8-sig', newline='') as relatorio:
+        with importacao.arquivo.open('rb') as arquivo:
+            resultado = importar_planilha(
+                arquivo, importacao.nome_original, importacao.solicitado_por, relatorio, progresso,
+            )
+        if resultado['recusados']:
+            relatorio.seek(0)
+            nome = f'{os.path.splitext(importacao.nome_original)[0]}_erros.csv'
+            importacao.relatorio.save(nome, File(io.BytesIO(relatorio.read().encode('utf-8-sig'))), save=False)
+
+    apagar_arquivo(importacao.arquivo)
+    importacao.status = Importacao.STATUS_CONCLUIDO
+    importacao.linhas_processadas = resultado['linhas']
+    importacao.importados = resultado['importados']
+    importacao.recusados = resultado['recusados']
+    importacao.erros = resultado['erros']
+    importacao.concluido_em = timezone.now()
+    importacao.save()
+    return importacao
+
+
+def _falhar(importacao, erro):
+    """Marca ``importacao`` como falha e apaga a planilha enviada."""
+    if importacao.arquivo:
+        apagar_arquivo(importacao.arquivo)
+    marcar_falha(importacao, erro, arquivo='')
+
+
+def processar_importacoes(limite=1):
+    """Processa até ``limite`` importações da fila. Devolve (concluídas, com erro)."""
+    # Worker reiniciado no meio: as linhas já gravadas ficam, o resto não
+    # (ao contrário das exportações, não dá para simplesmente refazer).
+    for importacao in abandonados(Importacao):
+        _falhar(
+            importacao,
+            'Importação interrompida. Os sócios já importados foram mantidos; '
+            'envie de novo a planilha para importar o restante (os já cadastrados serão recusados).',
+        )
+    return processar_fila(_reservar, executar_importacao, limite, ao_falhar=_falhar)
+
+
+def limpar_importacoes():
+    """Apaga os relatórios e planilhas das importações encerradas há mais de ``VALIDADE_RELATORIO``."""
+    removidas = 0
+    vencidas = Importacao.objects.filter(
+        status__in=[Importacao.STATUS_CONCLUIDO, Importacao.STATUS_FALHOU],
+        concluido_em__lt=timezone.now() - VALIDADE_RELATORIO,
+    )
+    for importacao in vencidas.iterator():
+        for arquivo in (importacao.relatorio, importacao.arquivo):
+            if arquivo:
+                apagar_arquivo(arquivo)
+        importacao.delete()
+        removidas += 1
+    return removidas
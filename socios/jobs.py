@@ -0,0 +1,91 @@
+"""Tarefas periódicas do app de sócios (executadas por ``manage.py run_jobs``)."""
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.utils import timezone
+
+from scheduler.registry import register_job
+
+from .exportacao import limpar_exportacoes, processar_exportacoes
+from .importacao import limpar_importacoes, processar_importacoes
+from .models import CobrancaAbacatePay
+from .reconciliacao import processar_eventos_webhook, reconciliar_pendentes
+
+# Cobranças PIX pendentes há mais tempo que isso são consideradas abandonadas.
+VALIDADE_COBRANCA = timedelta(hours=72)
+
+
+@register_job('socios.atualizar_vencimentos', interval=timedelta(hours=6), jitter=timedelta(minutes=10))
+def atualizar_vencimentos():
+    """Marca como inadimplentes os sócios com mensalidade vencida."""
+    saida = StringIO()
+    call_command('atualizar_vencimentos', stdout=saida)
+    linhas = saida.getvalue().strip().splitlines()
+    return linhas[-1] if linhas else ''
+
+
+@register_job('socios.processar_webhooks', interval=timedelta(seconds=30))
+def processar_webhooks():
+    """Aplica os eventos de webhook do AbacatePay que estão na fila."""
+    resultado = processar_eventos_webhook()
+    return (
+        f"{resultado['processados']} processado(s), {resultado['ignorados']} ignorado(s), "
+        f"{resultado['erros']} erro(s)"
+    )
+
+
+@register_job('socios.reconciliar_cobrancas', interval=timedelta(minutes=5), jitter=timedelta(minutes=1))
+def reconciliar_cobrancas():
+    """Liquida cobranças e pedidos pendentes com uma única consulta à lista do AbacatePay."""
+    resultado = reconciliar_pendentes()
+    return f"{resultado['cobrancas']} cobrança(s), {resultado['pedidos']} pedido(s) atualizados"
+
+
+@register_job('socios.expirar_cobrancas', interval=timedelta(hours=1), jitter=timedelta(minutes=5))
+def expirar_cobrancas():
+    """Expira cobranças AbacatePay pendentes que passaram da validade."""
+    limite = timezone.now() - VALIDADE_COBRANCA
+    expiradas = CobrancaAbacatePay.objects.filter(
+        status=CobrancaAbacatePay.STATUS_PENDENTE,
+        created_at__lt=limite,
+    ).update(status=CobrancaAbacatePay.STATUS_EXPIRADO, updated_at=timezone.now())
+    return f'{expiradas} cobrança(s) expirada(s)'
+
+
+@register_job(
+    'socios.gerar_exportacoes',
+    interval=timedelta(seconds=10),
+    # Uma exportação grande pode levar minutos; o lock da tarefa não deve
+    # expirar no meio (cada exportação tem o próprio lock em Exportacao).
+    timeout=timedelta(hours=1),
+)
+def gerar_exportacoes():
+    """
+    Gera uma exportação da fila por passada, para não segurar as outras
+    tarefas do worker (em produção roda num worker próprio, ver PRODUCTION.md).
+    """
+    concluidas, falhas = processar_exportacoes(limite=1)
+    return f'{concluidas} exportação(ões) gerada(s), {falhas} com erro'
+
+
+@register_job('socios.limpar_exportacoes', interval=timedelta(hours=1), jitter=timedelta(minutes=5))
+def limpar_exportacoes_vencidas():
+    """Apaga os arquivos de exportação vencidos."""
+    return f'{limpar_exportacoes()} exportação(ões) removida(s)'
+
+
+@register_job('socios.processar_importacoes', interval=timedelta(seconds=10), timeout=timedelta(hours=1))
+def importar_planilhas():
+    """
+    Importa uma planilha de sócios da fila por passada (em produção roda no
+    mesmo worker separado das exportações, ver PRODUCTION.md).
+    """
+    concluidas, falhas = processar_importacoes(limite=1)
+    return f'{concluidas} importação(ões) concluída(s), {falhas} com erro'
+
+
+@register_job('socios.limpar_importacoes', interval=timedelta(hours=6), jitter=timedelta(minutes=10))
+def limpar_importacoes_antigas():
+    """Apaga as importações antigas e seus relatórios de linhas recusadas."""
+    return f'{limpar_importacoes()} importação(ões) removida(s)'
@@ -0,0 +1,124 @@
+import re
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from main.models import Participant
+from shop.models import Order
+from socios.busca import buscar_socios
+from socios.models import CobrancaAbacatePay, HistoricoPagamento, Socio
+
+# Linhas de plano que indicam leitura da tabela inteira.
+_VARREDURA = {
+    'postgresql': re.compile(r'Seq Scan on (\w+)'),
+    'sqlite': re.compile(r'\bSCAN (\w+)\b(?! VIRTUAL TABLE)'),
+}
+
+
+def consultas_principais(hoje):
+    """``(nome, queryset)`` das consultas que as telas da equipe e os jobs mais fazem."""
+    inicio_mes = hoje.replace(day=1)
+    socio_id = Socio.objects.values_list('pk', flat=True).first() or 0
+    participante = Participant.objects.values_list('tournament_id', 'player_id').first() or (0, 0)
+    return [
+        ('dashboard: vencem em breve', Socio.objects.filter(
+            status='ativo', bolsista=False, data_vencimento__isnull=False,
+            data_vencimento__lte=hoje + timedelta(days=7),
+        )),
+        ('dashboard: próximos vencimentos', Socio.objects.filter(
+            status='ativo', bolsista=False, data_vencimento__isnull=False,
+        ).order_by('data_vencimento')[:10]),
+        ('dashboard: novos sócios', Socio.objects.filter(
+            data_associacao__isnull=False,
+        ).order_by('-data_associacao')[:10]),
+        ('dashboard: receita do mês', HistoricoPagamento.objects.filter(
+            status='confirmado', mes_referencia__gte=inicio_mes,
+        )),
+        ('inadimplentes', Socio.objects.inadimplentes(hoje)),
+        ('vencendo', Socio.objects.vencendo(hoje)),
+        ('atualizar_vencimentos', Socio.objects.filter(
+            status='ativo', bolsista=False, data_vencimento__lt=hoje,
+        ).order_by('id')),
+        ('relatório financeiro: pagamentos do mês', HistoricoPagamento.objects.filter(
+            status='confirmado', data_pagamento__gte=inicio_mes, data_pagamento__lte=hoje,
+        )),
+        ('pagamentos confirmados do sócio', HistoricoPagamento.objects.filter(
+            socio_id=socio_id, status='confirmado',
+        )),
+        ('cobrança pendente do sócio', CobrancaAbacatePay.objects.filter(
+            socio_id=socio_id, status=CobrancaAbacatePay.STATUS_PENDENTE,
+        ).order_by('-created_at')[:1]),
+        ('job: expirar cobranças', CobrancaAbacatePay.objects.filter(
+            status=CobrancaAbacatePay.STATUS_PENDENTE, created_at__lt=timezone.now() - timedelta(days=3),
+        )),
+        ('pedidos aguardando pagamento', Order.objects.filter(
+            payment_status='pending', created_at__lt=timezone.now() - timedelta(hours=1),
+        )),
+        ('inscrição no torneio', Participant.objects.filter(
+            tournament_id=participante[0], player_id=participante[1],
+        )),
+        ('busca de sócios', buscar_socios(Socio.objects.all(), 'silva')),
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        'Roda EXPLAIN nas consultas principais de sócios, pagamentos, pedidos e '
+        'torneios e aponta as que leem a tabela inteira (Seq Scan / SCAN).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--forcar-indices',
+            action='store_true',
+            help='PostgreSQL: desliga o Seq Scan (enable_seqscan = off) para conferir se existe '
+                 'índice utilizável mesmo em tabelas pequenas, onde o planejador prefere varrer',
+        )
+        parser.add_argument(
+            '--analyze',
+            action='store_true',
+            help='PostgreSQL: executa as consultas (EXPLAIN ANALYZE) e mostra os tempos reais',
+        )
+        parser.add_argument('--verbose-plan', action='store_true', help='Mostra o plano completo de cada consulta')
+        parser.add_argument('--strict', action='store_true', help='Termina com erro se alguma consulta varrer tabela')
+
+    def handle(self, *args, **options):
+        vendor = connection.vendor
+        padrao = _VARREDURA.get(vendor)
+        if padrao is None:
+            raise CommandError(f'Banco {vendor} não suportado: use PostgreSQL ou SQLite.')
+
+        explain_options = {}
+        if vendor == 'postgresql' and options['analyze']:
+            explain_options['analyze'] = True
+
+        self.stdout.write(f'EXPLAIN das consultas principais ({vendor})')
+        sinalizadas = []
+        with transaction.atomic():
+            if vendor == 'postgresql' and options['forcar_indices']:
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+
+            for nome, queryset in consultas_principais(timezone.now().date()):
+                plano = queryset.explain(**explain_options)
+                varridas = sorted(set(padrao.findall(plano)))
+                if varridas:
+                    sinalizadas.append(nome)
+                    self.stdout.write(self.style.WARNING(f'  VARREDURA  {nome}: {", ".join(varridas)}'))
+                else:
+                    self.stdout.write(self.style.SUCCESS(f'  ok         {nome}'))
+                if options['verbose_plan'] or varridas:
+                    for linha in plano.splitlines():
+                        self.stdout.write(f'               {linha}')
+
+        if sinalizadas:
+            mensagem = f'{len(sinalizadas)} consulta(s) com varredura de tabela.'
+            if vendor == 'postgresql' and not options['forcar_indices']:
+                mensagem += ' Em tabelas pequenas o planejador prefere varrer; confira com --forcar-indices.'
+            if options['strict']:
+                raise CommandError(mensagem)
+            self.stdout.write(self.style.WARNING(mensagem))
+        else:
+            self.stdout.write(self.style.SUCCESS('Nenhuma consulta varre tabela inteira.'))
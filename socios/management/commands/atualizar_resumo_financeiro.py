@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Min
+from django.utils import timezone
+
+from socios.dashboard import ultimos_meses
+from socios.financeiro import recalcular_mes
+from socios.models import HistoricoPagamento
+
+
+class Command(BaseCommand):
+    help = 'Recalcula o resumo financeiro mensal (ResumoFinanceiroMensal) usado pelo relatório financeiro'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--meses',
+            type=int,
+            default=12,
+            help='Quantidade de meses (até o mês atual) a recalcular. Padrão: 12',
+        )
+        parser.add_argument(
+            '--completo',
+            action='store_true',
+            help='Recalcula desde o mês do primeiro pagamento registrado',
+        )
+
+    def handle(self, *args, **options):
+        hoje = timezone.now().date()
+        quantidade = options['meses']
+
+        if options['completo']:
+            primeiro = HistoricoPagamento.objects.aggregate(primeiro=Min('data_pagamento'))['primeiro']
+            if primeiro:
+                quantidade = max(quantidade, (hoje.year - primeiro.year) * 12 + hoje.month - primeiro.month + 1)
+
+        if quantidade < 1:
+            raise CommandError('--meses deve ser maior que zero.')
+
+        meses = ultimos_meses(hoje, quantidade)
+        self.stdout.write(f'Recalculando resumo financeiro de {meses[0]:%m/%Y} a {meses[-1]:%m/%Y}...')
+
+        for mes in meses:
+            resumo = recalcular_mes(mes)
+            self.stdout.write(
+                f'{mes:%m/%Y}: receita R$ {resumo.receita} ({resumo.pagamentos_confirmados} pagamentos), '
+                f'{resumo.novos_socios} novos, {resumo.socios_perdidos} perdidos'
+            )
+
+        self.stdout.write(self.style.SUCCESS(f'Resumo financeiro atualizado: {len(meses)} mês(es).'))
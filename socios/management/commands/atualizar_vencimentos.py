@@ -1,13 +1,50 @@
-from django.core.management.base import BaseCommand
+import time
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
 from django.utils import timezone
-from socios.models import Socio
+
+from socios.financeiro import recalcular_mes
+from socios.models import LoteAtualizacaoStatus, Socio
+
+ORIGEM = 'atualizar_vencimentos'
+
 
 class Command(BaseCommand):
     help = 'Varre os sócios ativos e atualiza para inadimplente aqueles cujas mensalidades venceram'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Apenas mostra quantos sócios seriam atualizados, sem gravar nada',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Quantidade de sócios atualizados por UPDATE. Padrão: 500',
+        )
+        parser.add_argument(
+            '--since',
+            help=(
+                'Considera apenas vencimentos a partir desta data (AAAA-MM-DD). '
+                'Use "ultima" para partir da data de referência da última execução.'
+            ),
+        )
+
     def handle(self, *args, **options):
         hoje = timezone.now().date()
+        dry_run = options['dry_run']
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size deve ser maior que zero.')
+        desde = self._resolver_since(options['since'])
+
         self.stdout.write(f'Iniciando verificação de vencimentos para a data: {hoje}')
+        if desde:
+            self.stdout.write(f'Considerando apenas vencimentos a partir de {desde}')
 
         # Sócios ativos, que não são bolsistas e que têm data de vencimento menor que hoje
         socios_vencidos = Socio.objects.filter(
@@ -15,23 +52,89 @@ class Command(BaseCommand):
             bolsista=False,
             data_vencimento__lt=hoje
         )
+        if desde:
+            socios_vencidos = socios_vencidos.filter(data_vencimento__gte=desde)
 
-        total_vencidos = socios_vencidos.count()
-
-        if total_vencidos == 0:
-            self.stdout.write(self.style.SUCCESS('Nenhum sócio ativo com pagamento vencido encontrado.'))
+        if dry_run:
+            total_vencidos = socios_vencidos.count()
+            self.stdout.write(
+                self.style.WARNING(
+                    f'[dry-run] {total_vencidos} sócio(s) seriam atualizados para inadimplente '
+                    f'em {-(-total_vencidos // batch_size)} lote(s).'
+                )
+            )
             return
 
-        for socio in socios_vencidos:
-            old_status = socio.status
-            socio.status = 'inadimplente'
-            socio.save(update_fields=['status'])
+        inicio = time.monotonic()
+        total_atualizados = 0
+        lotes = 0
+        ultimo_id = 0
+
+        while True:
+            inicio_lote = time.monotonic()
+            ids = list(
+                socios_vencidos.filter(id__gt=ultimo_id)
+                .order_by('id')
+                .values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            ultimo_id = ids[-1]
+
+            with transaction.atomic():
+                # Trava e relê o lote: quem mudou de status desde a leitura
+                # acima fica de fora, e o registro lista só os sócios alterados.
+                ids = list(
+                    Socio.objects.select_for_update()
+                    .filter(id__in=ids, status='ativo')
+                    .order_by('id')
+                    .values_list('id', flat=True)
+                )
+                atualizados = Socio.objects.filter(id__in=ids).update(
+                    status='inadimplente',
+                    updated_at=timezone.now(),
+                )
+                duracao_ms = int((time.monotonic() - inicio_lote) * 1000)
+                LoteAtualizacaoStatus.objects.create(
+                    origem=ORIGEM,
+                    status_anterior='ativo',
+                    status_novo='inadimplente',
+                    data_referencia=hoje,
+                    quantidade=atualizados,
+                    socio_ids=ids,
+                    duracao_ms=duracao_ms,
+                )
+
+            lotes += 1
+            total_atualizados += atualizados
+            por_segundo = atualizados / max(duracao_ms / 1000, 0.001)
             self.stdout.write(
-                f'Sócio Nº {socio.numero_socio} - {socio.nome_completo}: status alterado de {old_status} para inadimplente (vencimento: {socio.data_vencimento})'
+                f'Lote {lotes}: {atualizados} sócio(s) em {duracao_ms} ms ({por_segundo:.0f} sócios/s)'
             )
 
+        if total_atualizados == 0:
+            self.stdout.write(self.style.SUCCESS('Nenhum sócio ativo com pagamento vencido encontrado.'))
+            return
+
+        # UPDATE em lote não dispara sinais: atualiza a fotografia de inadimplência do mês.
+        recalcular_mes(hoje)
+
+        duracao_total = time.monotonic() - inicio
         self.stdout.write(
             self.style.SUCCESS(
-                f'Verificação concluída. Total de {total_vencidos} sócios atualizados para inadimplente.'
+                f'Verificação concluída. Total de {total_atualizados} sócios atualizados para inadimplente '
+                f'em {lotes} lote(s), {duracao_total:.2f}s '
+                f'({total_atualizados / max(duracao_total, 0.001):.0f} sócios/s).'
             )
         )
+
+    def _resolver_since(self, valor):
+        if not valor:
+            return None
+        if valor == 'ultima':
+            ultimo_lote = LoteAtualizacaoStatus.objects.filter(origem=ORIGEM).order_by('-executado_em').first()
+            return ultimo_lote.data_referencia if ultimo_lote else None
+        try:
+            return datetime.strptime(valor, '%Y-%m-%d').date()
+        except ValueError:
+            raise CommandError('--since deve estar no formato AAAA-MM-DD ou ser "ultima".')
@@ -0,0 +1,60 @@
+import os
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from socios.arquivos import PlanilhaInvalida
+from socios.importacao import importar_planilha
+
+
+class Command(BaseCommand):
+    help = 'Importa sócios de uma planilha CSV ou XLSX (mesmas regras da tela de importação)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('arquivo', help='Planilha .csv ou .xlsx')
+        parser.add_argument(
+            '--relatorio',
+            help='CSV com as linhas recusadas. Padrão: <arquivo>_erros.csv',
+        )
+        parser.add_argument(
+            '--usuario',
+            help='Username gravado como "Criado por" nos sócios importados',
+        )
+
+    def handle(self, *args, **options):
+        caminho = options['arquivo']
+        if not os.path.isfile(caminho):
+            raise CommandError(f'Arquivo não encontrado: {caminho}')
+
+        usuario = None
+        if options['usuario']:
+            usuario = get_user_model().objects.filter(username=options['usuario']).first()
+            if usuario is None:
+                raise CommandError(f'Usuário não encontrado: {options["usuario"]}')
+
+        caminho_relatorio = options['relatorio'] or f'{os.path.splitext(caminho)[0]}_erros.csv'
+        inicio = time.monotonic()
+
+        def progresso(resultado):
+            self.stdout.write(f'{resultado["linhas"]} linha(s) lida(s), {resultado["importados"]} importada(s)...')
+
+        try:
+            with open(caminho, 'rb') as arquivo, \
+                    open(caminho_relatorio, 'w', encoding='utf-8-sig', newline='') as relatorio:
+                resultado = importar_planilha(arquivo, caminho, usuario, relatorio, progresso)
+        except PlanilhaInvalida as exc:
+            os.remove(caminho_relatorio)
+            raise CommandError(str(exc)) from exc
+
+        if not resultado['recusados']:
+            os.remove(caminho_relatorio)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{resultado["importados"]} sócio(s) importado(s) de {resultado["linhas"]} linha(s) '
+            f'em {time.monotonic() - inicio:.1f}s.'
+        ))
+        if resultado['recusados']:
+            self.stdout.write(self.style.WARNING(
+                f'{resultado["recusados"]} linha(s) recusada(s); veja {caminho_relatorio}.'
+            ))
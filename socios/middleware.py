@@ -0,0 +1,85 @@
+from django.contrib import messages
+from django.urls import reverse
+from django.utils.functional import SimpleLazyObject
+from django.utils.html import format_html
+
+from .models import Exportacao, Socio
+
+# Exportações em segundo plano que este usuário pediu e ainda não foram avisadas.
+SESSAO_EXPORTACOES = 'exportacoes_aguardando'
+
+
+def get_socio(request):
+    """
+    Returns the ``Socio`` linked to ``request.user`` (or None), querying the
+    database at most once per request.
+    """
+    if not hasattr(request, '_cached_socio'):
+        user = getattr(request, 'user', None)
+        socio = None
+        if user is not None and user.is_authenticated:
+            socio = Socio.objects.select_related('tipo_assinatura').filter(usuario=user).first()
+        request._cached_socio = socio
+    return request._cached_socio
+
+
+def is_active_member(request) -> bool:
+    socio = get_socio(request)
+    return socio is not None and socio.status == 'ativo'
+
+
+class SocioMiddleware:
+    """
+    Attaches ``request.socio`` and ``request.is_active_member``.
+
+    Both are lazy: requests that never look at them cost nothing, and the
+    template tag, shop pricing and member views share a single lookup. Use
+    ``get_socio(request)`` when an actual ``None`` is needed (e.g. ``is None``
+    checks); the lazy attribute is falsy for non-members.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.socio = SimpleLazyObject(lambda: get_socio(request))
+        request.is_active_member = SimpleLazyObject(lambda: is_active_member(request))
+        return self.get_response(request)
+
+
+class ExportacaoProntaMiddleware:
+    """
+    Avisa (via ``messages``) quando uma exportação em segundo plano pedida
+    nesta sessão termina, com o link de download.
+
+    Só consulta o banco enquanto a sessão tem exportações aguardando; as
+    demais requisições não custam nada. Deve vir depois do MessageMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        session = getattr(request, 'session', None)
+        if session is not None and session.get(SESSAO_EXPORTACOES):
+            self._avisar(request, session)
+        return self.get_response(request)
+
+    @staticmethod
+    def _avisar(request, session):
+        aguardando = session[SESSAO_EXPORTACOES]
+        restantes = []
+        # Pedidos que já foram apagados (limpeza) simplesmente somem da lista.
+        for exportacao in Exportacao.objects.filter(pk__in=aguardando):
+            if exportacao.status == Exportacao.STATUS_CONCLUIDO:
+                messages.success(request, format_html(
+                    'Exportação de {} pronta: <a href="{}" class="alert-link">baixar arquivo</a>.',
+                    exportacao.get_tipo_display().lower(),
+                    reverse('socios:baixar_exportacao', args=[exportacao.pk]),
+                ))
+            elif exportacao.status == Exportacao.STATUS_FALHOU:
+                messages.error(request, f'A exportação de {exportacao.get_tipo_display().lower()} falhou.')
+            else:
+                restantes.append(exportacao.pk)
+        if restantes != aguardando:
+            session[SESSAO_EXPORTACOES] = restantes
@@ -0,0 +1,33 @@
+# Generated by Django 5.1.6 on 2026-10-17 17:52
+
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('socios', '0008_add_cobranca_abacatepay'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumoFinanceiroMensal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mes', models.DateField(help_text='Primeiro dia do mês', unique=True, verbose_name='Mês')),
+                ('receita', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12, verbose_name='Receita Confirmada (R$)')),
+                ('pagamentos_confirmados', models.PositiveIntegerField(default=0, verbose_name='Pagamentos Confirmados')),
+                ('novos_socios', models.PositiveIntegerField(default=0, verbose_name='Novos Sócios')),
+                ('socios_perdidos', models.PositiveIntegerField(default=0, verbose_name='Sócios Perdidos')),
+                ('valor_inadimplencia', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12, verbose_name='Valor em Atraso (R$)')),
+                ('inadimplencia_por_plano', models.JSONField(blank=True, default=dict, help_text='{nome do plano: {"socios": n, "valor": "R$"}} no momento do último cálculo do mês', verbose_name='Inadimplência por Plano')),
+                ('atualizado_em', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+            ],
+            options={
+                'verbose_name': 'Resumo Financeiro Mensal',
+                'verbose_name_plural': 'Resumos Financeiros Mensais',
+                'ordering': ['mes'],
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.1.6 on 2026-10-17 17:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('socios', '0009_resumo_financeiro_mensal'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LoteAtualizacaoStatus',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('origem', models.CharField(help_text='Comando ou rotina que alterou os status', max_length=60, verbose_name='Origem')),
+                ('status_anterior', models.CharField(max_length=20, verbose_name='Status Anterior')),
+                ('status_novo', models.CharField(max_length=20, verbose_name='Status Novo')),
+                ('data_referencia', models.DateField(help_text='Vencimentos anteriores a esta data foram considerados', verbose_name='Data de Referência')),
+                ('quantidade', models.PositiveIntegerField(default=0, verbose_name='Quantidade de Sócios')),
+                ('socio_ids', models.JSONField(blank=True, default=list, verbose_name='IDs dos Sócios')),
+                ('duracao_ms', models.PositiveIntegerField(default=0, verbose_name='Duração (ms)')),
+                ('executado_em', models.DateTimeField(auto_now_add=True, verbose_name='Executado em')),
+            ],
+            options={
+                'verbose_name': 'Lote de Atualização de Status',
+                'verbose_name_plural': 'Lotes de Atualização de Status',
+                'ordering': ['-executado_em'],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.1.6 on 2026-10-17 18:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('socios', '0010_lote_atualizacao_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WebhookEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('chave', models.CharField(max_length=160, unique=True, verbose_name='Chave de Deduplicação')),
+                ('evento', models.CharField(blank=True, max_length=60, verbose_name='Evento')),
+                ('billing_id', models.CharField(db_index=True, max_length=120, verbose_name='ID da Cobrança (AbacatePay)')),
+                ('status_remoto', models.CharField(blank=True, max_length=20, verbose_name='Status no AbacatePay')),
+                ('payload', models.JSONField(default=dict, verbose_name='Payload')),
+                ('estado', models.CharField(choices=[('pendente', 'Pendente'), ('processado', 'Processado'), ('ignorado', 'Ignorado'), ('erro', 'Erro')], default='pendente', max_length=20, verbose_name='Estado')),
+                ('tentativas', models.PositiveIntegerField(default=0, verbose_name='Tentativas')),
+                ('erro', models.TextField(blank=True, verbose_name='Último Erro')),
+                ('recebido_em', models.DateTimeField(auto_now_add=True, verbose_name='Recebido em')),
+                ('processado_em', models.DateTimeField(blank=True, null=True, verbose_name='Processado em')),
+            ],
+            options={
+                'verbose_name': 'Evento de Webhook',
+                'verbose_name_plural': 'Eventos de Webhook',
+                'ordering': ['-recebido_em'],
+                'indexes': [models.Index(fields=['estado', 'recebido_em'], name='socios_webhook_fila_idx')],
+            },
+        ),
+    ]
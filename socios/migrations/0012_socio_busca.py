@@ -0,0 +1,47 @@
+# Generated by Django 5.1.6 on 2026-10-17 18:14
+
+from django.db import migrations, models
+
+
+def preencher_busca(apps, schema_editor):
+    from socios.busca import documento_busca
+
+    Socio = apps.get_model('socios', 'Socio')
+    lote = []
+    for socio in Socio._base_manager.using(schema_editor.connection.alias).iterator(chunk_size=1000):
+        socio.busca = documento_busca(socio)
+        lote.append(socio)
+        if len(lote) >= 1000:
+            Socio._base_manager.bulk_update(lote, ['busca'])
+            lote = []
+    if lote:
+        Socio._base_manager.bulk_update(lote, ['busca'])
+
+
+def criar_indice(apps, schema_editor):
+    from socios.busca import instalar_indice
+
+    instalar_indice(schema_editor.connection)
+
+
+def remover_indice(apps, schema_editor):
+    from socios.busca import remover_indice
+
+    remover_indice(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('socios', '0011_webhook_event'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='socio',
+            name='busca',
+            field=models.TextField(blank=True, editable=False, help_text='Nome, número, e-mail, CPF e telefones normalizados (ver socios.busca).', verbose_name='Documento de Busca'),
+        ),
+        migrations.RunPython(preencher_busca, migrations.RunPython.noop),
+        migrations.RunPython(criar_indice, remover_indice),
+    ]
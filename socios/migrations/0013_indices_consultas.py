@@ -0,0 +1,43 @@
+# Generated by Django 5.1.6 on 2026-10-17 18:19
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('socios', '0012_socio_busca'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cobrancaabacatepay',
+            index=models.Index(fields=['socio', 'status', 'created_at'], name='socios_cobranca_socio_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cobrancaabacatepay',
+            index=models.Index(fields=['status', 'created_at'], name='socios_cobranca_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='historicopagamento',
+            index=models.Index(fields=['status', 'data_pagamento'], name='socios_pag_status_data_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='historicopagamento',
+            index=models.Index(fields=['status', 'mes_referencia'], name='socios_pag_status_ref_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='historicopagamento',
+            index=models.Index(fields=['socio', 'status'], name='socios_pag_socio_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='socio',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['status', 'bolsista', 'data_vencimento'], name='socios_situacao_venc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='socio',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['data_associacao'], name='socios_associacao_idx'),
+        ),
+    ]
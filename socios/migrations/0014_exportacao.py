@@ -0,0 +1,44 @@
+# Generated by Django 5.1.6 on 2026-10-17 18:37
+
+import django.db.models.deletion
+import socios.models
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('socios', '0013_indices_consultas'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Exportacao',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('socios', 'Sócios'), ('pagamentos', 'Pagamentos')], max_length=20, verbose_name='Tipo')),
+                ('formato', models.CharField(choices=[('csv', 'CSV (.csv.gz)'), ('xlsx', 'Excel (.xlsx)')], max_length=10, verbose_name='Formato')),
+                ('filtros', models.JSONField(blank=True, default=dict, verbose_name='Filtros')),
+                ('chave', models.CharField(max_length=64, verbose_name='Chave (tipo, formato e filtros)')),
+                ('status', models.CharField(choices=[('pendente', 'Na fila'), ('processando', 'Gerando'), ('concluido', 'Concluída'), ('falhou', 'Falhou')], default='pendente', max_length=20, verbose_name='Status')),
+                ('total_linhas', models.PositiveIntegerField(blank=True, null=True, verbose_name='Total de Linhas')),
+                ('linhas_processadas', models.PositiveIntegerField(default=0, verbose_name='Linhas Processadas')),
+                ('arquivo', models.FileField(blank=True, max_length=255, upload_to=socios.models._caminho_exportacao, verbose_name='Arquivo')),
+                ('erro', models.TextField(blank=True, verbose_name='Erro')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Solicitado em')),
+                ('atualizado_em', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+                ('iniciado_em', models.DateTimeField(blank=True, null=True, verbose_name='Iniciado em')),
+                ('concluido_em', models.DateTimeField(blank=True, null=True, verbose_name='Concluído em')),
+                ('expira_em', models.DateTimeField(blank=True, null=True, verbose_name='Expira em')),
+                ('solicitado_por', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='Solicitado por')),
+            ],
+            options={
+                'verbose_name': 'Exportação',
+                'verbose_name_plural': 'Exportações',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['chave', 'status'], name='socios_exportacao_chave_idx'), models.Index(fields=['status', 'created_at'], name='socios_exportacao_fila_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.6 on 2026-10-17 18:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('socios', '0014_exportacao'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContadorNumeracao',
+            fields=[
+                ('nome', models.CharField(max_length=50, primary_key=True, serialize=False, verbose_name='Numeração')),
+                ('valor', models.PositiveBigIntegerField(default=0, verbose_name='Último Número Emitido')),
+            ],
+            options={
+                'verbose_name': 'Contador de Numeração',
+                'verbose_name_plural': 'Contadores de Numeração',
+            },
+        ),
+    ]
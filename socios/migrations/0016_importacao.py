@@ -0,0 +1,43 @@
+# Generated by Django 5.1.6 on 2026-10-17 18:44
+
+import django.db.models.deletion
+import socios.models
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('socios', '0015_contador_numeracao'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Importacao',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('arquivo', models.FileField(blank=True, help_text='Apagada ao fim da importação (contém CPF e endereço dos sócios).', max_length=255, upload_to=socios.models._caminho_importacao, verbose_name='Planilha')),
+                ('nome_original', models.CharField(max_length=255, verbose_name='Nome do Arquivo')),
+                ('status', models.CharField(choices=[('pendente', 'Na fila'), ('processando', 'Importando'), ('concluido', 'Concluída'), ('falhou', 'Falhou')], default='pendente', max_length=20, verbose_name='Status')),
+                ('linhas_processadas', models.PositiveIntegerField(default=0, verbose_name='Linhas Processadas')),
+                ('importados', models.PositiveIntegerField(default=0, verbose_name='Sócios Importados')),
+                ('recusados', models.PositiveIntegerField(default=0, verbose_name='Linhas Recusadas')),
+                ('erros', models.JSONField(blank=True, default=list, help_text='[linha, mensagem] das primeiras linhas recusadas; a lista completa fica no relatório.', verbose_name='Primeiros Erros')),
+                ('relatorio', models.FileField(blank=True, max_length=255, upload_to=socios.models._caminho_importacao, verbose_name='Relatório de Erros')),
+                ('erro', models.TextField(blank=True, verbose_name='Erro')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Enviado em')),
+                ('atualizado_em', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+                ('iniciado_em', models.DateTimeField(blank=True, null=True, verbose_name='Iniciado em')),
+                ('concluido_em', models.DateTimeField(blank=True, null=True, verbose_name='Concluído em')),
+                ('solicitado_por', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='Solicitado por')),
+            ],
+            options={
+                'verbose_name': 'Importação de Sócios',
+                'verbose_name_plural': 'Importações de Sócios',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='socios_importacao_fila_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.1.6 on 2026-10-17 18:48
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('socios', '0016_importacao'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LancamentoExtrato',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('chave', models.CharField(max_length=64, unique=True, verbose_name='Identificador')),
+                ('data', models.DateField(verbose_name='Data')),
+                ('valor', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Valor')),
+                ('descricao', models.CharField(blank=True, max_length=255, verbose_name='Descrição')),
+                ('pagador', models.CharField(blank=True, max_length=200, verbose_name='Pagador')),
+                ('documento', models.CharField(blank=True, max_length=20, verbose_name='CPF/CNPJ do Pagador')),
+                ('arquivo', models.CharField(blank=True, max_length=255, verbose_name='Extrato de Origem')),
+                ('status', models.CharField(choices=[('pendente', 'Aguardando revisão'), ('conciliado', 'Conciliado'), ('ignorado', 'Ignorado')], default='pendente', max_length=20, verbose_name='Status')),
+                ('criterio', models.CharField(blank=True, choices=[('cpf', 'CPF'), ('nome', 'Nome'), ('valor', 'Valor'), ('manual', 'Manual')], max_length=10, verbose_name='Conciliado por')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Importado em')),
+                ('conciliado_em', models.DateTimeField(blank=True, null=True, verbose_name='Conciliado em')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='Importado por')),
+                ('pagamento', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='lancamento_extrato', to='socios.historicopagamento', verbose_name='Pagamento')),
+                ('socio', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='lancamentos_extrato', to='socios.socio', verbose_name='Sócio')),
+            ],
+            options={
+                'verbose_name': 'Lançamento de Extrato',
+                'verbose_name_plural': 'Lançamentos de Extrato',
+                'ordering': ['-data', '-id'],
+                'indexes': [models.Index(fields=['status', 'data'], name='socios_extrato_status_idx')],
+            },
+        ),
+    ]
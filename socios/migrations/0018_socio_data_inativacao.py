@@ -0,0 +1,28 @@
+# Generated by Django 5.1.6 on 2026-10-17 18:58
+
+from django.db import migrations, models
+from django.db.models.functions import TruncDate
+
+
+def preencher_data_inativacao(apps, schema_editor):
+    # Sem histórico de status, a última alteração dos já inativos é a melhor estimativa
+    Socio = apps.get_model('socios', 'Socio')
+    Socio._base_manager.using(schema_editor.connection.alias).filter(status='inativo').update(
+        data_inativacao=TruncDate('updated_at'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('socios', '0017_lancamento_extrato'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='socio',
+            name='data_inativacao',
+            field=models.DateField(blank=True, editable=False, help_text='Preenchido quando o status passa a Inativo (sócios perdidos no resumo financeiro).', null=True, verbose_name='Inativado em'),
+        ),
+        migrations.RunPython(preencher_data_inativacao, migrations.RunPython.noop),
+    ]
@@ -1,10 +1,15 @@
-from django.db import models
+from django.db import connections, models, router, transaction
 from django.conf import settings
 from django.core.validators import RegexValidator
+from django.db.models import F
+from django.db.models.functions import Coalesce, ExtractMonth, ExtractYear, Length
 from django.utils import timezone
+from datetime import timedelta
 from decimal import Decimal
 import uuid
 
+from .busca import CAMPOS_BUSCA, documento_busca
+
 
 class TipoAssinatura(models.Model):
     """Tipos de assinatura/planos disponíveis para sócios"""
@@ -77,7 +82,210 @@ class TipoAssinatura(models.Model):
         return 0
 
 
-class SocioManager(models.Manager):
+class ContadorNumeracao(models.Model):
+    """
+    Último número emitido de uma numeração sequencial (hoje, ``numero_socio``).
+
+    ``proximo`` incrementa a linha com ``UPDATE ... RETURNING``. O UPDATE trava
+    a linha até o fim da transação de quem pediu, então cadastros simultâneos
+    esperam um pelo outro em vez de receberem o mesmo número. Diferente de uma
+    SEQUENCE do PostgreSQL, um cadastro desfeito devolve o número e a
+    numeração não fica com buracos.
+    """
+    NUMERO_SOCIO = 'numero_socio'
+
+    nome = models.CharField(max_length=50, primary_key=True, verbose_name="Numeração")
+    valor = models.PositiveBigIntegerField(default=0, verbose_name="Último Número Emitido")
+
+    class Meta:
+        verbose_name = "Contador de Numeração"
+        verbose_name_plural = "Contadores de Numeração"
+
+    def __str__(self):
+        return f"{self.nome}: {self.valor}"
+
+    @classmethod
+    def proximo(cls, nome, inicial=None, using=None):
+        """
+        Incrementa e devolve o contador ``nome``. Se ele ainda não existe, é
+        criado com ``inicial()`` (ou 0) — o maior número já usado, por exemplo.
+        Deve ser chamado dentro da transação que vai usar o número.
+        """
+        return cls.reservar(nome, 1, inicial=inicial, using=using)
+
+    @classmethod
+    def reservar(cls, nome, quantidade, inicial=None, using=None):
+        """
+        Reserva ``quantidade`` números de uma vez (importação em lote) e devolve
+        o último: os reservados são ``ultimo - quantidade + 1`` até ``ultimo``.
+        """
+        using = using or router.db_for_write(cls)
+        with transaction.atomic(using=using):
+            valor = cls._incrementar(nome, quantidade, using)
+            if valor is None:
+                cls.objects.using(using).get_or_create(
+                    nome=nome, defaults={'valor': inicial() if inicial else 0},
+                )
+                valor = cls._incrementar(nome, quantidade, using)
+        return valor
+
+    @classmethod
+    def _incrementar(cls, nome, quantidade, using):
+        connection = connections[using]
+        suporta_returning = connection.vendor == 'postgresql' or (
+            connection.vendor == 'sqlite' and connection.Database.sqlite_version_info >= (3, 35)
+        )
+        if suporta_returning:
+            qn = connection.ops.quote_name
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"UPDATE {qn(cls._meta.db_table)} SET {qn('valor')} = {qn('valor')} + %s "
+                    f"WHERE {qn('nome')} = %s RETURNING {qn('valor')}",
+                    [quantidade, nome],
+                )
+                linha = cursor.fetchone()
+            return linha[0] if linha else None
+
+        # Sem RETURNING: o UPDATE já trava a linha, a leitura em seguida é segura.
+        if not cls.objects.using(using).filter(nome=nome).update(valor=F('valor') + quantidade):
+            return None
+        return cls.objects.using(using).values_list('valor', flat=True).get(nome=nome)
+
+
+class SocioQuerySet(models.QuerySet):
+    """
+    Consultas de inadimplência e recebíveis calculadas no banco.
+
+    ``inadimplentes()`` e ``vencendo()`` anotam cada sócio com
+    ``valor_em_aberto``; os totais (``valor_total``, ``resumo``) vêm de um
+    único aggregate e ficam guardados no próprio queryset, então usar o mesmo
+    queryset na view e no template não repete consultas.
+    """
+
+    FAIXAS_ATRASO = [
+        (30, '1-30 dias'),
+        (60, '31-60 dias'),
+        (90, '61-90 dias'),
+        (None, 'Mais de 90 dias'),
+    ]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._resumo_cache = None
+
+    def inadimplentes(self, hoje=None):
+        """
+        Sócios pagantes com vencimento passado (exclui bolsistas).
+
+        Anota ``meses_em_atraso`` (mensalidades vencidas desde a data de
+        vencimento, contando o mês do próprio vencimento) e
+        ``valor_em_aberto`` (``valor_mensal`` x ``meses_em_atraso``).
+        """
+        hoje = hoje or timezone.now().date()
+        meses_em_atraso = (
+            models.Value(hoje.year * 12 + hoje.month)
+            - (ExtractYear('data_vencimento') * 12 + ExtractMonth('data_vencimento'))
+            + models.Case(
+                models.When(data_vencimento__day__lte=hoje.day, then=models.Value(1)),
+                default=models.Value(0),
+            )
+        )
+        return self.filter(
+            data_vencimento__isnull=False,
+            data_vencimento__lt=hoje,
+            status__in=['ativo', 'inadimplente'],
+            bolsista=False,
+        ).annotate(
+            meses_em_atraso=meses_em_atraso,
+        ).annotate(
+            valor_em_aberto=models.ExpressionWrapper(
+                Coalesce('tipo_assinatura__valor_mensal', models.Value(Decimal('0.00')))
+                * models.F('meses_em_atraso'),
+                output_field=models.DecimalField(max_digits=12, decimal_places=2),
+            ),
+        )
+
+    def vencendo(self, hoje=None, dias=7):
+        """Sócios ativos pagantes que vencem entre hoje e ``dias`` dias à frente."""
+        hoje = hoje or timezone.now().date()
+        return self.filter(
+            data_vencimento__isnull=False,
+            data_vencimento__gte=hoje,
+            data_vencimento__lte=hoje + timedelta(days=dias),
+            status='ativo',
+            bolsista=False,
+        ).annotate(
+            valor_em_aberto=Coalesce('tipo_assinatura__valor_mensal', models.Value(Decimal('0.00'))),
+        )
+
+    def resumo(self):
+        """``{'total': n, 'valor': Decimal}`` do queryset, calculado uma vez só."""
+        if self._resumo_cache is None:
+            if self._result_cache is not None:
+                self._resumo_cache = {
+                    'total': len(self._result_cache),
+                    'valor': sum((s.valor_em_aberto for s in self._result_cache), Decimal('0.00')),
+                }
+            else:
+                totais = self.order_by().aggregate(
+                    total=models.Count('id'),
+                    valor=models.Sum('valor_em_aberto'),
+                )
+                self._resumo_cache = {
+                    'total': totais['total'],
+                    'valor': totais['valor'] or Decimal('0.00'),
+                }
+        return self._resumo_cache
+
+    def count(self):
+        if self._resumo_cache is not None:
+            return self._resumo_cache['total']
+        return super().count()
+
+    def valor_total(self):
+        return self.resumo()['valor']
+
+    def por_plano(self):
+        """Quantidade e valor em aberto agrupados por plano."""
+        return list(
+            self.order_by()
+            .values('tipo_assinatura_id', 'tipo_assinatura__nome', 'tipo_assinatura__cor')
+            .annotate(socios=models.Count('id'), valor=models.Sum('valor_em_aberto'))
+            .order_by('-valor')
+        )
+
+    def por_faixa_atraso(self, hoje=None):
+        """Quantidade e valor em aberto por faixa de dias de atraso (todas as faixas)."""
+        hoje = hoje or timezone.now().date()
+        faixa = models.Case(
+            *[
+                models.When(
+                    data_vencimento__gte=hoje - timedelta(days=limite),
+                    then=models.Value(rotulo),
+                )
+                for limite, rotulo in self.FAIXAS_ATRASO if limite is not None
+            ],
+            default=models.Value(self.FAIXAS_ATRASO[-1][1]),
+            output_field=models.CharField(),
+        )
+        linhas = {
+            linha['faixa']: linha
+            for linha in self.order_by()
+            .annotate(faixa=faixa)
+            .values('faixa')
+            .annotate(socios=models.Count('id'), valor=models.Sum('valor_em_aberto'))
+        }
+        return [
+            {
+                'faixa': rotulo,
+                'socios': linhas.get(rotulo, {}).get('socios', 0),
+                'valor': linhas.get(rotulo, {}).get('valor') or Decimal('0.00'),
+            }
+            for _, rotulo in self.FAIXAS_ATRASO
+        ]
+
+
+class SocioManager(models.Manager.from_queryset(SocioQuerySet)):
     """Manager que exclui sócios com soft delete (deleted_at preenchido)."""
     def get_queryset(self):
         return super().get_queryset().filter(deleted_at__isnull=True)
@@ -331,6 +539,13 @@ class Socio(models.Model):
         verbose_name="Excluído em",
         help_text="Preenchido quando o sócio é excluído (soft delete)."
     )
+    data_inativacao = models.DateField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name="Inativado em",
+        help_text="Preenchido quando o status passa a Inativo (sócios perdidos no resumo financeiro)."
+    )
     created_by = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.SET_NULL,
@@ -338,32 +553,93 @@ class Socio(models.Model):
         related_name='socios_criados',
         verbose_name="Criado por"
     )
+    busca = models.TextField(
+        blank=True,
+        editable=False,
+        verbose_name="Documento de Busca",
+        help_text="Nome, número, e-mail, CPF e telefones normalizados (ver socios.busca)."
+    )
 
     class Meta:
         verbose_name = "Sócio"
         verbose_name_plural = "Sócios"
         ordering = ['numero_socio']
+        indexes = [
+            # Dashboard, inadimplentes, vencendo e atualizar_vencimentos filtram
+            # por status/bolsista e intervalo de vencimento, sempre sem os excluídos.
+            models.Index(
+                fields=['status', 'bolsista', 'data_vencimento'],
+                condition=models.Q(deleted_at__isnull=True),
+                name='socios_situacao_venc_idx',
+            ),
+            models.Index(
+                fields=['data_associacao'],
+                condition=models.Q(deleted_at__isnull=True),
+                name='socios_associacao_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.numero_socio} - {self.nome_completo}"
 
-    def _gerar_numero_socio(self):
-        """Gera o próximo número de sócio disponível."""
-        ultimo_numero = Socio.objects.aggregate(
-            models.Max('numero_socio')
-        )['numero_socio__max']
-        if ultimo_numero:
-            try:
-                proximo_numero = int(ultimo_numero) + 1
-                return str(proximo_numero).zfill(6)
-            except ValueError:
-                return str(uuid.uuid4())[:8].upper()
-        return "000001"
+    @classmethod
+    def _maior_numero_socio(cls, using=None):
+        """Maior ``numero_socio`` numérico já usado (inclusive excluídos), ou 0."""
+        maior = (
+            cls.all_objects.using(using)
+            .filter(numero_socio__regex=r'^[0-9]+$')
+            .annotate(tamanho=Length('numero_socio'))
+            .order_by('-tamanho', '-numero_socio')
+            .values_list('numero_socio', flat=True)
+            .first()
+        )
+        return int(maior) if maior else 0
+
+    def _gerar_numero_socio(self, using=None):
+        """Próximo número do contador, pulando os que já foram digitados à mão."""
+        while True:
+            numero = str(ContadorNumeracao.proximo(
+                ContadorNumeracao.NUMERO_SOCIO,
+                inicial=lambda: Socio._maior_numero_socio(using),
+                using=using,
+            )).zfill(6)
+            if not Socio.all_objects.using(using).filter(numero_socio=numero).exists():
+                return numero
+
+    @classmethod
+    def gerar_numeros_socio(cls, quantidade, ocupados, using=None):
+        """
+        ``quantidade`` números novos reservados de uma vez (importação em lote),
+        pulando os que estão em ``ocupados``. Mesma regra de transação de ``save``.
+        """
+        numeros = []
+        while len(numeros) < quantidade:
+            falta = quantidade - len(numeros)
+            ultimo = ContadorNumeracao.reservar(
+                ContadorNumeracao.NUMERO_SOCIO,
+                falta,
+                inicial=lambda: cls._maior_numero_socio(using),
+                using=using,
+            )
+            for valor in range(ultimo - falta + 1, ultimo + 1):
+                numero = str(valor).zfill(6)
+                if numero not in ocupados:
+                    numeros.append(numero)
+        return numeros
 
     def save(self, *args, **kwargs):
-        # Gera número do sócio automaticamente se não foi fornecido
+        # Gera número do sócio automaticamente se não foi fornecido. Número e
+        # INSERT ficam na mesma transação: se o INSERT falhar, o número volta
+        # ao contador.
         if not self.numero_socio:
-            self.numero_socio = self._gerar_numero_socio()
+            using = kwargs.get('using') or router.db_for_write(Socio, instance=self)
+            with transaction.atomic(using=using):
+                self.numero_socio = self._gerar_numero_socio(using)
+                try:
+                    return self.save(*args, **kwargs)
+                except Exception:
+                    self.numero_socio = ''
+                    raise
 
         # Define status padrão se não foi definido
         if not self.status:
@@ -373,6 +649,14 @@ class Socio(models.Model):
         if not self.data_associacao:
             self.data_associacao = timezone.now().date()
 
+        # Registra o dia do desligamento; volta a ficar vazio se o sócio é reativado
+        if self.status == 'inativo':
+            if not self.data_inativacao:
+                self.data_inativacao = timezone.now().date()
+        elif self.data_inativacao:
+            self._data_inativacao_removida = self.data_inativacao
+            self.data_inativacao = None
+
         # Define valores padrão para campos obrigatórios mas vazios
         if not self.cep:
             self.cep = ''
@@ -387,6 +671,13 @@ class Socio(models.Model):
         if not self.estado:
             self.estado = ''
 
+        self.busca = documento_busca(self)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and CAMPOS_BUSCA & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'busca'}
+        if update_fields is not None and 'status' in update_fields:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'data_inativacao'}
+
         super().save(*args, **kwargs)
 
     @property
@@ -571,6 +862,11 @@ class HistoricoPagamento(models.Model):
         verbose_name = "Histórico de Pagamento"
         verbose_name_plural = "Histórico de Pagamentos"
         ordering = ['-data_pagamento']
+        indexes = [
+            models.Index(fields=['status', 'data_pagamento'], name='socios_pag_status_data_idx'),
+            models.Index(fields=['status', 'mes_referencia'], name='socios_pag_status_ref_idx'),
+            models.Index(fields=['socio', 'status'], name='socios_pag_socio_status_idx'),
+        ]
 
     def __str__(self):
         return f"{self.socio.nome_completo} - {self.mes_referencia.strftime('%m/%Y')}"
@@ -619,6 +915,380 @@ class CobrancaAbacatePay(models.Model):
         verbose_name = 'Cobrança AbacatePay'
         verbose_name_plural = 'Cobranças AbacatePay'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['socio', 'status', 'created_at'], name='socios_cobranca_socio_idx'),
+            models.Index(fields=['status', 'created_at'], name='socios_cobranca_status_idx'),
+        ]
 
     def __str__(self):
         return f'{self.billing_id} – {self.socio.nome_completo} ({self.get_status_display()})'
+
+
+class ResumoFinanceiroMensal(models.Model):
+    """
+    Resumo financeiro pré-calculado de um mês.
+
+    Mantido por ``socios.financeiro``: os sinais de ``HistoricoPagamento``
+    recalculam apenas os meses afetados e o comando
+    ``atualizar_resumo_financeiro`` reconstrói um intervalo de meses.
+    """
+
+    mes = models.DateField(unique=True, verbose_name='Mês', help_text='Primeiro dia do mês')
+    receita = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        verbose_name='Receita Confirmada (R$)',
+    )
+    pagamentos_confirmados = models.PositiveIntegerField(default=0, verbose_name='Pagamentos Confirmados')
+    novos_socios = models.PositiveIntegerField(default=0, verbose_name='Novos Sócios')
+    socios_perdidos = models.PositiveIntegerField(default=0, verbose_name='Sócios Perdidos')
+    valor_inadimplencia = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        verbose_name='Valor em Atraso (R$)',
+    )
+    inadimplencia_por_plano = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name='Inadimplência por Plano',
+        help_text='{nome do plano: {"socios": n, "valor": "R$"}} no momento do último cálculo do mês',
+    )
+    atualizado_em = models.DateTimeField(auto_now=True, verbose_name='Atualizado em')
+
+    class Meta:
+        verbose_name = 'Resumo Financeiro Mensal'
+        verbose_name_plural = 'Resumos Financeiros Mensais'
+        ordering = ['mes']
+
+    def __str__(self):
+        return f"{self.mes.strftime('%m/%Y')} - R$ {self.receita}"
+
+
+class LoteAtualizacaoStatus(models.Model):
+    """Registro de auditoria de uma atualização de status em lote de sócios."""
+
+    origem = models.CharField(max_length=60, verbose_name='Origem', help_text='Comando ou rotina que alterou os status')
+    status_anterior = models.CharField(max_length=20, verbose_name='Status Anterior')
+    status_novo = models.CharField(max_length=20, verbose_name='Status Novo')
+    data_referencia = models.DateField(
+        verbose_name='Data de Referência',
+        help_text='Vencimentos anteriores a esta data foram considerados',
+    )
+    quantidade = models.PositiveIntegerField(default=0, verbose_name='Quantidade de Sócios')
+    socio_ids = models.JSONField(default=list, blank=True, verbose_name='IDs dos Sócios')
+    duracao_ms = models.PositiveIntegerField(default=0, verbose_name='Duração (ms)')
+    executado_em = models.DateTimeField(auto_now_add=True, verbose_name='Executado em')
+
+    class Meta:
+        verbose_name = 'Lote de Atualização de Status'
+        verbose_name_plural = 'Lotes de Atualização de Status'
+        ordering = ['-executado_em']
+
+    def __str__(self):
+        return f'{self.origem}: {self.quantidade} sócio(s) {self.status_anterior} → {self.status_novo}'
+
+
+class WebhookEvent(models.Model):
+    """
+    Caixa de entrada dos webhooks do AbacatePay.
+
+    O webhook só grava o evento e responde; ``socios.reconciliacao`` processa
+    a fila em lotes. ``chave`` (cobrança + status) deduplica reenvios.
+    """
+
+    ESTADO_PENDENTE = 'pendente'
+    ESTADO_PROCESSADO = 'processado'
+    ESTADO_IGNORADO = 'ignorado'
+    ESTADO_ERRO = 'erro'
+
+    ESTADO_CHOICES = [
+        (ESTADO_PENDENTE, 'Pendente'),
+        (ESTADO_PROCESSADO, 'Processado'),
+        (ESTADO_IGNORADO, 'Ignorado'),
+        (ESTADO_ERRO, 'Erro'),
+    ]
+
+    chave = models.CharField(max_length=160, unique=True, verbose_name='Chave de Deduplicação')
+    evento = models.CharField(max_length=60, blank=True, verbose_name='Evento')
+    billing_id = models.CharField(max_length=120, db_index=True, verbose_name='ID da Cobrança (AbacatePay)')
+    status_remoto = models.CharField(max_length=20, blank=True, verbose_name='Status no AbacatePay')
+    payload = models.JSONField(default=dict, verbose_name='Payload')
+    estado = models.CharField(
+        max_length=20,
+        choices=ESTADO_CHOICES,
+        default=ESTADO_PENDENTE,
+        verbose_name='Estado',
+    )
+    tentativas = models.PositiveIntegerField(default=0, verbose_name='Tentativas')
+    erro = models.TextField(blank=True, verbose_name='Último Erro')
+    recebido_em = models.DateTimeField(auto_now_add=True, verbose_name='Recebido em')
+    processado_em = models.DateTimeField(null=True, blank=True, verbose_name='Processado em')
+
+    class Meta:
+        verbose_name = 'Evento de Webhook'
+        verbose_name_plural = 'Eventos de Webhook'
+        ordering = ['-recebido_em']
+        indexes = [
+            models.Index(fields=['estado', 'recebido_em'], name='socios_webhook_fila_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.chave} ({self.get_estado_display()})'
+
+
+def _caminho_exportacao(instance, filename):
+    # Nome imprevisível: o arquivo fica em MEDIA_ROOT, mas só deve ser baixado
+    # pela view com checagem de permissão.
+    return f'exportacoes/{uuid.uuid4().hex}/{filename}'
+
+
+class Exportacao(models.Model):
+    """
+    Exportação grande gerada em segundo plano (CSV compactado ou XLSX).
+
+    A view só enfileira; o job ``socios.gerar_exportacoes`` gera o arquivo em
+    ``MEDIA_ROOT`` atualizando ``linhas_processadas``. ``chave`` identifica
+    tipo + formato + filtros, para que pedidos iguais dentro de
+    ``EXPORTACAO_TTL_MINUTOS`` reaproveitem o mesmo arquivo.
+    """
+
+    TIPO_SOCIOS = 'socios'
+    TIPO_PAGAMENTOS = 'pagamentos'
+
+    TIPO_CHOICES = [
+        (TIPO_SOCIOS, 'Sócios'),
+        (TIPO_PAGAMENTOS, 'Pagamentos'),
+    ]
+
+    FORMATO_CHOICES = [
+        ('csv', 'CSV (.csv.gz)'),
+        ('xlsx', 'Excel (.xlsx)'),
+    ]
+
+    STATUS_PENDENTE = 'pendente'
+    STATUS_PROCESSANDO = 'processando'
+    STATUS_CONCLUIDO = 'concluido'
+    STATUS_FALHOU = 'falhou'
+
+    STATUS_CHOICES = [
+        (STATUS_PENDENTE, 'Na fila'),
+        (STATUS_PROCESSANDO, 'Gerando'),
+        (STATUS_CONCLUIDO, 'Concluída'),
+        (STATUS_FALHOU, 'Falhou'),
+    ]
+
+    tipo = models.CharField(max_length=20, choices=TIPO_CHOICES, verbose_name='Tipo')
+    formato = models.CharField(max_length=10, choices=FORMATO_CHOICES, verbose_name='Formato')
+    filtros = models.JSONField(default=dict, blank=True, verbose_name='Filtros')
+    chave = models.CharField(max_length=64, verbose_name='Chave (tipo, formato e filtros)')
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=STATUS_PENDENTE,
+        verbose_name='Status',
+    )
+    total_linhas = models.PositiveIntegerField(null=True, blank=True, verbose_name='Total de Linhas')
+    linhas_processadas = models.PositiveIntegerField(default=0, verbose_name='Linhas Processadas')
+    arquivo = models.FileField(upload_to=_caminho_exportacao, blank=True, max_length=255, verbose_name='Arquivo')
+    erro = models.TextField(blank=True, verbose_name='Erro')
+    solicitado_por = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        verbose_name='Solicitado por',
+    )
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Solicitado em')
+    atualizado_em = models.DateTimeField(auto_now=True, verbose_name='Atualizado em')
+    iniciado_em = models.DateTimeField(null=True, blank=True, verbose_name='Iniciado em')
+    concluido_em = models.DateTimeField(null=True, blank=True, verbose_name='Concluído em')
+    expira_em = models.DateTimeField(null=True, blank=True, verbose_name='Expira em')
+
+    class Meta:
+        verbose_name = 'Exportação'
+        verbose_name_plural = 'Exportações'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['chave', 'status'], name='socios_exportacao_chave_idx'),
+            models.Index(fields=['status', 'created_at'], name='socios_exportacao_fila_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.get_tipo_display()} ({self.formato}) – {self.get_status_display()}'
+
+    @property
+    def progresso(self):
+        """Percentual concluído (0–100) ou None enquanto o total não é conhecido."""
+        if self.status == self.STATUS_CONCLUIDO:
+            return 100
+        if not self.total_linhas:
+            return None
+        return min(99, int(self.linhas_processadas * 100 / self.total_linhas))
+
+    @property
+    def disponivel(self):
+        return (
+            self.status == self.STATUS_CONCLUIDO
+            and bool(self.arquivo)
+            and (self.expira_em is None or self.expira_em > timezone.now())
+        )
+
+
+def _caminho_importacao(instance, filename):
+    # Planilhas com CPF e endereço: mesmo cuidado de _caminho_exportacao.
+    return f'importacoes/{uuid.uuid4().hex}/{filename}'
+
+
+class Importacao(models.Model):
+    """
+    Importação de sócios a partir de uma planilha (CSV ou XLSX).
+
+    A view só guarda o arquivo; o job ``socios.processar_importacoes`` lê a
+    planilha em lotes, valida, insere os válidos com ``bulk_create`` e grava em
+    ``relatorio`` as linhas recusadas com o motivo de cada uma.
+    """
+
+    STATUS_PENDENTE = 'pendente'
+    STATUS_PROCESSANDO = 'processando'
+    STATUS_CONCLUIDO = 'concluido'
+    STATUS_FALHOU = 'falhou'
+
+    STATUS_CHOICES = [
+        (STATUS_PENDENTE, 'Na fila'),
+        (STATUS_PROCESSANDO, 'Importando'),
+        (STATUS_CONCLUIDO, 'Concluída'),
+        (STATUS_FALHOU, 'Falhou'),
+    ]
+
+    arquivo = models.FileField(
+        upload_to=_caminho_importacao,
+        blank=True,
+        max_length=255,
+        verbose_name='Planilha',
+        help_text='Apagada ao fim da importação (contém CPF e endereço dos sócios).',
+    )
+    nome_original = models.CharField(max_length=255, verbose_name='Nome do Arquivo')
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=STATUS_PENDENTE,
+        verbose_name='Status',
+    )
+    linhas_processadas = models.PositiveIntegerField(default=0, verbose_name='Linhas Processadas')
+    importados = models.PositiveIntegerField(default=0, verbose_name='Sócios Importados')
+    recusados = models.PositiveIntegerField(default=0, verbose_name='Linhas Recusadas')
+    erros = models.JSONField(
+        default=list,
+        blank=True,
+        verbose_name='Primeiros Erros',
+        help_text='[linha, mensagem] das primeiras linhas recusadas; a lista completa fica no relatório.',
+    )
+    relatorio = models.FileField(
+        upload_to=_caminho_importacao, blank=True, max_length=255, verbose_name='Relatório de Erros',
+    )
+    erro = models.TextField(blank=True, verbose_name='Erro')
+    solicitado_por = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        verbose_name='Solicitado por',
+    )
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Enviado em')
+    atualizado_em = models.DateTimeField(auto_now=True, verbose_name='Atualizado em')
+    iniciado_em = models.DateTimeField(null=True, blank=True, verbose_name='Iniciado em')
+    concluido_em = models.DateTimeField(null=True, blank=True, verbose_name='Concluído em')
+
+    class Meta:
+        verbose_name = 'Importação de Sócios'
+        verbose_name_plural = 'Importações de Sócios'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='socios_importacao_fila_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.nome_original} – {self.get_status_display()}'
+
+
+class LancamentoExtrato(models.Model):
+    """
+    Crédito lido de um extrato bancário/PIX (CSV ou OFX) na conciliação de
+    mensalidades.
+
+    Os lançamentos associados a um sócio viram um ``HistoricoPagamento``; os
+    que não casaram com ninguém ficam ``pendente`` na fila de revisão até
+    alguém indicar o sócio ou ignorá-los. ``chave`` (o identificador da
+    transação no banco, ou um hash de data, valor e descrição) impede que o
+    mesmo extrato importado duas vezes gere pagamentos em dobro.
+    """
+
+    STATUS_PENDENTE = 'pendente'
+    STATUS_CONCILIADO = 'conciliado'
+    STATUS_IGNORADO = 'ignorado'
+
+    STATUS_CHOICES = [
+        (STATUS_PENDENTE, 'Aguardando revisão'),
+        (STATUS_CONCILIADO, 'Conciliado'),
+        (STATUS_IGNORADO, 'Ignorado'),
+    ]
+
+    CRITERIO_CHOICES = [
+        ('cpf', 'CPF'),
+        ('nome', 'Nome'),
+        ('valor', 'Valor'),
+        ('manual', 'Manual'),
+    ]
+
+    chave = models.CharField(max_length=64, unique=True, verbose_name='Identificador')
+    data = models.DateField(verbose_name='Data')
+    valor = models.DecimalField(max_digits=10, decimal_places=2, verbose_name='Valor')
+    descricao = models.CharField(max_length=255, blank=True, verbose_name='Descrição')
+    pagador = models.CharField(max_length=200, blank=True, verbose_name='Pagador')
+    documento = models.CharField(max_length=20, blank=True, verbose_name='CPF/CNPJ do Pagador')
+    arquivo = models.CharField(max_length=255, blank=True, verbose_name='Extrato de Origem')
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=STATUS_PENDENTE,
+        verbose_name='Status',
+    )
+    criterio = models.CharField(max_length=10, choices=CRITERIO_CHOICES, blank=True, verbose_name='Conciliado por')
+    socio = models.ForeignKey(
+        Socio,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='lancamentos_extrato',
+        verbose_name='Sócio',
+    )
+    pagamento = models.OneToOneField(
+        HistoricoPagamento,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='lancamento_extrato',
+        verbose_name='Pagamento',
+    )
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Importado em')
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        verbose_name='Importado por',
+    )
+    conciliado_em = models.DateTimeField(null=True, blank=True, verbose_name='Conciliado em')
+
+    class Meta:
+        verbose_name = 'Lançamento de Extrato'
+        verbose_name_plural = 'Lançamentos de Extrato'
+        ordering = ['-data', '-id']
+        indexes = [
+            models.Index(fields=['status', 'data'], name='socios_extrato_status_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.data:%d/%m/%Y} R$ {self.valor} – {self.descricao or self.pagador}'
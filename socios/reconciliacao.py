@@ -0,0 +1,280 @@
+"""
+Reconciliação de pagamentos AbacatePay.
+
+Concentra as transições de status disparadas por uma cobrança paga, cancelada
+ou expirada, tanto de associação (``CobrancaAbacatePay``) quanto de pedidos da
+loja (``Order.payment_id``). São usadas pela fila de webhooks, pelas páginas de
+verificação de pagamento e pela reconciliação periódica, que baixa a lista de
+cobranças uma única vez e liquida todas as pendências em uma passada.
+
+O webhook apenas grava o evento em ``WebhookEvent`` e responde;
+``processar_eventos_webhook`` consome a fila em lotes. As transições são
+idempotentes, então eventos repetidos ou fora de ordem não alteram nada.
+"""
+from __future__ import annotations
+
+import logging
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import CobrancaAbacatePay, HistoricoPagamento, WebhookEvent
+from .services import listar_status_cobrancas, verificar_status_cobranca
+
+logger = logging.getLogger(__name__)
+
+STATUS_PAGO = 'PAID'
+STATUS_ENCERRADOS = {
+    'CANCELLED': CobrancaAbacatePay.STATUS_CANCELADO,
+    'EXPIRED': CobrancaAbacatePay.STATUS_EXPIRADO,
+}
+
+# Eventos que falham mais vezes que isso ficam como erro para análise manual.
+MAX_TENTATIVAS_WEBHOOK = 5
+
+
+def ativar_socio_apos_pagamento(cobranca: CobrancaAbacatePay) -> bool:
+    """
+    Activates the socio and records the payment after AbacatePay confirms payment.
+
+    Returns False when the cobrança had already been confirmed by someone else.
+    """
+    with transaction.atomic():
+        # UPDATE condicional: webhook, página de verificação e reconciliação
+        # podem confirmar a mesma cobrança ao mesmo tempo; só quem vira o
+        # status ativa o sócio e registra o pagamento.
+        confirmada = CobrancaAbacatePay.objects.filter(pk=cobranca.pk).exclude(
+            status=CobrancaAbacatePay.STATUS_PAGO,
+        ).update(status=CobrancaAbacatePay.STATUS_PAGO, updated_at=timezone.now())
+        cobranca.status = CobrancaAbacatePay.STATUS_PAGO
+        if not confirmada:
+            return False
+
+        socio = cobranca.socio
+        hoje = timezone.now().date()
+
+        socio.status = 'ativo'
+        socio.data_associacao = hoje
+
+        if socio.tipo_assinatura:
+            socio.data_vencimento = hoje + timedelta(days=socio.tipo_assinatura.duracao_dias)
+
+        socio.save(update_fields=['status', 'data_associacao', 'data_vencimento'])
+
+        HistoricoPagamento.objects.create(
+            socio=socio,
+            data_pagamento=hoje,
+            data_vencimento=socio.data_vencimento or hoje,
+            valor=cobranca.valor,
+            mes_referencia=hoje.replace(day=1),
+            forma_pagamento='pix',
+            status='confirmado',
+            descricao=f'Pagamento via AbacatePay – cobrança {cobranca.billing_id}',
+        )
+
+    logger.info(
+        "AbacatePay: socio %s ativado após pagamento da cobrança %s",
+        socio.id,
+        cobranca.billing_id,
+    )
+    return True
+
+
+def aplicar_status_cobranca(cobranca: CobrancaAbacatePay, status: str | None) -> bool:
+    """
+    Aplica o status remoto à cobrança de associação. Retorna True se algo mudou.
+
+    O status em memória pode estar velho; cada transição é um UPDATE
+    condicional sobre o status gravado, então só um processo a aplica.
+    """
+    if cobranca.status == CobrancaAbacatePay.STATUS_PAGO:
+        return False
+    if status == STATUS_PAGO:
+        return ativar_socio_apos_pagamento(cobranca)
+    novo_status = STATUS_ENCERRADOS.get(status)
+    if novo_status and cobranca.status != novo_status:
+        encerrada = CobrancaAbacatePay.objects.filter(pk=cobranca.pk).exclude(
+            status__in=[CobrancaAbacatePay.STATUS_PAGO, novo_status],
+        ).update(status=novo_status, updated_at=timezone.now())
+        if not encerrada:
+            return False
+        cobranca.status = novo_status
+        logger.info("AbacatePay: cobranca %s -> %s", cobranca.billing_id, novo_status)
+        return True
+    return False
+
+
+def aplicar_status_pedido(order, status: str | None) -> bool:
+    """
+    Aplica o status remoto ao pedido da loja. Retorna True se algo mudou.
+
+    Como nas cobranças, as transições são UPDATEs condicionais sobre o status
+    gravado: o objeto em memória pode estar velho.
+    """
+    from shop.estoque import liberar_reservas
+    from shop.models import Order
+    from shop.views import _confirmar_pagamento_pedido
+
+    if order.payment_status == 'paid':
+        return False
+    if status == STATUS_PAGO:
+        return _confirmar_pagamento_pedido(order)
+    if status in STATUS_ENCERRADOS and order.payment_status != 'failed':
+        with transaction.atomic():
+            cancelado = Order.objects.filter(pk=order.pk).exclude(
+                payment_status__in=['paid', 'failed'],
+            ).update(payment_status='failed', status='cancelled', updated_at=timezone.now())
+            if not cancelado:
+                return False
+            order.payment_status = 'failed'
+            order.status = 'cancelled'
+            liberar_reservas(order)
+        logger.info("AbacatePay: pedido %s %s", order.order_number, status.lower())
+        return True
+    return False
+
+
+def sincronizar_cobranca(cobranca: CobrancaAbacatePay) -> str | None:
+    """Atualiza uma cobrança a partir da lista em cache e retorna o status remoto."""
+    if cobranca.status == CobrancaAbacatePay.STATUS_PAGO:
+        return STATUS_PAGO
+    status = verificar_status_cobranca(cobranca.billing_id)
+    aplicar_status_cobranca(cobranca, status)
+    return status
+
+
+def sincronizar_pedido(order) -> str | None:
+    """Atualiza um pedido a partir da lista em cache e retorna o status remoto."""
+    if order.payment_status == 'paid':
+        return STATUS_PAGO
+    status = verificar_status_cobranca(order.payment_id)
+    aplicar_status_pedido(order, status)
+    return status
+
+
+def reconciliar_pendentes() -> dict:
+    """
+    Baixa a lista de cobranças uma vez e liquida, em uma passada, toda
+    cobrança de associação pendente e todo pedido da loja não pago.
+    """
+    from shop.models import Order
+
+    mapa = listar_status_cobrancas(usar_cache=False)
+    resultado = {'cobrancas': 0, 'pedidos': 0}
+
+    cobrancas = CobrancaAbacatePay.objects.filter(
+        status=CobrancaAbacatePay.STATUS_PENDENTE,
+        billing_id__in=list(mapa),
+    ).select_related('socio__tipo_assinatura')
+    for cobranca in cobrancas:
+        if aplicar_status_cobranca(cobranca, mapa[cobranca.billing_id]):
+            resultado['cobrancas'] += 1
+
+    pedidos = Order.objects.filter(
+        payment_status='pending',
+        payment_id__in=list(mapa),
+    )
+    for order in pedidos:
+        if aplicar_status_pedido(order, mapa[order.payment_id]):
+            resultado['pedidos'] += 1
+
+    logger.info(
+        "AbacatePay: reconciliação concluída – %d cobrança(s), %d pedido(s) atualizados",
+        resultado['cobrancas'],
+        resultado['pedidos'],
+    )
+    return resultado
+
+
+def registrar_evento_webhook(billing_id: str, status: str, payload: dict) -> None:
+    """
+    Grava o evento na caixa de entrada com um único INSERT. Um reenvio do
+    mesmo status da mesma cobrança colide na ``chave`` e é descartado.
+    """
+    WebhookEvent.objects.bulk_create(
+        [WebhookEvent(
+            chave=f'{billing_id}:{status}',
+            evento=str(payload.get('event') or '')[:60],
+            billing_id=billing_id,
+            status_remoto=status[:20],
+            payload=payload,
+        )],
+        ignore_conflicts=True,
+    )
+
+
+def processar_eventos_webhook(tamanho_lote: int = 100) -> dict:
+    """
+    Consome a fila de ``WebhookEvent`` pendentes em lotes.
+
+    Cada lote é lido com ``select_for_update(skip_locked=True)`` (quando o
+    banco suporta), de modo que vários workers dividem a fila sem processar o
+    mesmo evento duas vezes. Cobranças e pedidos do lote são buscados em duas
+    consultas, sem lock: a mesma cobrança pode estar sendo liquidada ao mesmo
+    tempo pela página de verificação ou pela reconciliação, e quem garante que
+    só um deles a aplica são as transições condicionais de
+    ``aplicar_status_cobranca`` e ``aplicar_status_pedido``.
+    """
+    from shop.models import Order
+
+    resultado = {'processados': 0, 'ignorados': 0, 'erros': 0}
+    ultimo_id = 0
+
+    while True:
+        with transaction.atomic():
+            fila = WebhookEvent.objects.filter(
+                estado=WebhookEvent.ESTADO_PENDENTE,
+                pk__gt=ultimo_id,
+            ).order_by('pk')
+            if connection.features.has_select_for_update_skip_locked:
+                fila = fila.select_for_update(skip_locked=True)
+            eventos = list(fila[:tamanho_lote])
+            if not eventos:
+                break
+            ultimo_id = eventos[-1].pk
+
+            billing_ids = {evento.billing_id for evento in eventos}
+            cobrancas = {
+                cobranca.billing_id: cobranca
+                for cobranca in CobrancaAbacatePay.objects.select_related('socio__tipo_assinatura')
+                .filter(billing_id__in=billing_ids)
+            }
+            pedidos = {
+                order.payment_id: order
+                for order in Order.objects.filter(payment_id__in=billing_ids - set(cobrancas))
+            }
+
+            agora = timezone.now()
+            for evento in eventos:
+                evento.tentativas += 1
+                try:
+                    with transaction.atomic():
+                        if evento.billing_id in cobrancas:
+                            mudou = aplicar_status_cobranca(cobrancas[evento.billing_id], evento.status_remoto)
+                        elif evento.billing_id in pedidos:
+                            mudou = aplicar_status_pedido(pedidos[evento.billing_id], evento.status_remoto)
+                        else:
+                            logger.warning("AbacatePay webhook: billing_id=%s not found anywhere", evento.billing_id)
+                            evento.erro = 'Cobrança não encontrada'
+                            mudou = False
+                except Exception as exc:
+                    logger.exception("AbacatePay webhook: erro ao processar evento %s", evento.chave)
+                    evento.erro = str(exc)
+                    if evento.tentativas >= MAX_TENTATIVAS_WEBHOOK:
+                        evento.estado = WebhookEvent.ESTADO_ERRO
+                        evento.processado_em = agora
+                    resultado['erros'] += 1
+                    continue
+
+                evento.processado_em = agora
+                if mudou:
+                    evento.estado = WebhookEvent.ESTADO_PROCESSADO
+                    resultado['processados'] += 1
+                else:
+                    evento.estado = WebhookEvent.ESTADO_IGNORADO
+                    resultado['ignorados'] += 1
+
+            WebhookEvent.objects.bulk_update(eventos, ['estado', 'tentativas', 'erro', 'processado_em'])
+
+    return resultado
@@ -5,14 +5,22 @@ from __future__ import annotations
 
 import logging
 
-import requests
 from abacatepay.billings.models import Billing
 from abacatepay.constants import BASE_URL, USER_AGENT
 from abacatepay.utils.exceptions import raise_for_status
 from django.conf import settings
+from django.core.cache import cache
+
+from services.http_client import OutboundClient
 
 logger = logging.getLogger(__name__)
 
+# Base URL vem das settings em cada chamada; o cliente só cuida de pool, retry e breaker.
+abacatepay_http = OutboundClient("abacatepay", timeout=(3.05, 30), retries=2, failure_threshold=5)
+
+_STATUS_CACHE_KEY = "abacatepay:billing-status"
+_REFRESH_CACHE_KEY = "abacatepay:billing-status:refresh"
+
 
 def _api_key() -> str:
     key = settings.ABACATEPAY_API_KEY
@@ -42,15 +50,15 @@ def _post_billing(api_key: str, payload: dict) -> Billing:
     as  {"customerId": null}  which the AbacatePay API rejects with a 422.
     Using model_dump(exclude_none=True) keeps the body clean.
     """
-    response = requests.post(
+    response = abacatepay_http.post(
         f"{_base_url()}/billing/create",
+        endpoint="billing/create",
         json=payload,
         headers={
             "Authorization": f"Bearer {api_key}",
             "User-Agent": USER_AGENT,
             "Content-Type": "application/json",
         },
-        timeout=30,
     )
 
     if not response.ok:
@@ -148,21 +156,29 @@ def criar_cobranca_associacao(
     }
 
 
-def verificar_status_cobranca(billing_id: str) -> str | None:
+def listar_status_cobrancas(usar_cache: bool = True) -> dict[str, str]:
     """
-    Fetches the billing list from AbacatePay and returns the status string
-    (e.g. 'PAID', 'PENDING') of the billing with the given ID, or None if
-    not found.
+    Downloads ``/billing/list`` once and returns ``{billing_id: STATUS}``.
+
+    The map is kept in the cache for ``ABACATEPAY_STATUS_CACHE_TTL`` seconds so
+    that concurrent page views share one remote call instead of each
+    downloading the whole list.
     """
+    if usar_cache:
+        mapa = cache.get(_STATUS_CACHE_KEY)
+        if mapa is not None:
+            return mapa
+
     api_key = _api_key()
 
-    response = requests.get(
+    response = abacatepay_http.get(
         f"{_base_url()}/billing/list",
+        endpoint="billing/list",
         headers={
             "Authorization": f"Bearer {api_key}",
             "User-Agent": USER_AGENT,
         },
-        timeout=15,
+        timeout=(3.05, 15),
     )
 
     if not response.ok:
@@ -174,8 +190,26 @@ def verificar_status_cobranca(billing_id: str) -> str | None:
         raise_for_status(response)
 
     billings = response.json().get("data") or []
-    for billing in billings:
-        if billing.get("id") == billing_id:
-            return (billing.get("status") or "").upper()
+    mapa = {
+        billing["id"]: (billing.get("status") or "").upper()
+        for billing in billings
+        if billing.get("id")
+    }
+    cache.set(_STATUS_CACHE_KEY, mapa, settings.ABACATEPAY_STATUS_CACHE_TTL)
+    return mapa
+
+
+def verificar_status_cobranca(billing_id: str) -> str | None:
+    """
+    Returns the status string (e.g. 'PAID', 'PENDING') of the billing with the
+    given ID, or None if not found.
 
-    return None
+    Reads the cached billing list. A billing missing from it (e.g. created after
+    the last fetch) triggers a fresh download, but at most one per
+    ``ABACATEPAY_STATUS_CACHE_TTL`` across all callers: unknown or stale ids
+    polled by many pages would otherwise re-download the whole list every time.
+    """
+    mapa = listar_status_cobrancas()
+    if billing_id not in mapa and cache.add(_REFRESH_CACHE_KEY, True, settings.ABACATEPAY_STATUS_CACHE_TTL):
+        mapa = listar_status_cobrancas(usar_cache=False)
+    return mapa.get(billing_id)
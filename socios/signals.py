@@ -0,0 +1,76 @@
+"""
+Sinais do app de sócios.
+
+Mantêm o ``ResumoFinanceiroMensal`` em dia recalculando somente os meses
+afetados por cada alteração, e o índice de busca do SQLite depois de cada
+``migrate``.
+"""
+from django.db import connections, transaction
+from django.db.models.signals import post_delete, post_migrate, post_save, pre_save
+from django.dispatch import receiver
+
+from .busca import instalar_indice
+from .financeiro import recalcular_meses
+from .models import HistoricoPagamento, Socio
+
+
+def _recalcular_apos_commit(meses):
+    meses = {mes for mes in meses if mes}
+    if meses:
+        transaction.on_commit(lambda: recalcular_meses(meses))
+
+
+@receiver(pre_save, sender=HistoricoPagamento)
+def guardar_data_pagamento_original(sender, instance, **kwargs):
+    """Guarda a data original para recalcular também o mês antigo se ela mudar."""
+    instance._data_pagamento_original = None
+    if instance.pk:
+        instance._data_pagamento_original = (
+            HistoricoPagamento.objects.filter(pk=instance.pk)
+            .values_list('data_pagamento', flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=HistoricoPagamento)
+def atualizar_resumo_apos_pagamento(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    _recalcular_apos_commit([
+        instance.data_pagamento,
+        getattr(instance, '_data_pagamento_original', None),
+    ])
+
+
+@receiver(post_delete, sender=HistoricoPagamento)
+def atualizar_resumo_apos_exclusao_pagamento(sender, instance, **kwargs):
+    _recalcular_apos_commit([instance.data_pagamento])
+
+
+@receiver(post_save, sender=Socio)
+def atualizar_resumo_apos_socio(sender, instance, created, raw=False, **kwargs):
+    """Novas associações, desligamentos e reativações entram no resumo dos meses afetados."""
+    if raw:
+        return
+    meses = [instance.data_inativacao, getattr(instance, '_data_inativacao_removida', None)]
+    if created:
+        meses.append(instance.data_associacao)
+    _recalcular_apos_commit(meses)
+
+
+@receiver(post_migrate)
+def reinstalar_indice_busca(sender, using='default', **kwargs):
+    """
+    No SQLite o Django recria a tabela ao alterar colunas, levando junto os
+    triggers que mantêm a tabela FTS5 da busca; recria-os se for o caso.
+    """
+    connection = connections[using]
+    if sender.label != 'socios' or connection.vendor != 'sqlite':
+        return
+    tabela = Socio._meta.db_table
+    with connection.cursor() as cursor:
+        if tabela not in connection.introspection.table_names(cursor):
+            return
+        colunas = {c.name for c in connection.introspection.get_table_description(cursor, tabela)}
+    if 'busca' in colunas:
+        instalar_indice(connection, tabela)
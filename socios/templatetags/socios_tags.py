@@ -1,14 +1,19 @@
 from django import template
+from socios.middleware import get_socio
 from socios.models import Socio
 
 register = template.Library()
 
 
-@register.simple_tag
-def get_socio_for_user(user):
+@register.simple_tag(takes_context=True)
+def get_socio_for_user(context, user):
     """Retorna o Socio vinculado ao usuário, ou None se não for sócio."""
     if not getattr(user, 'is_authenticated', False):
         return None
+    # Usuário da requisição: reaproveita o sócio já resolvido pelo SocioMiddleware.
+    request = context.get('request')
+    if request is not None and getattr(request, 'user', None) is not None and request.user.pk == user.pk:
+        return get_socio(request)
     try:
         return Socio.objects.get(usuario=user)
     except Socio.DoesNotExist:
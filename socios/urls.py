@@ -7,9 +7,11 @@ app_name = 'socios'
 urlpatterns = [
     # Dashboard
     path('', views.dashboard_socios, name='dashboard'),
+    path('dashboard.json', views.dashboard_socios_json, name='dashboard_json'),
     
     # CRUD Sócios
     path('listar/', views.listar_socios, name='listar'),
+    path('listar.json', views.listar_socios_json, name='listar_json'),
     path('cadastrar/', views.cadastrar_socio, name='cadastrar'),
     path('<int:socio_id>/', views.detalhe_socio, name='detalhe'),
     path('<int:socio_id>/editar/', views.editar_socio, name='editar'),
@@ -18,6 +20,8 @@ urlpatterns = [
     
     # Pagamentos
     path('<int:socio_id>/pagamento/', views.registrar_pagamento, name='registrar_pagamento'),
+    path('pagamentos/conciliacao/', views_enhanced.conciliacao_extrato, name='conciliacao'),
+    path('pagamentos/conciliacao/<int:lancamento_id>/', views_enhanced.resolver_lancamento, name='resolver_lancamento'),
     
     # Documentos
     path('<int:socio_id>/documento/', views.upload_documento, name='upload_documento'),
@@ -35,8 +39,19 @@ urlpatterns = [
     
     # Enhanced Features
     path('bulk-status/', views_enhanced.bulk_status_update, name='bulk_status_update'),
-    path('exportar-csv/', views_enhanced.export_socios_csv, name='export_csv'),
+    path('exportar-csv/', views_enhanced.export_socios, {'formato': 'csv'}, name='export_csv'),
+    path('exportar-xlsx/', views_enhanced.export_socios, {'formato': 'xlsx'}, name='export_xlsx'),
+    path('pagamentos/exportar-csv/', views_enhanced.export_pagamentos, {'formato': 'csv'}, name='export_pagamentos_csv'),
+    path('pagamentos/exportar-xlsx/', views_enhanced.export_pagamentos, {'formato': 'xlsx'}, name='export_pagamentos_xlsx'),
+    path('exportacoes/', views_enhanced.lista_exportacoes, name='exportacoes'),
+    path('exportacoes/status.json', views_enhanced.status_exportacoes_json, name='status_exportacoes'),
+    path('exportacoes/<int:exportacao_id>/baixar/', views_enhanced.baixar_exportacao, name='baixar_exportacao'),
+    path('exportacoes/<str:tipo>/<str:formato>/', views_enhanced.enfileirar_exportacao, name='enfileirar_exportacao'),
+    path('importacoes/', views_enhanced.importacoes, name='importacoes'),
+    path('importacoes/status.json', views_enhanced.status_importacoes_json, name='status_importacoes'),
+    path('importacoes/<int:importacao_id>/relatorio/', views_enhanced.baixar_relatorio_importacao, name='relatorio_importacao'),
     path('busca-avancada/', views_enhanced.advanced_search, name='advanced_search'),
+    path('busca-avancada.json', views_enhanced.advanced_search_json, name='advanced_search_json'),
     
     # Member Portal (Self-Service)
     path('associar-se/', views_enhanced.registro_socio, name='registro_socio'),
@@ -4,7 +4,6 @@ import logging
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
-from django.core.paginator import Paginator
 from django.db.models import Q, Count, Sum, F
 from django.http import JsonResponse, HttpResponse
 from django.urls import reverse
@@ -14,42 +13,22 @@ from django.views.decorators.http import require_POST
 from datetime import datetime, timedelta
 from decimal import Decimal
 
+from services.pagination import KeysetPaginator, json_page
+from users.roles import is_gestor_socios
+
+from .exportacao import filtrar_socios
 from .models import Socio, TipoAssinatura, DocumentoSocio, HistoricoPagamento, CobrancaAbacatePay
 from .forms import SocioForm, TipoAssinaturaForm, DocumentoSocioForm, HistoricoPagamentoForm
+from .dashboard import DashboardSnapshot
+from .financeiro import resumos_ultimos_meses
+from .reconciliacao import registrar_evento_webhook, sincronizar_cobranca
 
 logger = logging.getLogger(__name__)
 
 
 def is_admin_or_manager(user):
     """Verifica se o usuário é admin ou tem permissões de gestão"""
-    
-    if not getattr(user, 'is_authenticated', False):
-        return False
-
-    # Superuser ou staff têm acesso
-    if getattr(user, 'is_superuser', False) or getattr(user, 'is_staff', False):
-        return True
-
-    # Grupos comuns de gestão (ajuste nomes conforme sua aplicação)
-    manager_groups = [
-        'admin',
-        'management'
-    ]
-    if user.groups.filter(name__in=manager_groups).exists():
-        return True
-
-    # Permissões específicas que indiquem capacidade de gerenciar sócios
-    gerente_perms = [
-        'socios.add_socio',
-        'socios.change_socio',
-        'socios.delete_socio',
-        'socios.manage_socios',
-    ]
-    for perm in gerente_perms:
-        if user.has_perm(perm):
-            return True
-
-    return False
+    return is_gestor_socios(user)
 
 
 @login_required
@@ -57,106 +36,58 @@ def is_admin_or_manager(user):
 def dashboard_socios(request):
     """Dashboard principal do sistema de sócios"""
     
-    # Estatísticas gerais
-    total_socios = Socio.objects.count()
-    socios_ativos = Socio.objects.filter(status='ativo').count()
-    socios_inadimplentes = Socio.objects.filter(status='inadimplente').count()
-    
-    # Sócios que vencem nos próximos 7 dias (exclui bolsistas)
-    data_limite = timezone.now().date() + timedelta(days=7)
-    vencem_em_breve = Socio.objects.filter(
-        data_vencimento__isnull=False,
-        data_vencimento__lte=data_limite,
-        status='ativo',
-        bolsista=False
-    ).count()
-    
-    # Receita mensal (pagamentos confirmados no mês atual)
-    mes_atual = timezone.now().replace(day=1).date()
-    receita_mensal = HistoricoPagamento.objects.filter(
-        mes_referencia__gte=mes_atual,
-        status='pago'
-    ).aggregate(
-        total=Sum('valor')
-    )['total'] or Decimal('0.00')
-    
-    # Gráfico de evolução de sócios (últimos 12 meses)
-    evolucao_socios = []
-    for i in range(12):
-        data = timezone.now().date().replace(day=1) - timedelta(days=30*i)
-        total = Socio.objects.filter(
-            data_associacao__isnull=False,
-            data_associacao__lte=data
-        ).count()
-        evolucao_socios.append({
-            'mes': data.strftime('%m/%Y'),
-            'total': total
-        })
-    evolucao_socios.reverse()
-    
-    # Distribuição por tipo de assinatura
-    distribuicao_planos = TipoAssinatura.objects.annotate(
-        total_socios=Count('socio')
-    ).values('nome', 'total_socios', 'cor')
-    
-    # Próximos vencimentos (5 mais próximos, exclui bolsistas)
-    proximos_vencimentos = Socio.objects.filter(
-        status='ativo',
-        data_vencimento__isnull=False,
-        bolsista=False
-    ).order_by('data_vencimento')[:5]
-    
-    # Novos sócios (últimos 5)
-    novos_socios = Socio.objects.filter(
-        data_associacao__isnull=False
-    ).order_by('-data_associacao')[:5]
-    
-    context = {
-        'total_socios': total_socios,
-        'socios_ativos': socios_ativos,
-        'socios_inadimplentes': socios_inadimplentes,
-        'vencem_em_breve': vencem_em_breve,
-        'receita_mensal': receita_mensal,
-        'evolucao_socios': evolucao_socios,
-        'distribuicao_planos': distribuicao_planos,
-        'proximos_vencimentos': proximos_vencimentos,
-        'novos_socios': novos_socios,
-    }
-    
-    return render(request, 'socios/dashboard.html', context)
+    snapshot = DashboardSnapshot()
+    return render(request, 'socios/dashboard.html', snapshot.as_context())
 
 
 @login_required
 @user_passes_test(is_admin_or_manager)
-def listar_socios(request):
-    """Lista todos os sócios com filtros e paginação"""
+def dashboard_socios_json(request):
+    """Métricas do dashboard em JSON (mesmos números da página)"""
     
-    socios = Socio.objects.select_related('tipo_assinatura').all()
+    return JsonResponse(DashboardSnapshot().as_dict())
+
+
+def _filtrar_socios(request):
+    """Sócios filtrados pelos parâmetros da listagem (status, plano e busca)"""
     
-    # Filtros
     status_filter = request.GET.get('status')
     tipo_filter = request.GET.get('plano')  # Mudado de 'tipo' para 'plano'
     search = request.GET.get('busca')  # Mudado de 'search' para 'busca'
     
-    if status_filter:
-        socios = socios.filter(status=status_filter)
-    
-    if tipo_filter:
-        socios = socios.filter(tipo_assinatura_id=tipo_filter)
-    
-    if search:
-        socios = socios.filter(
-            Q(nome_completo__icontains=search) |
-            Q(nome_social__icontains=search) |
-            Q(numero_socio__icontains=search) |
-            Q(email__icontains=search) |
-            Q(cpf__icontains=search)
-        )
+    return filtrar_socios(request.GET), status_filter, tipo_filter, search
+
+
+def _paginar_socios(request, socios, per_page=20):
+    # Paginação por cursor: a página 500 custa o mesmo que a primeira.
+    if 'relevancia' in socios.query.annotations:
+        ordering = ('-relevancia', 'id')
+    else:
+        ordering = ('numero_socio', 'id')
+    return KeysetPaginator(socios, ordering, per_page=per_page).get_page(request)
+
+
+def _socio_json(socio):
+    return {
+        'id': socio.id,
+        'numero_socio': socio.numero_socio,
+        'nome': socio.nome_exibicao,
+        'email': socio.email,
+        'status': socio.status,
+        'status_display': socio.get_status_display(),
+        'plano': socio.tipo_assinatura.nome if socio.tipo_assinatura else None,
+        'data_vencimento': socio.data_vencimento,
+        'url': reverse('socios:detalhe', args=[socio.id]),
+    }
+
+
+@login_required
+@user_passes_test(is_admin_or_manager)
+def listar_socios(request):
+    """Lista todos os sócios com filtros e paginação"""
     
-    # Paginação
-    paginator = Paginator(socios, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    socios, status_filter, tipo_filter, search = _filtrar_socios(request)
+    page_obj = _paginar_socios(request, socios)
     
     # Tipos de assinatura para filtro
     tipos_assinatura = TipoAssinatura.objects.filter(ativo=True)
@@ -172,6 +103,15 @@ def listar_socios(request):
     return render(request, 'socios/listar.html', context)
 
 
+@login_required
+@user_passes_test(is_admin_or_manager)
+def listar_socios_json(request):
+    """Listagem de sócios em JSON para rolagem infinita (``?after=<next>``)"""
+    
+    socios, _, _, _ = _filtrar_socios(request)
+    return json_page(_paginar_socios(request, socios), _socio_json)
+
+
 @login_required
 @user_passes_test(is_admin_or_manager)
 def detalhe_socio(request, socio_id):
@@ -549,21 +489,22 @@ def relatorio_financeiro(request):
     
     hoje = timezone.now().date()
     
-    # Filtros de período (padrão: últimos 12 meses)
+    # Filtros de período em meses fechados (padrão: últimos 12 meses)
     periodo = request.GET.get('periodo', '12')
-    if periodo == '1':
-        data_inicio = hoje.replace(day=1)  # Mês atual
-        titulo_periodo = "Mês Atual"
-    elif periodo == '3':
-        data_inicio = hoje - timedelta(days=90)  # Últimos 3 meses
-        titulo_periodo = "Últimos 3 Meses"
-    elif periodo == '6':
-        data_inicio = hoje - timedelta(days=180)  # Últimos 6 meses
-        titulo_periodo = "Últimos 6 Meses"
-    else:
-        data_inicio = hoje - timedelta(days=365)  # Últimos 12 meses (padrão)
-        titulo_periodo = "Últimos 12 Meses"
+    titulos_periodo = {
+        '1': "Mês Atual",
+        '3': "Últimos 3 Meses",
+        '6': "Últimos 6 Meses",
+        '12': "Últimos 12 Meses",
+    }
+    if periodo not in titulos_periodo:
         periodo = '12'
+    titulo_periodo = titulos_periodo[periodo]
+    
+    # Resumos mensais pré-calculados (ResumoFinanceiroMensal)
+    resumos = resumos_ultimos_meses(hoje, 12)
+    resumos_periodo = resumos[-int(periodo):]
+    data_inicio = resumos_periodo[0].mes
     
     # ============ ESTATÍSTICAS GERAIS ============
     
@@ -576,10 +517,7 @@ def relatorio_financeiro(request):
     # ============ RECEITAS ============
     
     # Receita confirmada no período
-    receita_periodo = HistoricoPagamento.objects.filter(
-        data_pagamento__gte=data_inicio,
-        status='confirmado'
-    ).aggregate(total=Sum('valor'))['total'] or Decimal('0.00')
+    receita_periodo = sum((r.receita for r in resumos_periodo), Decimal('0.00'))
     
     # Receita mensal atual (estimativa baseada nos planos ativos)
     receita_mensal_estimada = Socio.objects.filter(
@@ -594,33 +532,29 @@ def relatorio_financeiro(request):
     
     # ============ INADIMPLÊNCIA ============
     
-    # Sócios inadimplentes (exclui bolsistas)
-    inadimplentes = Socio.objects.filter(
-        data_vencimento__isnull=False,
-        data_vencimento__lt=hoje,
-        status__in=['ativo', 'inadimplente'],
-        bolsista=False
-    ).select_related('tipo_assinatura')
-    
-    valor_inadimplencia = sum(
-        s.tipo_assinatura.valor_mensal for s in inadimplentes if s.tipo_assinatura
+    # Fotografia do mês corrente no resumo materializado (exclui bolsistas)
+    resumo_atual = resumos[-1]
+    valor_inadimplencia = resumo_atual.valor_inadimplencia
+    inadimplencia_por_plano = sorted(
+        (
+            {'plano': plano, 'socios': linha['socios'], 'valor': Decimal(linha['valor'])}
+            for plano, linha in resumo_atual.inadimplencia_por_plano.items()
+        ),
+        key=lambda linha: linha['valor'],
+        reverse=True,
     )
+    total_inadimplentes = sum(linha['socios'] for linha in inadimplencia_por_plano)
     
-    taxa_inadimplencia = (inadimplentes.count() / total_socios * 100) if total_socios > 0 else 0
+    taxa_inadimplencia = (total_inadimplentes / total_socios * 100) if total_socios > 0 else 0
+    inadimplencia_por_faixa = Socio.objects.inadimplentes(hoje).por_faixa_atraso(hoje)
     
     # ============ CRESCIMENTO ============
     
     # Novos sócios no período
-    novos_socios = Socio.objects.filter(
-        data_associacao__isnull=False,
-        data_associacao__gte=data_inicio
-    ).count()
+    novos_socios = sum(r.novos_socios for r in resumos_periodo)
     
     # Sócios que se tornaram inativos no período
-    socios_perdidos = Socio.objects.filter(
-        status='inativo',
-        updated_at__gte=data_inicio
-    ).count()
+    socios_perdidos = sum(r.socios_perdidos for r in resumos_periodo)
     
     crescimento_liquido = novos_socios - socios_perdidos
     
@@ -635,43 +569,15 @@ def relatorio_financeiro(request):
     # ============ EVOLUÇÃO TEMPORAL ============
     
     # Receitas mensais dos últimos 12 meses
-    evolucao_receitas = []
-    for i in range(12):
-        mes = hoje - timedelta(days=30*i)
-        mes_inicio = mes.replace(day=1)
-        if i == 0:
-            # Mês atual até hoje
-            mes_fim = hoje
-        else:
-            # Mês completo
-            proximo_mes = mes_inicio.replace(day=28) + timedelta(days=4)
-            mes_fim = proximo_mes - timedelta(days=proximo_mes.day)
-        
-        receita_mes = HistoricoPagamento.objects.filter(
-            data_pagamento__gte=mes_inicio,
-            data_pagamento__lte=mes_fim,
-            status='confirmado'
-        ).aggregate(total=Sum('valor'))['total'] or Decimal('0.00')
-        
-        evolucao_receitas.append({
-            'mes': mes_inicio.strftime('%m/%Y'),
-            'receita': float(receita_mes)
-        })
-    
-    evolucao_receitas.reverse()
+    evolucao_receitas = [
+        {'mes': r.mes.strftime('%m/%Y'), 'receita': float(r.receita)}
+        for r in resumos
+    ]
     
     # ============ PREVISÕES ============
     
     # Vencimentos nos próximos 30 dias (exclui bolsistas)
-    vencimentos_proximos = Socio.objects.filter(
-        data_vencimento__isnull=False,
-        data_vencimento__gte=hoje,
-        data_vencimento__lte=hoje + timedelta(days=30),
-        status='ativo',
-        bolsista=False
-    ).aggregate(
-        total=Sum('tipo_assinatura__valor_mensal')
-    )['total'] or Decimal('0.00')
+    vencimentos_proximos = Socio.objects.vencendo(hoje, dias=30).valor_total()
     
     # ============ MÉTRICAS DE PERFORMANCE ============
     
@@ -706,6 +612,9 @@ def relatorio_financeiro(request):
         # Inadimplência
         'valor_inadimplencia': valor_inadimplencia,
         'taxa_inadimplencia': round(taxa_inadimplencia, 1),
+        'inadimplencia_por_plano': inadimplencia_por_plano,
+        'inadimplencia_atualizada_em': resumo_atual.atualizado_em,
+        'inadimplencia_por_faixa': inadimplencia_por_faixa,
         
         # Crescimento
         'novos_socios': novos_socios,
@@ -733,25 +642,21 @@ def relatorio_financeiro(request):
 def relatorio_inadimplentes(request):
     """Relatório de sócios inadimplentes (exclui bolsistas)"""
     
-    # Sócios com vencimento atrasado
+    # Sócios com vencimento atrasado, com meses e valor em aberto anotados
     hoje = timezone.now().date()
-    inadimplentes = Socio.objects.filter(
-        data_vencimento__isnull=False,
-        data_vencimento__lt=hoje,
-        status__in=['ativo', 'inadimplente'],
-        bolsista=False
-    ).select_related('tipo_assinatura').order_by('data_vencimento')
+    inadimplentes = Socio.objects.inadimplentes(hoje).select_related(
+        'tipo_assinatura'
+    ).order_by('data_vencimento')
     
-    # Estatísticas
-    total_inadimplentes = inadimplentes.count()
-    valor_total_em_atraso = sum(
-        s.tipo_assinatura.valor_mensal for s in inadimplentes if s.tipo_assinatura
-    )
+    # Estatísticas (um único aggregate, reaproveitado pelo template)
+    resumo = inadimplentes.resumo()
     
     context = {
         'inadimplentes': inadimplentes,
-        'total_inadimplentes': total_inadimplentes,
-        'valor_total_em_atraso': valor_total_em_atraso,
+        'total_inadimplentes': resumo['total'],
+        'valor_total_em_atraso': resumo['valor'],
+        'inadimplencia_por_plano': inadimplentes.por_plano(),
+        'inadimplencia_por_faixa': inadimplentes.por_faixa_atraso(hoje),
     }
     
     return render(request, 'socios/relatorio_inadimplentes.html', context)
@@ -765,30 +670,19 @@ def pagina_pendencias(request):
     hoje = timezone.now().date()
     
     # Sócios com pagamento em atraso (exclui bolsistas)
-    inadimplentes = Socio.objects.filter(
-        data_vencimento__isnull=False,
-        data_vencimento__lt=hoje,
-        status__in=['ativo', 'inadimplente'],
-        bolsista=False
-    ).select_related('tipo_assinatura').order_by('data_vencimento')
+    inadimplentes = Socio.objects.inadimplentes(hoje).select_related(
+        'tipo_assinatura'
+    ).order_by('data_vencimento')
     
     # Sócios que vencem nos próximos 7 dias (exclui bolsistas)
-    vencem_em_breve = Socio.objects.filter(
-        data_vencimento__isnull=False,
-        data_vencimento__gte=hoje,
-        data_vencimento__lte=hoje + timedelta(days=7),
-        status='ativo',
-        bolsista=False
-    ).select_related('tipo_assinatura').order_by('data_vencimento')
+    vencem_em_breve = Socio.objects.vencendo(hoje, dias=7).select_related(
+        'tipo_assinatura'
+    ).order_by('data_vencimento')
     
     # Sócios que vencem nos próximos 30 dias (exclui bolsistas)
-    vencem_no_mes = Socio.objects.filter(
-        data_vencimento__isnull=False,
-        data_vencimento__gte=hoje,
-        data_vencimento__lte=hoje + timedelta(days=30),
-        status='ativo',
-        bolsista=False
-    ).select_related('tipo_assinatura').order_by('data_vencimento')
+    vencem_no_mes = Socio.objects.vencendo(hoje, dias=30).select_related(
+        'tipo_assinatura'
+    ).order_by('data_vencimento')
     
     # Sócios sem documentos
     sem_documentos = Socio.objects.filter(
@@ -811,8 +705,8 @@ def pagina_pendencias(request):
     data_limite_inativo = hoje - timedelta(days=180)
     inativos_ha_tempo = Socio.objects.filter(
         status='inativo',
-        updated_at__lt=data_limite_inativo
-    ).order_by('updated_at')
+        data_inativacao__lt=data_limite_inativo
+    ).order_by('data_inativacao')
     
     # Estatísticas gerais
     total_pendencias = (
@@ -823,14 +717,10 @@ def pagina_pendencias(request):
     )
     
     # Valor total em atraso
-    valor_total_atraso = sum(
-        s.tipo_assinatura.valor_mensal for s in inadimplentes
-    )
+    valor_total_atraso = inadimplentes.valor_total()
     
     # Receita potencial dos vencimentos próximos
-    receita_vencimentos = sum(
-        s.tipo_assinatura.valor_mensal for s in vencem_em_breve
-    )
+    receita_vencimentos = vencem_em_breve.valor_total()
     
     context = {
         'inadimplentes': inadimplentes,
@@ -878,12 +768,10 @@ def atualizar_status_socio(request, socio_id):
 def verificar_pagamento(request, socio_id):
     """
     Called when the user clicks 'Verificar novamente'.
-    Polls AbacatePay's billing list for the latest status and activates the
-    socio immediately if the payment is confirmed, then redirects back to the
-    waiting page (which will render the success state).
+    Reads the latest status from the (briefly cached) AbacatePay billing list
+    and activates the socio immediately if the payment is confirmed, then
+    redirects back to the waiting page (which will render the success state).
     """
-    from .services import verificar_status_cobranca
-
     socio = get_object_or_404(Socio, id=socio_id, usuario=request.user)
     cobranca = CobrancaAbacatePay.objects.filter(socio=socio).order_by('-created_at').first()
 
@@ -896,14 +784,13 @@ def verificar_pagamento(request, socio_id):
         return redirect('socios:pagamento_aguardando', socio_id=socio_id)
 
     try:
-        status = verificar_status_cobranca(cobranca.billing_id)
+        status = sincronizar_cobranca(cobranca)
     except Exception as exc:
         logger.error("Erro ao verificar status da cobrança %s: %s", cobranca.billing_id, exc)
         messages.error(request, 'Não foi possível consultar o status do pagamento. Tente novamente em instantes.')
         return redirect('socios:pagamento_aguardando', socio_id=socio_id)
 
     if status == 'PAID':
-        _ativar_socio_apos_pagamento(cobranca)
         messages.success(request, 'Pagamento confirmado! Seu cadastro foi ativado.')
     else:
         messages.info(request, f'Pagamento ainda não confirmado (status: {status or "desconhecido"}). Tente novamente em alguns instantes.')
@@ -936,16 +823,12 @@ def pagamento_sucesso(request, socio_id):
     cadastro is activated even when the webhook can't reach the server (e.g. in
     local/Docker dev).
     """
-    from .services import verificar_status_cobranca
-
     socio = get_object_or_404(Socio, id=socio_id, usuario=request.user)
     cobranca = CobrancaAbacatePay.objects.filter(socio=socio).order_by('-created_at').first()
 
     if cobranca and cobranca.status != CobrancaAbacatePay.STATUS_PAGO:
         try:
-            status = verificar_status_cobranca(cobranca.billing_id)
-            if status == 'PAID':
-                _ativar_socio_apos_pagamento(cobranca)
+            sincronizar_cobranca(cobranca)
         except Exception as exc:
             logger.error(
                 "Erro ao verificar status da cobrança %s na página de sucesso: %s",
@@ -970,6 +853,9 @@ def pagamento_webhook(request):
     AbacatePay server-to-server webhook (configured in the AbacatePay dashboard,
     not passed as completionUrl). AbacatePay sends a POST with the event payload
     and the configured secret appended as the ?webhookSecret=... query param.
+
+    The event is stored in the ``WebhookEvent`` inbox and acknowledged right
+    away; repeated deliveries are deduplicated there.
     """
     from django.conf import settings as django_settings
 
@@ -996,74 +882,8 @@ def pagamento_webhook(request):
     if not billing_id:
         return HttpResponse(status=400)
 
-    try:
-        cobranca = CobrancaAbacatePay.objects.select_related('socio__tipo_assinatura').get(
-            billing_id=billing_id
-        )
-        if status == 'PAID' and cobranca.status != CobrancaAbacatePay.STATUS_PAGO:
-            _ativar_socio_apos_pagamento(cobranca)
-        elif status == 'CANCELLED':
-            cobranca.status = CobrancaAbacatePay.STATUS_CANCELADO
-            cobranca.save(update_fields=['status', 'updated_at'])
-            logger.info("AbacatePay webhook: cobranca %s cancelada", billing_id)
-        elif status == 'EXPIRED':
-            cobranca.status = CobrancaAbacatePay.STATUS_EXPIRADO
-            cobranca.save(update_fields=['status', 'updated_at'])
-            logger.info("AbacatePay webhook: cobranca %s expirada", billing_id)
-    except CobrancaAbacatePay.DoesNotExist:
-        # Check if it is a shop order
-        try:
-            from shop.models import Order
-            from shop.views import _confirmar_pagamento_pedido
-            order = Order.objects.get(payment_id=billing_id)
-            if status == 'PAID' and order.payment_status != 'paid':
-                _confirmar_pagamento_pedido(order)
-            elif status == 'CANCELLED':
-                order.payment_status = 'failed'
-                order.status = 'cancelled'
-                order.save(update_fields=['payment_status', 'status'])
-                logger.info("AbacatePay webhook: pedido %s cancelado", order.order_number)
-            elif status == 'EXPIRED':
-                order.payment_status = 'failed'
-                order.status = 'cancelled'
-                order.save(update_fields=['payment_status', 'status'])
-                logger.info("AbacatePay webhook: pedido %s expirou", order.order_number)
-        except Order.DoesNotExist:
-            logger.warning("AbacatePay webhook: billing_id=%s not found anywhere", billing_id)
-            return HttpResponse(status=404)
+    # Só registra o evento; a tarefa socios.processar_webhooks aplica o status.
+    registrar_evento_webhook(billing_id, status, payload)
 
     return HttpResponse(status=200)
 
-
-def _ativar_socio_apos_pagamento(cobranca: CobrancaAbacatePay) -> None:
-    """Activates the socio and records the payment after AbacatePay confirms payment."""
-    socio = cobranca.socio
-    hoje = timezone.now().date()
-
-    socio.status = 'ativo'
-    socio.data_associacao = hoje
-
-    if socio.tipo_assinatura:
-        socio.data_vencimento = hoje + timedelta(days=socio.tipo_assinatura.duracao_dias)
-
-    socio.save(update_fields=['status', 'data_associacao', 'data_vencimento'])
-
-    HistoricoPagamento.objects.create(
-        socio=socio,
-        data_pagamento=hoje,
-        data_vencimento=socio.data_vencimento or hoje,
-        valor=cobranca.valor,
-        mes_referencia=hoje.replace(day=1),
-        forma_pagamento='pix',
-        status='confirmado',
-        descricao=f'Pagamento via AbacatePay – cobrança {cobranca.billing_id}',
-    )
-
-    cobranca.status = CobrancaAbacatePay.STATUS_PAGO
-    cobranca.save(update_fields=['status', 'updated_at'])
-
-    logger.info(
-        "AbacatePay: socio %s ativado após pagamento da cobrança %s",
-        socio.id,
-        cobranca.billing_id,
-    )
@@ -5,24 +5,35 @@ Bulk actions, advanced filtering, exports, member portal
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
-from django.http import HttpResponse, JsonResponse
-from django.db.models import Q, Count, Sum, F
-from django.core.paginator import Paginator
+from django.http import FileResponse, Http404, JsonResponse
+from django.db.models import Count, Sum, F
 from django.utils import timezone
 from django.views.decorators.http import require_POST
 from django.urls import reverse
 from datetime import datetime, timedelta
 from decimal import Decimal
-import csv
 import logging
+import os
 
 from django.conf import settings
 from django.contrib.auth import login, get_user_model
-from django.db import transaction, IntegrityError
-
-from .models import Socio, TipoAssinatura, DocumentoSocio, HistoricoPagamento, CobrancaAbacatePay
-from .forms import SocioForm, SocioRegistroForm, SocioRegistroFormAnonymous
-from socios.views import is_admin_or_manager
+from django.db import IntegrityError, transaction
+
+from .busca import buscar_socios
+from .models import Socio, TipoAssinatura, DocumentoSocio, HistoricoPagamento, CobrancaAbacatePay, Exportacao, Importacao, LancamentoExtrato
+from .forms import ExtratoConciliacaoForm, ImportacaoSociosForm, SocioForm, SocioRegistroForm, SocioRegistroFormAnonymous
+from .middleware import get_socio
+from .exportacao import (
+    COLUNAS_PAGAMENTOS, COLUNAS_SOCIOS, EXPORTACOES, filtrar_pagamentos, nome_arquivo, solicitar_exportacao,
+)
+from .middleware import SESSAO_EXPORTACOES
+from .conciliacao import conciliar_extrato, conciliar_manualmente, resolver_pendente
+from .financeiro import recalcular_meses
+from .arquivos import PlanilhaInvalida
+from .importacao import VALIDADE_RELATORIO
+from services.exports import FORMATS, export_response
+from services.pagination import json_page
+from socios.views import _filtrar_socios, _paginar_socios, _socio_json, is_admin_or_manager
 
 logger = logging.getLogger(__name__)
 
@@ -50,7 +61,19 @@ def bulk_status_update(request):
         messages.error(request, 'Status inválido')
         return redirect('socios:listar')
     
-    updated = Socio.objects.filter(id__in=socio_ids).update(status=new_status)
+    socios = Socio.objects.filter(id__in=socio_ids)
+    # update() não passa por Socio.save(): a data de inativação e o resumo
+    # financeiro dos meses afetados são mantidos aqui
+    meses = set(socios.exclude(data_inativacao=None).values_list('data_inativacao', flat=True))
+    with transaction.atomic():
+        if new_status == 'inativo':
+            hoje = timezone.now().date()
+            socios.filter(data_inativacao=None).update(data_inativacao=hoje)
+            meses.add(hoje)
+        else:
+            socios.exclude(data_inativacao=None).update(data_inativacao=None)
+        updated = socios.update(status=new_status)
+        transaction.on_commit(lambda: recalcular_meses(meses))
     messages.success(request, f'{updated} sócio(s) atualizado(s) com sucesso!')
     
     return redirect('socios:listar')
@@ -58,77 +81,236 @@ def bulk_status_update(request):
 
 @login_required
 @user_passes_test(is_admin_or_manager)
-def export_socios_csv(request):
-    """Export socios to CSV"""
-    socios = Socio.objects.select_related('tipo_assinatura').all()
-    
-    # Apply filters from request
-    status_filter = request.GET.get('status')
-    tipo_filter = request.GET.get('plano')
-    search = request.GET.get('busca')
-    
-    if status_filter:
-        socios = socios.filter(status=status_filter)
-    if tipo_filter:
-        socios = socios.filter(tipo_assinatura_id=tipo_filter)
-    if search:
-        socios = socios.filter(
-            Q(nome_completo__icontains=search) |
-            Q(nome_social__icontains=search) |
-            Q(numero_socio__icontains=search) |
-            Q(email__icontains=search) |
-            Q(cpf__icontains=search)
-        )
-    
-    response = HttpResponse(content_type='text/csv; charset=utf-8')
-    response['Content-Disposition'] = f'attachment; filename="socios_{timezone.now().strftime("%Y%m%d")}.csv"'
-    
-    writer = csv.writer(response)
-    writer.writerow([
-        'Número Sócio', 'Nome Completo', 'Nome Social', 'CPF', 'Email',
-        'Telefone', 'Status', 'Tipo Assinatura', 'Data Associação',
-        'Data Vencimento', 'Rating FIDE', 'Rating CBX', 'Cidade', 'Estado'
-    ])
-    
-    for socio in socios:
-        writer.writerow([
-            socio.numero_socio,
-            socio.nome_completo,
-            socio.nome_social or '',
-            socio.cpf,
-            socio.email,
-            socio.telefone or socio.celular or '',
-            socio.get_status_display(),
-            socio.tipo_assinatura.nome if socio.tipo_assinatura else '',
-            socio.data_associacao.strftime('%d/%m/%Y') if socio.data_associacao else '',
-            socio.data_vencimento.strftime('%d/%m/%Y') if socio.data_vencimento else '',
-            socio.rating_fide or '',
-            socio.rating_cbx or '',
-            socio.cidade,
-            socio.estado,
-        ])
+def export_socios(request, formato='csv'):
+    """Export socios (same filters as the list page) to CSV or XLSX, streamed"""
+    socios, _, _, _ = _filtrar_socios(request)
+    return export_response(
+        socios, COLUNAS_SOCIOS, nome_arquivo('socios'), formato, sheet_title='Sócios',
+    )
+
+
+@login_required
+@user_passes_test(is_admin_or_manager)
+def export_pagamentos(request, formato='csv'):
+    """Export payment history to CSV or XLSX, streamed"""
+    pagamentos = filtrar_pagamentos(request.GET)
+    return export_response(
+        pagamentos, COLUNAS_PAGAMENTOS, nome_arquivo('pagamentos'), formato, sheet_title='Pagamentos',
+    )
+
+
+@login_required
+@user_passes_test(is_admin_or_manager)
+@require_POST
+def enfileirar_exportacao(request, tipo, formato):
+    """Queue a background export with the filters in the query string"""
+    if tipo not in EXPORTACOES or formato not in FORMATS:
+        raise Http404
+    exportacao, reaproveitada = solicitar_exportacao(tipo, formato, request.GET, request.user)
+    
+    if exportacao.disponivel:
+        messages.info(request, 'Já existe um arquivo recente com esses filtros; use o link de download abaixo.')
+    else:
+        aguardando = request.session.get(SESSAO_EXPORTACOES, [])
+        if exportacao.pk not in aguardando:
+            request.session[SESSAO_EXPORTACOES] = aguardando + [exportacao.pk]
+        if reaproveitada:
+            messages.info(request, 'Uma exportação igual já está em andamento; você será avisado quando terminar.')
+        else:
+            messages.success(request, 'Exportação enfileirada. Você será avisado quando o arquivo estiver pronto.')
     
-    return response
+    return redirect('socios:exportacoes')
 
 
 @login_required
 @user_passes_test(is_admin_or_manager)
-def advanced_search(request):
-    """Advanced search with multiple filters"""
+def lista_exportacoes(request):
+    """Recent background exports (the team's), with progress and download links"""
+    exportacoes = Exportacao.objects.select_related('solicitado_por')[:50]
+    return render(request, 'socios/exportacoes.html', {'exportacoes': exportacoes})
+
+
+@login_required
+@user_passes_test(is_admin_or_manager)
+def status_exportacoes_json(request):
+    """Progress of the given exports (``?id=1&id=2``), polled by the exports page"""
+    ids = [int(pk) for pk in request.GET.getlist('id') if pk.isdigit()][:50]
+    exportacoes = Exportacao.objects.filter(pk__in=ids)
+    return JsonResponse({'exportacoes': [
+        {
+            'id': exportacao.pk,
+            'status': exportacao.status,
+            'status_display': exportacao.get_status_display(),
+            'progresso': exportacao.progresso,
+            'linhas_processadas': exportacao.linhas_processadas,
+            'total_linhas': exportacao.total_linhas,
+            'download_url': (
+                reverse('socios:baixar_exportacao', args=[exportacao.pk]) if exportacao.disponivel else None
+            ),
+        }
+        for exportacao in exportacoes
+    ]})
+
+
+@login_required
+@user_passes_test(is_admin_or_manager)
+def baixar_exportacao(request, exportacao_id):
+    """Download a finished export (files are not linked straight from MEDIA_URL)"""
+    exportacao = get_object_or_404(Exportacao, pk=exportacao_id)
+    if not exportacao.disponivel:
+        messages.error(request, 'Este arquivo expirou ou ainda não está pronto.')
+        return redirect('socios:exportacoes')
+    return FileResponse(
+        exportacao.arquivo.open('rb'),
+        as_attachment=True,
+        filename=os.path.basename(exportacao.arquivo.name),
+    )
+
+
+@login_required
+@user_passes_test(is_admin_or_manager)
+def importacoes(request):
+    """Upload a members spreadsheet (imported in the background) and list recent imports"""
+    if request.method == 'POST':
+        form = ImportacaoSociosForm(request.POST, request.FILES)
+        if form.is_valid():
+            arquivo = form.cleaned_data['arquivo']
+            Importacao.objects.create(
+                arquivo=arquivo,
+                nome_original=os.path.basename(arquivo.name)[:255],
+                solicitado_por=request.user,
+            )
+            messages.success(request, 'Planilha recebida. A importação começa em instantes; acompanhe o progresso abaixo.')
+            return redirect('socios:importacoes')
+    else:
+        form = ImportacaoSociosForm()
+
+    importacoes = Importacao.objects.select_related('solicitado_por')[:20]
+    return render(request, 'socios/importacoes.html', {
+        'form': form,
+        'importacoes': importacoes,
+        'validade_dias': VALIDADE_RELATORIO.days,
+    })
+
+
+@login_required
+@user_passes_test(is_admin_or_manager)
+def status_importacoes_json(request):
+    """Progress of the given imports (``?id=1&id=2``), polled by the imports page"""
+    ids = [int(pk) for pk in request.GET.getlist('id') if pk.isdigit()][:20]
+    return JsonResponse({'importacoes': [
+        {
+            'id': importacao.pk,
+            'status': importacao.status,
+            'status_display': importacao.get_status_display(),
+            'linhas_processadas': importacao.linhas_processadas,
+            'importados': importacao.importados,
+            'recusados': importacao.recusados,
+        }
+        for importacao in Importacao.objects.filter(pk__in=ids)
+    ]})
+
+
+@login_required
+@user_passes_test(is_admin_or_manager)
+def baixar_relatorio_importacao(request, importacao_id):
+    """Download the rejected rows of an import, with the reason for each one"""
+    importacao = get_object_or_404(Importacao, pk=importacao_id)
+    if not importacao.relatorio:
+        raise Http404
+    return FileResponse(
+        importacao.relatorio.open('rb'),
+        as_attachment=True,
+        filename=os.path.basename(importacao.relatorio.name),
+    )
+
+
+@login_required
+@user_passes_test(is_admin_or_manager)
+def conciliacao_extrato(request):
+    """Upload a bank/PIX statement, register the matched payments and list the review queue"""
+    if request.method == 'POST':
+        form = ExtratoConciliacaoForm(request.POST, request.FILES)
+        if form.is_valid():
+            arquivo = form.cleaned_data['arquivo']
+            try:
+                resultado = conciliar_extrato(
+                    arquivo, arquivo.name, request.user, form.cleaned_data['forma_pagamento'],
+                )
+            except PlanilhaInvalida as e:
+                form.add_error('arquivo', str(e))
+            except IntegrityError:
+                # Outro envio do mesmo extrato gravou os lançamentos primeiro
+                logger.warning('Conflito ao conciliar o extrato %s', arquivo.name, exc_info=True)
+                form.add_error(
+                    'arquivo',
+                    'Lançamentos deste extrato foram gravados por outro envio ao mesmo tempo. '
+                    'Envie o arquivo de novo: os já conciliados serão ignorados.',
+                )
+            else:
+                messages.success(
+                    request,
+                    f"{resultado['creditos']} crédito(s) no extrato: {resultado['conciliados']} pagamento(s) registrado(s), "
+                    f"{resultado['revisao']} para revisão, {resultado['repetidos']} já importado(s) antes."
+                )
+                return redirect('socios:conciliacao')
+    else:
+        form = ExtratoConciliacaoForm()
+
+    pendentes = LancamentoExtrato.objects.filter(status=LancamentoExtrato.STATUS_PENDENTE).order_by('data', 'id')
+    context = {
+        'form': form,
+        'pendentes': pendentes[:100],
+        'total_pendentes': pendentes.count(),
+        'recentes': LancamentoExtrato.objects.filter(
+            status=LancamentoExtrato.STATUS_CONCILIADO,
+        ).select_related('socio').order_by('-conciliado_em', '-id')[:20],
+        'formas_pagamento': HistoricoPagamento.forma_pagamento_choices,
+    }
+    return render(request, 'socios/conciliacao.html', context)
+
+
+@login_required
+@user_passes_test(is_admin_or_manager)
+@require_POST
+def resolver_lancamento(request, lancamento_id):
+    """Assign a member to a statement line in the review queue, or ignore it"""
+    lancamento = get_object_or_404(LancamentoExtrato, pk=lancamento_id)
+    if lancamento.status != LancamentoExtrato.STATUS_PENDENTE:
+        messages.info(request, 'Este lançamento já tinha sido resolvido.')
+        return redirect('socios:conciliacao')
+
+    if request.POST.get('acao') == 'ignorar':
+        if resolver_pendente(lancamento, LancamentoExtrato.STATUS_IGNORADO):
+            messages.info(request, 'Lançamento ignorado.')
+        else:
+            messages.info(request, 'Este lançamento já tinha sido resolvido.')
+        return redirect('socios:conciliacao')
+
+    numero = (request.POST.get('numero_socio') or '').strip()
+    socio = Socio.objects.select_related('tipo_assinatura').filter(numero_socio=numero).first() if numero else None
+    if socio is None:
+        messages.error(request, f'Nenhum sócio com o número "{numero}".')
+        return redirect('socios:conciliacao')
+
+    forma = request.POST.get('forma_pagamento')
+    if forma not in dict(HistoricoPagamento.forma_pagamento_choices):
+        forma = 'pix'
+    if conciliar_manualmente(lancamento, socio, request.user, forma):
+        messages.success(request, f'Pagamento de R$ {lancamento.valor} registrado para {socio.nome_completo}.')
+    else:
+        messages.info(request, 'Este lançamento já tinha sido resolvido.')
+    return redirect('socios:conciliacao')
+
+
+def _advanced_search_queryset(request):
+    """Members matching the advanced search filters, plus the filters used"""
     socios = Socio.objects.select_related('tipo_assinatura').all()
     
     # Text search
     search_query = request.GET.get('q', '')
     if search_query:
-        socios = socios.filter(
-            Q(nome_completo__icontains=search_query) |
-            Q(nome_social__icontains=search_query) |
-            Q(numero_socio__icontains=search_query) |
-            Q(email__icontains=search_query) |
-            Q(cpf__icontains=search_query) |
-            Q(telefone__icontains=search_query) |
-            Q(celular__icontains=search_query)
-        )
+        socios = buscar_socios(socios, search_query)
     
     # Status filter
     status = request.GET.get('status')
@@ -190,10 +372,31 @@ def advanced_search(request):
             status='ativo'
         )
     
-    # Pagination
-    paginator = Paginator(socios, 50)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    filters = {
+        'q': search_query,
+        'status': status,
+        'plano': plano_id,
+        'data_associacao_inicio': data_associacao_inicio,
+        'data_associacao_fim': data_associacao_fim,
+        'data_vencimento_inicio': data_vencimento_inicio,
+        'data_vencimento_fim': data_vencimento_fim,
+        'cidade': cidade,
+        'estado': estado,
+        'rating_fide_min': rating_fide_min,
+        'rating_fide_max': rating_fide_max,
+        'pagamento_status': pagamento_status,
+    }
+    return socios, filters
+
+
+@login_required
+@user_passes_test(is_admin_or_manager)
+def advanced_search(request):
+    """Advanced search with multiple filters"""
+    socios, filters = _advanced_search_queryset(request)
+    
+    # Pagination (cursor-based, see services.pagination)
+    page_obj = _paginar_socios(request, socios, per_page=50)
     
     # Context
     tipos_assinatura = TipoAssinatura.objects.filter(ativo=True)
@@ -203,25 +406,20 @@ def advanced_search(request):
         'socios': page_obj,
         'tipos_assinatura': tipos_assinatura,
         'estados': estados,
-        'filters': {
-            'q': search_query,
-            'status': status,
-            'plano': plano_id,
-            'data_associacao_inicio': data_associacao_inicio,
-            'data_associacao_fim': data_associacao_fim,
-            'data_vencimento_inicio': data_vencimento_inicio,
-            'data_vencimento_fim': data_vencimento_fim,
-            'cidade': cidade,
-            'estado': estado,
-            'rating_fide_min': rating_fide_min,
-            'rating_fide_max': rating_fide_max,
-            'pagamento_status': pagamento_status,
-        }
+        'filters': filters,
     }
     
     return render(request, 'socios/advanced_search.html', context)
 
 
+@login_required
+@user_passes_test(is_admin_or_manager)
+def advanced_search_json(request):
+    """Advanced search results as JSON for infinite scroll (``?after=<next>``)"""
+    socios, _ = _advanced_search_queryset(request)
+    return json_page(_paginar_socios(request, socios, per_page=50), _socio_json)
+
+
 def registro_socio(request):
     """Associar-se ao clube. Se não estiver logado, cria a conta e o sócio no mesmo fluxo."""
     from types import SimpleNamespace
@@ -229,10 +427,7 @@ def registro_socio(request):
 
     # Logado e já tem um registro de sócio
     if request.user.is_authenticated:
-        try:
-            socio_existente = Socio.objects.get(usuario=request.user)
-        except Socio.DoesNotExist:
-            socio_existente = None
+        socio_existente = get_socio(request)
 
         if socio_existente:
             if socio_existente.status == 'pendente_pagamento':
@@ -269,19 +464,8 @@ def registro_socio(request):
                         precisa_pagar = settings.SHOP_ENABLED and plano and plano.valor_mensal > 0
                         socio.status = 'pendente_pagamento' if precisa_pagar else 'ativo'
 
-                        for _ in range(5):
-                            try:
-                                with transaction.atomic():
-                                    socio.numero_socio = ''
-                                    socio.save()
-                                break
-                            except IntegrityError as e:
-                                if 'numero_socio' in str(e) and 'unique' in str(e).lower():
-                                    continue
-                                raise
-                        else:
-                            socio.numero_socio = str(__import__('uuid').uuid4())[:8].upper()
-                            socio.save()
+                        # numero_socio vem do contador (ContadorNumeracao), sem colisão
+                        socio.save()
 
                     # Login and external HTTP call happen AFTER the DB transaction commits
                     login(request, user)
@@ -410,9 +594,8 @@ def _redirecionar_para_pagamento(request, socio, tipo_assinatura, redirect_on_er
 @login_required
 def renovar_assinatura(request):
     """Permite ao sócio renovar/pagar sua mensalidade via AbacatePay pelo portal."""
-    try:
-        socio = Socio.objects.get(usuario=request.user)
-    except Socio.DoesNotExist:
+    socio = get_socio(request)
+    if socio is None:
         messages.error(request, 'Você não é um sócio cadastrado.')
         return redirect('dashboard')
         
@@ -449,9 +632,8 @@ def renovar_assinatura(request):
 @login_required
 def member_portal(request):
     """Member self-service portal"""
-    try:
-        socio = Socio.objects.get(usuario=request.user)
-    except Socio.DoesNotExist:
+    socio = get_socio(request)
+    if socio is None:
         messages.error(request, 'Você não é um sócio cadastrado')
         return redirect('dashboard')
 
@@ -485,9 +667,8 @@ def member_portal(request):
 @login_required
 def member_update_info(request):
     """Allow members to update their own information"""
-    try:
-        socio = Socio.objects.get(usuario=request.user)
-    except Socio.DoesNotExist:
+    socio = get_socio(request)
+    if socio is None:
         messages.error(request, 'Você não é um sócio cadastrado')
         return redirect('dashboard')
     
@@ -0,0 +1,37 @@
+"""Periodic user jobs (run by ``manage.py run_jobs``)."""
+import logging
+from datetime import timedelta
+
+from django.utils import timezone
+
+from scheduler.registry import register_job
+from services.ChessComService import ChessComApi
+
+from .models import ChessComProfile
+
+logger = logging.getLogger(__name__)
+
+# Profiles refreshed per run, stalest first, to stay polite with the public API.
+CHESSCOM_BATCH_SIZE = 25
+CHESSCOM_MAX_AGE = timedelta(hours=24)
+
+
+@register_job('users.atualizar_chesscom', interval=timedelta(hours=1), jitter=timedelta(minutes=10))
+def atualizar_chesscom():
+    """Refreshes the stalest Chess.com profiles from the public API."""
+    perfis = ChessComProfile.objects.filter(
+        user__is_chesscom_connected=True,
+        updated_at__lt=timezone.now() - CHESSCOM_MAX_AGE,
+    ).order_by('updated_at')[:CHESSCOM_BATCH_SIZE]
+
+    atualizados = 0
+    for perfil in perfis:
+        stats = ChessComApi.get_player_stats(perfil.chesscom_username)
+        if stats is None:
+            # Push the profile to the back of the queue so the same failing
+            # usernames are not retried ahead of everyone else every hour.
+            ChessComProfile.objects.filter(pk=perfil.pk).update(updated_at=timezone.now())
+            continue
+        perfil.atualizar_de_api(stats)
+        atualizados += 1
+    return f'{atualizados} perfil(is) atualizado(s)'
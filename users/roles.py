@@ -0,0 +1,91 @@
+"""
+Papéis do usuário no clube, calculados uma vez e guardados em cache.
+
+Verificar se alguém pode gerenciar sócios custa uma consulta de grupos e
+duas de permissões; isso rodava em toda página (menu do ``base.html``) e em
+toda view de gestão. ``get_roles`` faz esse cálculo uma vez e guarda o
+resultado no cache, com uma chave que inclui uma versão por usuário e uma
+versão global. Os sinais em ``users.signals`` incrementam essas versões
+quando grupos, permissões ou os flags ``is_staff``/``is_superuser`` mudam,
+então o cache nunca fica desatualizado e não precisa ser apagado.
+"""
+from __future__ import annotations
+
+from django.core.cache import cache
+
+ROLE_SUPERUSER = 'superuser'
+ROLE_STAFF = 'staff'
+ROLE_GESTOR_SOCIOS = 'gestor_socios'
+
+# Grupos comuns de gestão (ajuste nomes conforme sua aplicação)
+GRUPOS_GESTAO = ('admin', 'management')
+
+# Permissões específicas que indiquem capacidade de gerenciar sócios
+PERMISSOES_GESTAO = (
+    'socios.add_socio',
+    'socios.change_socio',
+    'socios.delete_socio',
+    'socios.manage_socios',
+)
+
+ROLES_TIMEOUT = 60 * 60
+_VERSAO_GLOBAL = 'users:roles:versao'
+
+
+def _chave_versao_usuario(user_id) -> str:
+    return f'users:roles:versao:{user_id}'
+
+
+def _calcular_roles(user) -> frozenset:
+    roles = set()
+    if user.is_superuser:
+        roles.add(ROLE_SUPERUSER)
+    if user.is_staff:
+        roles.add(ROLE_STAFF)
+    if (
+        roles
+        or user.groups.filter(name__in=GRUPOS_GESTAO).exists()
+        or any(user.has_perm(perm) for perm in PERMISSOES_GESTAO)
+    ):
+        roles.add(ROLE_GESTOR_SOCIOS)
+    return frozenset(roles)
+
+
+def get_roles(user) -> frozenset:
+    """Papéis de ``user``; memoizado no objeto e guardado no cache entre requisições."""
+    if not getattr(user, 'is_authenticated', False):
+        return frozenset()
+    roles = getattr(user, '_club_roles', None)
+    if roles is not None:
+        return roles
+
+    chave_usuario = _chave_versao_usuario(user.pk)
+    versoes = cache.get_many([_VERSAO_GLOBAL, chave_usuario])
+    chave = f'users:roles:{user.pk}:{versoes.get(_VERSAO_GLOBAL, 0)}:{versoes.get(chave_usuario, 0)}'
+    roles = cache.get(chave)
+    if roles is None:
+        roles = _calcular_roles(user)
+        cache.set(chave, roles, ROLES_TIMEOUT)
+    user._club_roles = roles
+    return roles
+
+
+def is_gestor_socios(user) -> bool:
+    return ROLE_GESTOR_SOCIOS in get_roles(user)
+
+
+def _incrementar(chave: str) -> None:
+    try:
+        cache.incr(chave)
+    except ValueError:
+        cache.set(chave, 1, None)
+
+
+def invalidar_usuario(user_id) -> None:
+    """Descarta os papéis em cache de um usuário."""
+    _incrementar(_chave_versao_usuario(user_id))
+
+
+def invalidar_todos() -> None:
+    """Descarta os papéis em cache de todos os usuários (ex.: permissões de um grupo mudaram)."""
+    _incrementar(_VERSAO_GLOBAL)
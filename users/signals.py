@@ -0,0 +1,74 @@
+"""
+Sinais do app de usuários.
+
+Invalidam os papéis em cache (``users.roles``) quando grupos, permissões ou
+os flags de staff/superusuário mudam.
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .roles import invalidar_todos, invalidar_usuario
+
+User = get_user_model()
+
+ACOES_M2M = {'post_add', 'post_remove', 'post_clear', 'pre_clear'}
+CAMPOS_ROLES = {'is_staff', 'is_superuser', 'is_active'}
+
+
+def _invalidar_usuarios_apos_commit(user_ids):
+    user_ids = set(user_ids)
+    if user_ids:
+        transaction.on_commit(lambda: [invalidar_usuario(user_id) for user_id in user_ids])
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+def invalidar_roles_m2m_usuario(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ACOES_M2M:
+        return
+    if not reverse:
+        _invalidar_usuarios_apos_commit([instance.pk])
+    elif pk_set:
+        # group.user_set.add(...) / permission.user_set.add(...)
+        _invalidar_usuarios_apos_commit(pk_set)
+    else:
+        # clear() pelo lado do grupo/permissão: não sabemos quais usuários.
+        transaction.on_commit(invalidar_todos)
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def invalidar_roles_permissoes_grupo(sender, action, **kwargs):
+    if action in ACOES_M2M:
+        transaction.on_commit(invalidar_todos)
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidar_roles_grupo(sender, **kwargs):
+    # Renomear um grupo pode colocá-lo (ou tirá-lo) de GRUPOS_GESTAO.
+    transaction.on_commit(invalidar_todos)
+
+
+@receiver(pre_save, sender=User)
+def guardar_flags_originais(sender, instance, update_fields=None, **kwargs):
+    instance._flags_originais = None
+    # Ex.: o login salva só last_login; não há o que comparar.
+    if update_fields is not None and not CAMPOS_ROLES & set(update_fields):
+        instance._flags_originais = False
+        return
+    if instance.pk:
+        instance._flags_originais = (
+            User.objects.filter(pk=instance.pk).values_list('is_staff', 'is_superuser', 'is_active').first()
+        )
+
+
+@receiver(post_save, sender=User)
+def invalidar_roles_flags(sender, instance, created, raw=False, **kwargs):
+    if raw or created or getattr(instance, '_flags_originais', None) is False:
+        return
+    flags = (instance.is_staff, instance.is_superuser, instance.is_active)
+    if getattr(instance, '_flags_originais', None) != flags:
+        _invalidar_usuarios_apos_commit([instance.pk])
@@ -10,6 +10,7 @@ urlpatterns = [
     path('conectar-chesscom/', conectar_chesscom, name='conectar_chesscom'),
     path('atualizar-chesscom/', atualizar_dados_chesscom, name='atualizar_dados_chesscom'),
     path('admin/usuarios/', admin_users_list, name='admin_users_list'),
+    path('admin/usuarios.json', admin_users_list_json, name='admin_users_list_json'),
     path('admin/usuarios/<int:user_id>/editar/', admin_user_edit, name='admin_user_edit'),
     path('dashboard/', dashboard, name='dashboard'),
 ]
@@ -0,0 +1,89 @@
+"""
+Geração de usernames únicos a partir do e-mail (``joao@x.com`` -> ``joao``,
+``joao_1``, ``joao_2``...).
+
+Em vez de testar um sufixo por consulta, ``gerar_usernames`` busca de uma vez
+todos os usernames que começam com cada base (``joao`` e ``joao_%``) e
+escolhe o primeiro sufixo livre em memória: uma consulta por cadastro, ou por
+lote inteiro numa importação. Entre a consulta e o INSERT outro cadastro
+pode pegar o mesmo nome; a restrição UNIQUE barra e ``salvar_com_username``
+gera de novo uma vez.
+"""
+from __future__ import annotations
+
+import re
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+
+MAX_LENGTH = 150
+
+# Sufixos de até 11 dígitos cabem depois de uma base cortada neste tamanho.
+_RAIZ_MAX = MAX_LENGTH - 12
+
+
+def username_base(email: str) -> str:
+    base = (email.split("@")[0] if email else "").strip().lower()
+    base = re.sub(r"[^a-z0-9_]+", "_", base).strip("_")
+    return base or "user"
+
+
+def _candidato(base: str, sufixo: int) -> str:
+    sufixo_str = str(sufixo)
+    return f"{base[:MAX_LENGTH - len(sufixo_str) - 1]}_{sufixo_str}"
+
+
+def _existentes(bases, using=None) -> set[str]:
+    """Usernames já usados que podem colidir com alguma das ``bases``."""
+    filtro = Q()
+    for base in bases:
+        raiz = base[:_RAIZ_MAX]
+        if raiz == base:
+            filtro |= Q(username=base) | Q(username__startswith=f"{base}_")
+        else:
+            # Base longa: o sufixo corta o fim dela, então o prefixo comum é menor.
+            filtro |= Q(username__startswith=raiz)
+    if not filtro:
+        return set()
+    return set(get_user_model()._default_manager.using(using).filter(filtro).values_list("username", flat=True))
+
+
+def gerar_usernames(emails, using=None) -> list[str]:
+    """
+    Um username livre para cada e-mail, na ordem, com uma consulta só. E-mails
+    com a mesma base no mesmo lote recebem sufixos diferentes.
+    """
+    bases = [username_base(email) for email in emails]
+    ocupados = _existentes(set(bases), using=using)
+    usernames = []
+    for base in bases:
+        username = base[:MAX_LENGTH]
+        sufixo = 1
+        while username in ocupados:
+            username = _candidato(base, sufixo)
+            sufixo += 1
+        ocupados.add(username)
+        usernames.append(username)
+    return usernames
+
+
+def gerar_username(email: str, using=None) -> str:
+    return gerar_usernames([email], using=using)[0]
+
+
+def salvar_com_username(user, email: str):
+    """
+    Gera o username de ``user`` a partir de ``email`` e salva. Se outro
+    cadastro levou o mesmo nome nesse meio tempo, gera de novo uma vez.
+    """
+    UserModel = get_user_model()
+    for tentativa in range(2):
+        user.username = gerar_username(email)
+        try:
+            with transaction.atomic():
+                user.save()
+            return user
+        except IntegrityError:
+            if tentativa or not UserModel._default_manager.filter(username=user.username).exists():
+                raise
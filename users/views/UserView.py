@@ -1,13 +1,12 @@
 from urllib.parse import quote
-import re
 
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.db import IntegrityError, transaction
-from django.core.paginator import Paginator
 from django.db.models import Q
 from django.contrib.auth.views import LoginView, LogoutView
 from django.contrib.auth.forms import UserCreationForm
+from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, render, redirect
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
@@ -16,7 +15,10 @@ from django.contrib.auth import get_user_model
 from django.urls import reverse
 from django.contrib.auth.forms import AuthenticationForm
 from django import forms
+from services import cache as services_cache
+from services.pagination import KeysetPaginator, json_page
 from services.ChessComService import ChessComApi
+from users.usernames import gerar_username, salvar_com_username
 
 
 class SimpleUserCreationForm(forms.ModelForm):
@@ -69,27 +71,14 @@ class SimpleUserCreationForm(forms.ModelForm):
 
     def save(self, commit=True):
         user = super().save(commit=False)
-        user.username = self._build_unique_username(self.cleaned_data.get("email", ""))
+        email = self.cleaned_data.get("email", "")
         user.set_password(self.cleaned_data["password1"])
         if commit:
-            user.save()
+            salvar_com_username(user, email)
+        else:
+            user.username = gerar_username(email)
         return user
 
-    def _build_unique_username(self, email: str) -> str:
-        base = (email.split("@")[0] if email else "").strip().lower()
-        base = re.sub(r"[^a-z0-9_]+", "_", base).strip("_")
-        if not base:
-            base = "user"
-
-        UserModel = get_user_model()
-        username = base[:150]
-        suffix = 1
-        while UserModel.objects.filter(username=username).exists():
-            suffix_str = str(suffix)
-            username = f"{base[:150-len(suffix_str)-1]}_{suffix_str}"
-            suffix += 1
-        return username
-
 
 class EmailAuthenticationForm(AuthenticationForm):
     username = forms.EmailField(
@@ -303,6 +292,18 @@ def register_view(request):
     return render(request, "register.html", {"form": form})
 
 
+def _produtos_destaque(Product):
+    featured_products = list(Product.objects.filter(
+        is_active=True,
+        is_featured=True
+    )[:3])
+    if len(featured_products) < 3:
+        exclude_ids = [p.id for p in featured_products]
+        additional = Product.objects.filter(is_active=True).exclude(id__in=exclude_ids)[:3 - len(featured_products)]
+        featured_products.extend(list(additional))
+    return featured_products
+
+
 def landing_page(request):
     """Página inicial do sistema"""
     from main.models import Tournament
@@ -314,14 +315,9 @@ def landing_page(request):
     featured_products = []
     try:
         from shop.models import Product
-        featured_products = list(Product.objects.filter(
-            is_active=True,
-            is_featured=True
-        )[:3])
-        if len(featured_products) < 3:
-            exclude_ids = [p.id for p in featured_products]
-            additional = Product.objects.filter(is_active=True).exclude(id__in=exclude_ids)[:3 - len(featured_products)]
-            featured_products.extend(list(additional))
+        featured_products = services_cache.get_or_set(
+            'landing:produtos', (Product,), lambda: _produtos_destaque(Product),
+        )
     except Exception:
         pass
     
@@ -391,7 +387,34 @@ def admin_users_list(request):
         return redirect('dashboard')
 
     query = (request.GET.get('q') or '').strip()
-    users_qs = get_user_model().objects.all().order_by('username')
+    page_obj = _admin_users_page(request, query)
+
+    return render(request, 'admin_users.html', {
+        'page_obj': page_obj,
+        'query': query,
+    })
+
+
+@login_required
+def admin_users_list_json(request):
+    """Lista de usuários em JSON para rolagem infinita (``?after=<next>``)."""
+    if not _is_admin_user(request.user):
+        return JsonResponse({'error': 'Você não tem permissão para acessar esta área.'}, status=403)
+
+    query = (request.GET.get('q') or '').strip()
+    return json_page(_admin_users_page(request, query), lambda item: {
+        'id': item.id,
+        'username': item.username,
+        'nome': item.get_full_name(),
+        'email': item.email,
+        'is_active': item.is_active,
+        'is_staff': item.is_staff,
+        'url': reverse('admin_user_edit', args=[item.id]),
+    })
+
+
+def _admin_users_page(request, query):
+    users_qs = get_user_model().objects.all()
 
     if query:
         users_qs = users_qs.filter(
@@ -401,13 +424,8 @@ def admin_users_list(request):
             Q(chesscom_username__icontains=query)
         )
 
-    paginator = Paginator(users_qs, 25)
-    page_obj = paginator.get_page(request.GET.get('page'))
-
-    return render(request, 'admin_users.html', {
-        'page_obj': page_obj,
-        'query': query,
-    })
+    # Paginação por cursor em (username, id): sem COUNT total nem OFFSET.
+    return KeysetPaginator(users_qs, ('username', 'id'), per_page=25).get_page(request)
 
 
 @login_required